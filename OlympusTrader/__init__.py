@@ -10,11 +10,31 @@ from OlympusTrader.insight.executors import BaseExecutor
 from OlympusTrader.alpha import BaseAlpha
 
 # Brokers
-from OlympusTrader.broker.alpaca_broker import AlpacaBroker
-from OlympusTrader.broker.ccxt_broker import CCXTBroker
-from OlympusTrader.broker.paper_broker import PaperBroker
 from OlympusTrader.broker.interfaces import IOrderSide
 
 # Utiles and Tools
 from OlympusTrader.utils.tools import ITradingTools, dynamic_round
-from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
\ No newline at end of file
+from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
+
+
+# Brokers are imported on first use - each pulls in its SDK (alpaca-py, ccxt, vectorbt / yfinance for backtests) and
+# a strategy only needs one of them
+_LAZY_BROKERS = {
+    "AlpacaBroker": "OlympusTrader.broker.alpaca_broker",
+    "CCXTBroker": "OlympusTrader.broker.ccxt_broker",
+    "PaperBroker": "OlympusTrader.broker.paper_broker",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_BROKERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_BROKERS])
@@ -122,7 +122,7 @@ class BaseAlpha(abc.ABC):
         return AlphaResults(insight, success, message, self.NAME)
 
     def get_history(self, symbol: str) -> DataFrame:
-        return self.STRATEGY.history[symbol].loc[symbol]
+        return self.STRATEGY.history.view(symbol)
 
     def get_latest_bar(self, symbol: str) -> DataFrame:
         return self.get_history(symbol).iloc[-1]
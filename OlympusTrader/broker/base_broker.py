@@ -24,6 +24,8 @@ class BaseBroker(abc.ABC):
     PAPER: bool
 
     TICKER_INFO: dict[str, IAsset] = {}
+    CONCURRENT_TICKER_INFO: bool = True
+    """get_ticker_info can be called from several threads at once (the universe is loaded concurrently)"""
 
     supportedFeatures: ISupportedBrokerFeatures
 
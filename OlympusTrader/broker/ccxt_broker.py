@@ -21,6 +21,8 @@ class CCXTBroker(BaseBroker):
 
     exchange: Exchange
     """Yout CCXT Exchange. instance of ccxt.Exchange"""
+    CONCURRENT_TICKER_INFO: bool = False
+    """get_ticker_info drives the async exchange on its own event loop - one call at a time"""
 
     def __init__(self, exchange: Exchange,  paper: bool, feed=None):
 
@@ -34,6 +34,8 @@ class Mt5Broker(BaseBroker):
     """if the market stream is running"""
     _MARKET_STREAMS: dict[IMarketDataStream, asyncio.Future] = {}
     """Market Streams"""
+    CONCURRENT_TICKER_INFO: bool = False
+    """The MetaTrader5 terminal API is not safe to call from several threads"""
 
     TF_MAPPING = {
         "1Min": mt5.TIMEFRAME_M1,
@@ -678,20 +680,9 @@ class Mt5Broker(BaseBroker):
                                 asset["time_frame"].is_time_increment(bar.index[0][1])
                                 and bar.index[0][1] >= lastChecked.replace(tzinfo=timezone.utc)
                             ):
-                                # Run callback concurrently to avoid blocking the stream loop
-                                # await callback(bar, timeframe=asset["time_frame"])
-                                task = asyncio.create_task(callback(bar, timeframe=asset["time_frame"]))
-                                
-                                # Add a done callback to log any exceptions from the task
-                                def handle_result(t):
-                                    try:
-                                        t.result()
-                                    except asyncio.CancelledError:
-                                        pass
-                                    except Exception as e:
-                                        self.LOGGER.error(f"Error in on_bar callback task: {e}")
-                                
-                                task.add_done_callback(handle_result)
+                                # The strategy queues the bar (bounded, see marketDataQueueSize) - a task per bar would pile
+                                # up without limit when _on_bar falls behind
+                                await callback(bar, timeframe=asset["time_frame"])
 
                         except Exception as e:
                             self.LOGGER.exception(f"Error inside callback dispatch: {e}")
@@ -1,23 +1,24 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import os
+import pickle
+import timeit
 import datetime
 from time import sleep
 from types import NoneType
 import uuid
 import numpy as np
-from typing import Awaitable, List, Literal, Optional, overload
-from collections import deque
+from typing import TYPE_CHECKING, Awaitable, Callable, List, Literal, Optional, overload
 from threading import Barrier, BrokenBarrierError
 from concurrent.futures import as_completed
 from pathlib import Path
 
 import logging
+import multiprocessing
 # Configure logging
 # logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
 
-import vectorbt as vbt
-
 import pandas as pd
 from tqdm import tqdm
 from tqdm.notebook import tqdm_notebook
@@ -28,9 +29,15 @@ from ..insight.insight import Insight
 from .interfaces import IAccount, IOrder, IPosition, IAsset, IOrderLegs, IOrderLeg
 from ..strategy.interfaces import IMarketDataStream, IStrategyMode
 from ..utils.timeframe import ITimeFrame, ITimeFrameUnit
+from ..utils.priceTriggerIndex import PriceTriggerIndex
+from ..utils.signalRecorder import SignalRecorder
+from ..utils.equityCurve import EquityCurve
+from ..utils.historyCache import HistoryCache
+from ..utils.sharedAccount import SharedAccount
+from ..utils.featureMatrix import build_feature_matrix
 
-
-import yfinance as yf
+if TYPE_CHECKING:
+    import vectorbt as vbt
 
 
 class PaperBroker(BaseBroker):
@@ -50,22 +57,92 @@ class PaperBroker(BaseBroker):
     HISTORICAL_DATA: dict[str, dict[Literal['trade',
                                             'quote', 'bar', 'news', 'signals'], pd.DataFrame]] = {}
 
-    UPDATE_ORDERS: deque[IOrder] = deque()
-    PENDING_ORDERS: deque[IOrder] = deque()
-    ACTIVE_ORDERS: deque[IOrder] = deque()
-    CLOSE_ORDERS: deque[IOrder] = deque()
-    CANCELED_ORDERS: deque[IOrder] = deque()
-
-    ACCOUNT_HISTORY: dict[datetime.date, IAccount] = {}
+    # Order book - keyed by order_id (insertion ordered) for O(1) membership and removal
+    UPDATE_ORDERS: dict[uuid.UUID, IOrder] = {}
+    PENDING_ORDERS: dict[uuid.UUID, IOrder] = {}
+    ACTIVE_ORDERS: dict[uuid.UUID, IOrder] = {}
+    CLOSE_ORDERS: dict[tuple[uuid.UUID, int], IOrder] = {}
+    """Close orders keyed by (order_id of the active order they close, close sequence) - one per close request"""
+    CANCELED_ORDERS: dict[uuid.UUID, IOrder] = {}
+    _CLOSE_KEYS: dict[uuid.UUID, list[tuple[uuid.UUID, int]]] = {}
+    """order_id -> the CLOSE_ORDERS keys queued for it"""
+    _CLOSE_SEQ: int = 0
+    _LEG_PARENTS: dict[uuid.UUID, list[uuid.UUID]] = {}
+    """Take profit / stop loss leg order_id -> order_ids of the open orders holding the leg"""
+    _FINAL_ORDER_STATES = (ITradeUpdateEvent.CLOSED, ITradeUpdateEvent.CANCELED, ITradeUpdateEvent.REJECTED)
+    """Order states after which the legs of the order are dropped from the leg index"""
+    _PENDING_TRIGGERS: PriceTriggerIndex = None
+    """Resting pending limit orders by symbol and limit price - only the ones a bar can reach are processed"""
+    _PENDING_WATCH: dict[uuid.UUID, None] = {}
+    """Pending orders that are processed every step (new, market and any order that is not a resting limit)"""
+    _PENDING_SEQ: dict[uuid.UUID, int] = {}
+    """Arrival sequence of the pending orders - keeps PENDING_ORDERS processing order when only some are processed"""
+    _ORDER_SEQ: int = 0
+    _ACTIVE_TRIGGERS: PriceTriggerIndex = None
+    """Active order take profit / stop loss legs by symbol and price"""
+    _LIMIT_PRICE_PADDING: float = 0.001
+    """Limit fill tolerance (0.1%) for bars where high == low - minute data from yfinance can be flat"""
+
+    ACCOUNT_HISTORY: EquityCurve = None
+    """Account snapshot per backtest step (cash, equity, buying power, margin, open positions) - see get_account_history()"""
+    _TOTAL_UNREALIZED_PL: float = 0.0
+    """Running sum of unrealized_pl over all positions - maintained by _update_position"""
+    _TOTAL_MARKET_VALUE: float = 0.0
+    """Running sum of abs(market_value) over the open (qty != 0) positions - maintained by _update_position"""
+    _OPEN_POSITIONS: int = 0
+    """Number of open (qty != 0) positions - maintained by _update_position"""
+    _DIRTY_POSITIONS: dict[tuple[str, uuid.UUID], tuple[float, float, int]] = {}
+    """Positions being updated -> their contribution to the aggregates at the last flush"""
+    _REALIZED_PL: float = 0.0
+    """Running sum of the realized P&L of the closed positions - the cash this broker added to the account"""
+    SHARED_ACCOUNT: Optional[SharedAccount] = None
+    """Sharded runs: the account of the coordinator (a SharedAccount proxy) every shard trades - cash, equity and buying
+    power are read from it, the positions of the other shards too. None - the broker trades its own account"""
+    SHARD: Optional[int] = None
+    """Sharded runs: the shard this broker reports its totals to SHARED_ACCOUNT as"""
+
+    _SIGNALS: dict[str, SignalRecorder] = {}
+    """Backtest entry/exit signals per symbol - materialized into HISTORICAL_DATA[symbol]['signals'] for VectorBT on request"""
+
+    _BAR_TIMESTAMPS: dict[str, np.ndarray] = {}
+    """Backtest bar timestamps per symbol (int64 UTC nanoseconds) used to locate the current bar"""
+    _BAR_CURSORS: dict[str, tuple[int, int, int, int]] = {}
+    """Last located bar rows per symbol - (start_ns, end_ns, first_row, last_row)"""
+    SKIP_EMPTY_STEPS: bool = False
+    """Backtest mode: advance the clock straight to the next timestamp where at least one asset has a bar"""
+    _STEP_TIMESTAMPS: Optional[np.ndarray] = None
+    """Sorted union of all loaded bar timestamps (int64 UTC nanoseconds) used by SKIP_EMPTY_STEPS"""
+    FAST_FORWARD: bool = False
+    """Backtest mode: stream bars back to back without the step handshake while no orders or insights are live"""
+    _FAST_FORWARD_GUARD: Optional[Callable[[], bool]] = None
+    """Strategy callback that returns True when no insight needs the insight listener"""
+    _FAST_FORWARD_STEPS: int = 0
+    """Number of backtest steps streamed without the step handshake"""
+    _MARKET_STEP_HOOK: Optional[Callable[[], Awaitable[None]]] = None
+    """Strategy callback awaited once all bars of a backtest step were streamed, before the step is reported"""
 
     _MARKET_STREAMS: dict[IMarketDataStream, asyncio.Future] = {}
     """Market Streams"""
 
+    LOAD_WORKERS: Optional[int] = None
+    """Backtest mode: max concurrent historical data loads (None - the ThreadPoolExecutor default)"""
+    PROCESS_TA: bool = False
+    """Backtest mode: apply the TA study of each stream in a worker process instead of a thread. The workers are
+    spawned (not forked) - the script starting the backtest needs an `if __name__ == '__main__':` guard"""
+    LOOKAHEAD_PROBE: Optional[float] = 0.5
+    """Backtest mode: fraction of the history the preemptive TA is recomputed on to find the indicators that read future bars (None - no check)"""
+    PREEMPTIVE_TA: dict[str, list[dict]] = {}
+    """Backtest mode: streams whose TA was precomputed on load - the study entries left out because they read future bars"""
+    HISTORY_CACHE: Optional[HistoryCache] = None
+    """Backtest mode: gap aware on-disk cache used by get_history (see historyCachePath)"""
+    _HISTORY_CACHES: dict[str, HistoryCache] = {}
+    """History caches per path - stored streams use the cache of their stored_path"""
+
     FeedDelay: int = 0
     # DEBUG
     VERBOSE: int = 0
 
-    def __init__(self, cash: float = 100_000.00, start_date: datetime.date = None, end_date: datetime.date = None, leverage: int = 4, currency: str = "GBP", allow_short: bool = True, mode: IStrategyMode = IStrategyMode.BACKTEST, feed: Literal['yf', 'eod'] = 'yf', feedDelay: int = 0, verbose: int = 0):
+    def __init__(self, cash: float = 100_000.00, start_date: datetime.date = None, end_date: datetime.date = None, leverage: int = 4, currency: str = "GBP", allow_short: bool = True, mode: IStrategyMode = IStrategyMode.BACKTEST, feed: Literal['yf', 'eod'] = 'yf', feedDelay: int = 0, verbose: int = 0, skipEmptySteps: bool = False, fastForward: bool = False, loadWorkers: Optional[int] = None, processTA: bool = False, historyCachePath: Optional[str] = None, lookAheadProbe: Optional[float] = 0.5):
         super().__init__(name=ISupportedBrokers.PAPER, paper=True, feed=feed, verbose=verbose)
         self.MODE = mode
         self.VERBOSE = verbose
@@ -76,12 +153,42 @@ class PaperBroker(BaseBroker):
         self.HISTORICAL_DATA = {}
         self.Positions = {}
         self.Orders = {}
-        self.UPDATE_ORDERS = deque()
-        self.PENDING_ORDERS = deque()
-        self.ACTIVE_ORDERS = deque()
-        self.CLOSE_ORDERS = deque()
-        self.CANCELED_ORDERS = deque()
-        self.ACCOUNT_HISTORY = {}
+        self.UPDATE_ORDERS = {}
+        self.PENDING_ORDERS = {}
+        self.ACTIVE_ORDERS = {}
+        self.CLOSE_ORDERS = {}
+        self.CANCELED_ORDERS = {}
+        self._CLOSE_KEYS = {}
+        self._CLOSE_SEQ = 0
+        self._LEG_PARENTS = {}
+        self._PENDING_TRIGGERS = PriceTriggerIndex()
+        self._PENDING_WATCH = {}
+        self._PENDING_SEQ = {}
+        self._ORDER_SEQ = 0
+        self._ACTIVE_TRIGGERS = PriceTriggerIndex()
+        self.ACCOUNT_HISTORY = EquityCurve()
+        self._TOTAL_UNREALIZED_PL = 0.0
+        self._TOTAL_MARKET_VALUE = 0.0
+        self._OPEN_POSITIONS = 0
+        self._DIRTY_POSITIONS = {}
+        self._REALIZED_PL = 0.0
+        self.SHARED_ACCOUNT = None
+        self.SHARD = None
+        self._SIGNALS = {}
+        self._BAR_TIMESTAMPS = {}
+        self._BAR_CURSORS = {}
+        self.SKIP_EMPTY_STEPS = skipEmptySteps
+        self._STEP_TIMESTAMPS = None
+        self.FAST_FORWARD = fastForward
+        self._FAST_FORWARD_GUARD = None
+        self._FAST_FORWARD_STEPS = 0
+        self._MARKET_STEP_HOOK = None
+        self.LOAD_WORKERS = loadWorkers
+        self.PROCESS_TA = processTA
+        self.LOOKAHEAD_PROBE = lookAheadProbe
+        self.PREEMPTIVE_TA = {}
+        self._HISTORY_CACHES = {}
+        self.HISTORY_CACHE = self._get_history_cache(historyCachePath) if historyCachePath else None
         self.FILLED_ORDERS_HISTORY = []
         self._MARKET_STREAMS = {}
         self.FeedDelay = feedDelay
@@ -111,6 +218,7 @@ class PaperBroker(BaseBroker):
             return cached
 
         if self.DataFeed == 'yf':
+            import yfinance as yf
             symbol = symbol.replace('/', '-')
             try:
                 yfRes = yf.Ticker(symbol)
@@ -142,27 +250,38 @@ class PaperBroker(BaseBroker):
             raise NotImplementedError(
                 f'DataFeed {self.DataFeed} not supported')
 
-    def get_history(self, asset: IAsset, start: datetime.datetime, end: datetime.datetime, resolution: ITimeFrame, shouldDelta: bool = True) -> pd.DataFrame:
+    def get_history(self, asset: IAsset, start: datetime.datetime, end: datetime.datetime, resolution: ITimeFrame, shouldDelta: bool = True, cache: Optional[HistoryCache] = None) -> pd.DataFrame:
         super().get_history(asset, start, end, resolution)
 
         if self.DataFeed == 'yf':
-            symbol = asset['symbol'].replace('/', '-')
-            formatTF = f'{resolution.amount_value}{resolution.unit_value[0].lower()}'
             if self.MODE == IStrategyMode.BACKTEST:
                 delta: datetime.timedelta = start - \
                     self.get_current_time if shouldDelta else datetime.timedelta()
                 # print("start: ", self.get_current_time-start, "end: ", self.get_current_time-end)
-                data = yf.download(
-                    symbol, start=resolution.get_time_increment(start-delta), end=resolution.get_time_increment(end-delta), interval=formatTF, progress=False)
-            else:
-                data = yf.download(
-                    symbol, start=start, end=end, interval=formatTF, progress=False)
+                start, end = resolution.get_time_increment(
+                    start-delta), resolution.get_time_increment(end-delta)
+                cache = cache or self.HISTORY_CACHE
+                if cache is not None:
+                    return cache.get(asset, start, end, resolution)
 
-            return self.format_on_bar(data, asset['symbol'])
+            return self._download_history(asset, start, end, resolution)
         else:
             raise NotImplementedError(
                 f'DataFeed {self.DataFeed} not supported')
 
+    def _download_history(self, asset: IAsset, start: datetime.datetime, end: datetime.datetime, resolution: ITimeFrame) -> pd.DataFrame:
+        """ Download [start, end) bars from the data feed - the fetcher of the history caches."""
+        symbol = asset['symbol'].replace('/', '-')
+        formatTF = f'{resolution.amount_value}{resolution.unit_value[0].lower()}'
+        import yfinance as yf
+        data = yf.download(
+            symbol, start=start, end=end, interval=formatTF, progress=False)
+        return self.format_on_bar(data, asset['symbol'])
+
+    def _get_history_cache(self, path: str) -> HistoryCache:
+        """ The history cache stored at path (shared by every stream and get_history call using the same path)."""
+        return self._HISTORY_CACHES.setdefault(path, HistoryCache(path, self._download_history))
+
     def get_account(self):
         return self.Account
 
@@ -194,8 +313,17 @@ class PaperBroker(BaseBroker):
         for symbol in self.Positions.keys():
             aggregated_positions[symbol] = self.get_position(symbol)
 
+        if self.SHARED_ACCOUNT is not None:
+            # the positions of the other shards as of their last step
+            return {**self.SHARED_ACCOUNT.get_positions(exclude=self.SHARD), **aggregated_positions}
         return aggregated_positions
 
+    def attach_shared_account(self, account: SharedAccount, shard: int):
+        """ Trade the account of a sharded run instead of this broker's own (see SharedAccount)."""
+        self.SHARED_ACCOUNT = account
+        self.SHARD = shard
+        self.update_account_balance()
+
     def get_orders(self):
         # active orders
         returned_orders: dict[str, IOrder] = {}
@@ -232,16 +360,15 @@ class PaperBroker(BaseBroker):
             order['updated_at'] = self.get_current_time
 
             # Check if order is already in CANCELED_ORDERS to avoid duplicates
-            if not any(canceled_order['order_id'] == order_id for canceled_order in self.CANCELED_ORDERS):
-                self.CANCELED_ORDERS.append(order)
+            if order_id not in self.CANCELED_ORDERS:
+                self.CANCELED_ORDERS[order_id] = order
                 self.LOGGER.debug(f"Added order {order_id} to CANCELED_ORDERS")
 
             # Remove from PENDING_ORDERS if present
-            for pending_order in list(self.PENDING_ORDERS):
-                if pending_order['order_id'] == order_id:
-                    self.PENDING_ORDERS.remove(pending_order)
-                    self.LOGGER.debug(
-                        f"Removed order {order_id} from PENDING_ORDERS during cancellation")
+            if self.PENDING_ORDERS.pop(order_id, None) is not None:
+                self._settle_pending_order(order_id)
+                self.LOGGER.debug(
+                    f"Removed order {order_id} from PENDING_ORDERS during cancellation")
 
             # If this order has TP/SL legs, cancel those too
             if order.get('legs'):
@@ -264,11 +391,12 @@ class PaperBroker(BaseBroker):
                         self.cancel_order(sl_order_id)
                     except Exception as e:
                         self.LOGGER.error(f"Could not cancel SL leg: {e}")
+                self._forget_order_legs(order)
 
             return order
 
         # If not found directly, check if this is a TP or SL leg of another order
-        for parent_id, parent_order in self.Orders.items():
+        for parent_id, parent_order in self._get_leg_parents(order_id):
             if parent_order.get('legs'):
                 # Check if this is a take profit leg
                 if parent_order['legs'].get('take_profit') and parent_order['legs']['take_profit'].get('order_id') == order_id:
@@ -285,6 +413,7 @@ class PaperBroker(BaseBroker):
                             f"Order {order_id} is a take profit leg of {parent_id}, removing reference")
                         # Remove the take profit leg reference
                         del parent_order['legs']['take_profit']
+                        self._forget_leg(order_id, parent_id)
                         return self.get_order(order_id) or {'order_id': order_id, 'status': ITradeUpdateEvent.CANCELED}
 
                 # Check if this is a stop loss leg
@@ -302,6 +431,7 @@ class PaperBroker(BaseBroker):
                             f"Order {order_id} is a stop loss leg of {parent_id}, removing reference")
                         # Remove the stop loss leg reference
                         del parent_order['legs']['stop_loss']
+                        self._forget_leg(order_id, parent_id)
                         return self.get_order(order_id) or {'order_id': order_id, 'status': ITradeUpdateEvent.CANCELED}
 
         # Order Id not found
@@ -318,7 +448,7 @@ class PaperBroker(BaseBroker):
                     "code": "already_filled",
                     "data": {"order_id": order_id}
                 })
-            elif order['status'] == ITradeUpdateEvent.CANCELED or order in self.CANCELED_ORDERS:
+            elif order['status'] == ITradeUpdateEvent.CANCELED or order_id in self.CANCELED_ORDERS:
                 raise BaseException({
                     "code": "already_canceled",
                     "data": {"order_id": order_id}
@@ -327,19 +457,22 @@ class PaperBroker(BaseBroker):
                 order['updated_at'] = self.get_current_time
                 order['qty'] = qty
                 order['limit_price'] = price
-                self.UPDATE_ORDERS.append(order)
+                self.UPDATE_ORDERS[order_id] = order
+                if order_id in self.PENDING_ORDERS:
+                    # Re-index the resting limit price
+                    self._settle_pending_order(order_id)
                 return order
         else:
             # check legs
-            for i, leg_order in self.Orders.items():
-                if leg_order['legs'] != None and leg_order not in self.CANCELED_ORDERS and (leg_order['status'] != ITradeUpdateEvent.CANCELED and leg_order['status'] != ITradeUpdateEvent.CLOSED):
+            for i, leg_order in self._get_leg_parents(order_id):
+                if leg_order['legs'] != None and i not in self.CANCELED_ORDERS and (leg_order['status'] != ITradeUpdateEvent.CANCELED and leg_order['status'] != ITradeUpdateEvent.CLOSED):
                     if leg_order['legs'].get('take_profit'):
                         if leg_order['legs']['take_profit']['order_id'] == order_id:
                             # remove the take profit leg
                             self.Orders[i]['legs']['take_profit']['limit_price'] = price
                             self.Orders[i]['legs']['take_profit']['qty'] = qty
                             self.Orders[i]['legs']['take_profit']["updated_at"] = self.get_current_time
-                            self.UPDATE_ORDERS.append(self.Orders[i])
+                            self.UPDATE_ORDERS[i] = self.Orders[i]
                             return self.Orders[i]
 
                     if leg_order['legs'].get('stop_loss'):
@@ -347,7 +480,7 @@ class PaperBroker(BaseBroker):
                             self.Orders[i]['legs']['stop_loss']['limit_price'] = price
                             self.Orders[i]['legs']['stop_loss']['qty'] = qty
                             self.Orders[i]['legs']['stop_loss']["updated_at"] = self.get_current_time
-                            self.UPDATE_ORDERS.append(self.Orders[i])
+                            self.UPDATE_ORDERS[i] = self.Orders[i]
                             return self.Orders[i]
 
         # Order Id not found
@@ -430,128 +563,258 @@ class PaperBroker(BaseBroker):
         return
 
     async def processUpdateOrders(self, callback: Awaitable):
-        for i, order in enumerate(self.UPDATE_ORDERS):
+        for order_id, order in list(self.UPDATE_ORDERS.items()):
             updateOrder = order.copy()
             self.LOGGER.debug(f"Processing update order: {updateOrder['order_id']}")
             updateOrder['status'] = ITradeUpdateEvent.REPLACED
             await callback(ITradeUpdate(updateOrder, updateOrder['status']))
-            self.UPDATE_ORDERS.remove(order)
+            self.UPDATE_ORDERS.pop(order_id, None)
 
     async def processPendingOrders(self, callback: Awaitable):
         """ Process pending orders that are either new or accepted.
         This method checks the current market conditions and fills market orders immediately.
         It also processes limit orders based on the current bar's high and low prices.
+        Resting limit orders are held in a price index and only the ones inside the bar's range are processed.
         """
         # Allowed order states
         allowed_states = [ITradeUpdateEvent.NEW,
                           ITradeUpdateEvent.ACCEPTED, ITradeUpdateEvent.PENDING_NEW]
-        idx = 0
-        # Iterate through pending orders
-        # for i, order in enumerate(self.PENDING_ORDERS):
-        while idx < len(self.PENDING_ORDERS):
-            order = self.PENDING_ORDERS[idx]
-
-            # Check if order has been canceled and is not already filled or closed
-            if any(canceled_order['order_id'] == order['order_id'] for canceled_order in self.CANCELED_ORDERS):
-                # Only skip if the order is not already filled or closed
-                if order['status'] != ITradeUpdateEvent.FILLED and order['status'] != ITradeUpdateEvent.CLOSED:
-                    self.PENDING_ORDERS.remove(order)
-                    self.LOGGER.debug(
-                        f"Skipping processing of canceled order {order['order_id']} in PENDING_ORDERS")
+        self._compact_trigger_indexes()
+        minSeq = None
+        while True:
+            # Orders queued by the callbacks are processed in the same step, after the current batch
+            batchSeq = self._ORDER_SEQ
+            candidates = self._get_pending_candidates(minSeq)
+            if not candidates:
+                break
+            minSeq = batchSeq
+
+            for order_id in candidates:
+                order = self.PENDING_ORDERS.get(order_id)
+                if order is None:
+                    # Removed while processing an earlier order
+                    self._settle_pending_order(order_id)
                     continue
+                try:
+                    await self._process_pending_order(order_id, order, allowed_states, callback)
+                finally:
+                    self._settle_pending_order(order_id)
+
+    async def _process_pending_order(self, order_id: uuid.UUID, order: IOrder, allowed_states: list[ITradeUpdateEvent], callback: Awaitable):
+        # Check if order has been canceled and is not already filled or closed
+        if order_id in self.CANCELED_ORDERS:
+            # Only skip if the order is not already filled or closed
+            if order['status'] != ITradeUpdateEvent.FILLED and order['status'] != ITradeUpdateEvent.CLOSED:
+                del self.PENDING_ORDERS[order_id]
+                self.LOGGER.debug(
+                    f"Skipping processing of canceled order {order['order_id']} in PENDING_ORDERS")
+                return
 
-            if order['status'] not in allowed_states or (order not in self.PENDING_ORDERS):
-                self.PENDING_ORDERS.remove(order)
-                continue
+        if order['status'] not in allowed_states:
+            del self.PENDING_ORDERS[order_id]
+            return
 
-            currentBar = self._get_current_bar(
-                order['asset']['symbol'])
-            if currentBar is None:
-                idx += 1
-                continue
-            currentBar = currentBar.iloc[0]
+        currentBar = self._get_current_bar(
+            order['asset']['symbol'])
+        if currentBar is None:
+            return
+        currentBar = currentBar.iloc[0]
 
-            if ((order['status'] == ITradeUpdateEvent.NEW) or (order['created_at'] == self.get_current_time)):
-                order['status'] = ITradeUpdateEvent.NEW
-                self._update_order(order)
+        if ((order['status'] == ITradeUpdateEvent.NEW) or (order['created_at'] == self.get_current_time)):
+            order['status'] = ITradeUpdateEvent.NEW
+            self._update_order(order)
+
+            await callback(ITradeUpdate(order, order['status']))
+            
+            order['status'] = ITradeUpdateEvent.PENDING_NEW
+
+        if order['type'] == IOrderType.MARKET:
+            # Market order - FILLED at the current close price
+            order['filled_price'] = currentBar.open
+            order['filled_qty'] = order['qty']
+            order['status'] = ITradeUpdateEvent.FILLED
+            order['filled_at'] = self.get_current_time
+            order['updated_at'] = self.get_current_time
 
+            try:
+                self._update_order(order)
                 await callback(ITradeUpdate(order, order['status']))
-                
-                order['status'] = ITradeUpdateEvent.PENDING_NEW
+            except BaseException as e:
+                if e.code == "insufficient_funds":
+                    self.LOGGER.warning(f"Error: {e}")
+                order['status'] = ITradeUpdateEvent.REJECTED
+                order['filled_at'] = None
+                order['filled_price'] = None
+                order['filled_qty'] = None
+                order['updated_at'] = self.get_current_time
+                self.PENDING_ORDERS.pop(order_id, None)
+                self._forget_order_legs(order)
+                await callback(ITradeUpdate(order, order['status']))
+            return
 
-            if order['type'] == IOrderType.MARKET:
-                # Market order - FILLED at the current close price
-                order['filled_price'] = currentBar.open
+        elif order['type'] == IOrderType.LIMIT:
+            """
+            sometime the currentbar high and low can be the same as the close price when using minute data with yfinance API
+            """
+            autopass = False
+            if currentBar.high == currentBar.low:
+                pricePadding = self._LIMIT_PRICE_PADDING
+                if ((currentBar.high*(1+pricePadding)) >= order['limit_price'] >= (currentBar.low*(1-pricePadding))):
+                    autopass = True
+
+            # we need to check if the limit price is within the high and low of the current bar
+            if (order['limit_price'] >= currentBar.low and order['limit_price'] <= currentBar.high) or autopass:
+                order['filled_price'] = order['limit_price']
                 order['filled_qty'] = order['qty']
                 order['status'] = ITradeUpdateEvent.FILLED
                 order['filled_at'] = self.get_current_time
                 order['updated_at'] = self.get_current_time
-
                 try:
                     self._update_order(order)
                     await callback(ITradeUpdate(order, order['status']))
                 except BaseException as e:
                     if e.code == "insufficient_funds":
-                        self.LOGGER.warning(f"Error: {e}")
+                        self.LOGGER.error(f"Error: {e}")
                     order['status'] = ITradeUpdateEvent.REJECTED
                     order['filled_at'] = None
                     order['filled_price'] = None
                     order['filled_qty'] = None
                     order['updated_at'] = self.get_current_time
-                    self.PENDING_ORDERS.remove(order)
+                    self.PENDING_ORDERS.pop(order_id, None)
+                    self._forget_order_legs(order)
                     await callback(ITradeUpdate(order, order['status']))
-                continue
+                return
 
-            elif order['type'] == IOrderType.LIMIT:
-                """
-                sometime the currentbar high and low can be the same as the close price when using minute data with yfinance API
-                """
-                autopass = False
-                if currentBar.high == currentBar.low:
-                    pricePadding = 0.001  # 0.1%
-                    if ((currentBar.high*(1+pricePadding)) >= order['limit_price'] >= (currentBar.low*(1-pricePadding))):
-                        autopass = True
-
-                # we need to check if the limit price is within the high and low of the current bar
-                if (order['limit_price'] >= currentBar.low and order['limit_price'] <= currentBar.high) or autopass:
-                    order['filled_price'] = order['limit_price']
-                    order['filled_qty'] = order['qty']
-                    order['status'] = ITradeUpdateEvent.FILLED
-                    order['filled_at'] = self.get_current_time
-                    order['updated_at'] = self.get_current_time
-                    try:
-                        self._update_order(order)
-                        await callback(ITradeUpdate(order, order['status']))
-                    except BaseException as e:
-                        if e.code == "insufficient_funds":
-                            self.LOGGER.error(f"Error: {e}")
-                        order['status'] = ITradeUpdateEvent.REJECTED
-                        order['filled_at'] = None
-                        order['filled_price'] = None
-                        order['filled_qty'] = None
-                        order['updated_at'] = self.get_current_time
-                        self.PENDING_ORDERS.remove(order)
-                        await callback(ITradeUpdate(order, order['status']))
+    def _queue_pending_order(self, order: IOrder):
+        """ Add an order to PENDING_ORDERS. It is processed every step until it rests as a limit order."""
+        self.PENDING_ORDERS[order['order_id']] = order
+        self._PENDING_SEQ[order['order_id']] = self._ORDER_SEQ
+        self._ORDER_SEQ += 1
+        self._PENDING_WATCH[order['order_id']] = None
+        self._PENDING_TRIGGERS.discard(order['order_id'])
+
+    def _is_resting_order(self, order: IOrder) -> bool:
+        """ A pending limit order that only needs processing once a bar reaches its limit price."""
+        return order['type'] == IOrderType.LIMIT and \
+            (order['status'] == ITradeUpdateEvent.PENDING_NEW or order['status'] == ITradeUpdateEvent.ACCEPTED) and \
+            order['created_at'] != self.get_current_time and \
+            order['order_id'] not in self.CANCELED_ORDERS
+
+    def _settle_pending_order(self, order_id: uuid.UUID):
+        """ Move a pending order between the per step watch list and the limit price index."""
+        order = self.PENDING_ORDERS.get(order_id)
+        if order is None:
+            self._PENDING_WATCH.pop(order_id, None)
+            self._PENDING_SEQ.pop(order_id, None)
+            self._PENDING_TRIGGERS.discard(order_id)
+            return
+        if self._is_resting_order(order) and \
+                self._PENDING_TRIGGERS.add(order['asset']['symbol'], (IOrderType.LIMIT, order['side']), order['limit_price'], order_id):
+            self._PENDING_WATCH.pop(order_id, None)
+            return
+        self._PENDING_TRIGGERS.discard(order_id)
+        self._PENDING_WATCH[order_id] = None
+
+    def _get_pending_candidates(self, minSeq: Optional[int] = None) -> list[uuid.UUID]:
+        """ Pending orders to process this step in PENDING_ORDERS order.
+        The watch list plus the resting limit orders whose limit price lies inside the current bar.
+        With minSeq only the orders queued since that sequence are returned.
+        """
+        if minSeq is not None:
+            candidates = [order_id for order_id in self._PENDING_WATCH if self._PENDING_SEQ.get(order_id, -1) >= minSeq]
+        else:
+            candidates = list(self._PENDING_WATCH)
+            for symbol in self._PENDING_TRIGGERS.symbols():
+                currentBar = self._get_current_bar(symbol)
+                if currentBar is None:
                     continue
-            idx += 1
+                currentBar = currentBar.iloc[0]
+                low, high = currentBar.low, currentBar.high
+                if high == low:
+                    low = min(low, low*(1-self._LIMIT_PRICE_PADDING))
+                    high = max(high, high*(1+self._LIMIT_PRICE_PADDING))
+                for book in self._PENDING_TRIGGERS.books(symbol):
+                    candidates.extend(
+                        self._PENDING_TRIGGERS.between(symbol, book, low, high))
+        return sorted(set(candidates), key=lambda order_id: self._PENDING_SEQ.get(order_id, -1))
+
+    def _sync_active_triggers(self, order: IOrder) -> bool:
+        """ Index the take profit / stop loss legs of an active order. Returns True when the index had to change."""
+        levels = {}
+        if order['legs']:
+            for leg in ('take_profit', 'stop_loss'):
+                if order['legs'].get(leg):
+                    # A leg without a limit price is not indexable and stays checked every step, as before the index
+                    levels[(leg, order['side'])] = order['legs'][leg].get('limit_price')
+        if self._ACTIVE_TRIGGERS.levels(order['order_id']) == levels:
+            return False
+        self._ACTIVE_TRIGGERS.discard(order['order_id'])
+        for book, price in levels.items():
+            if not self._ACTIVE_TRIGGERS.add(order['asset']['symbol'], book, price, order['order_id']):
+                # Not indexable (None / NaN) - keep it out of the index so it is always checked
+                self._ACTIVE_TRIGGERS.discard(order['order_id'])
+                break
+        return True
+
+    def _get_active_candidates(self) -> set[uuid.UUID]:
+        """ Active orders whose take profit or stop loss could trigger on the current bar -
+        the leg price is inside [low, high] or beyond the close in the direction that closes the position.
+        """
+        candidates = set()
+        for symbol in self._ACTIVE_TRIGGERS.symbols():
+            currentBar = self._get_current_bar(symbol)
+            if currentBar is None:
+                continue
+            currentBar = currentBar.iloc[0]
+            low, high, close = currentBar.low, currentBar.high, currentBar.close
+            for book in self._ACTIVE_TRIGGERS.books(symbol):
+                leg, side = book
+                candidates.update(self._ACTIVE_TRIGGERS.between(symbol, book, low, high))
+                if (leg == 'take_profit') == (side == IOrderSide.BUY):
+                    # Long take profit / short stop loss - triggered at or below the close
+                    candidates.update(self._ACTIVE_TRIGGERS.at_or_below(symbol, book, close))
+                else:
+                    # Short take profit / long stop loss - triggered at or above the close
+                    candidates.update(self._ACTIVE_TRIGGERS.at_or_above(symbol, book, close))
+        return candidates
+
+    def _compact_trigger_indexes(self):
+        """ Drop index entries of orders that left the order book without going through the trigger engine."""
+        if len(self._PENDING_SEQ) > 2 * len(self.PENDING_ORDERS) + 1024:
+            for order_id in [order_id for order_id in self._PENDING_SEQ if order_id not in self.PENDING_ORDERS]:
+                self._settle_pending_order(order_id)
+        if len(self._ACTIVE_TRIGGERS) > 2 * len(self.ACTIVE_ORDERS) + 1024:
+            for order_id in self._ACTIVE_TRIGGERS:
+                if order_id not in self.ACTIVE_ORDERS:
+                    self._ACTIVE_TRIGGERS.discard(order_id)
 
     async def processActiveOrders(self, callback: Awaitable):
         """ Process active orders that are either filled or partially filled.
         This method checks for take profit and stop loss conditions and updates the order status accordingly.
         It also updates the position information and calculates the P&L for filled positions.
+        Only the orders with a take profit or stop loss leg the current bar can reach are checked.
         """
         # Allowed order states
         allowed_states = [ITradeUpdateEvent.FILLED,
                           ITradeUpdateEvent.PARTIAL_FILLED]
-        for i, order in enumerate(list(self.ACTIVE_ORDERS)):
-            if order['status'] not in allowed_states or (order not in self.ACTIVE_ORDERS):
-                self.ACTIVE_ORDERS.remove(order)
+        candidates = self._get_active_candidates()
+        for order_id, order in list(self.ACTIVE_ORDERS.items()):
+            if order_id not in self.ACTIVE_ORDERS:
+                # Removed while processing an earlier order
+                self._ACTIVE_TRIGGERS.discard(order_id)
+                continue
+            if order['status'] not in allowed_states:
+                del self.ACTIVE_ORDERS[order_id]
+                self._ACTIVE_TRIGGERS.discard(order_id)
                 continue
             # update the position information as the position is filled and keep track of all  positions PNL
             self._update_position(order)
 
             # check if the order has take profit or stop loss
             if order['legs']:
+                if not self._sync_active_triggers(order) and order_id not in candidates:
+                    # Neither leg can trigger on the current bar
+                    continue
                 currentBar = self._get_current_bar(
                     order['asset']['symbol'])
                 if currentBar is None:
@@ -573,6 +836,7 @@ class PaperBroker(BaseBroker):
                         order['side'] = IOrderSide.SELL if order['side'] == IOrderSide.BUY else IOrderSide.BUY
 
                         self._update_order(order)
+                        self._ACTIVE_TRIGGERS.discard(order_id)
                         await callback(ITradeUpdate(order, order['status']))
                         continue
                 if order['legs'].get('stop_loss'):
@@ -590,10 +854,12 @@ class PaperBroker(BaseBroker):
                         order['side'] = IOrderSide.SELL if order['side'] == IOrderSide.BUY else IOrderSide.BUY
 
                         self._update_order(order)
+                        self._ACTIVE_TRIGGERS.discard(order_id)
                         await callback(ITradeUpdate(order,  order['status']))
                         continue
             else:
                 # USually a market order or limit order without take profit or stop loss
+                self._ACTIVE_TRIGGERS.discard(order_id)
                 continue
 
     async def processClosedOrders(self, callback: Awaitable):
@@ -603,9 +869,12 @@ class PaperBroker(BaseBroker):
         """
         # Allowed order states
         allowed_states = [ITradeUpdateEvent.CLOSED, ITradeUpdateEvent.FILLED]
-        for i, order in enumerate(list(self.CLOSE_ORDERS)):
-            if (order['status'] not in allowed_states) or (order not in self.CLOSE_ORDERS):
-                self.CLOSE_ORDERS.remove(order)
+        for key, order in list(self.CLOSE_ORDERS.items()):
+            if self.CLOSE_ORDERS.get(key) is not order:
+                # Removed while processing an earlier order
+                continue
+            if order['status'] not in allowed_states:
+                self._dequeue_close_order(order)
                 continue
 
             currentBar = self._get_current_bar(
@@ -631,17 +900,19 @@ class PaperBroker(BaseBroker):
         allowed_states = [ITradeUpdateEvent.CANCELED,
                           ITradeUpdateEvent.ACCEPTED, ITradeUpdateEvent.PENDING_NEW]
         try: 
-            for i, order in enumerate(self.CANCELED_ORDERS):
-                if order['status'] not in allowed_states or (order not in self.CANCELED_ORDERS):
-                    self.CANCELED_ORDERS.remove(order)
+            for order_id, order in list(self.CANCELED_ORDERS.items()):
+                if order_id not in self.CANCELED_ORDERS:
+                    # Removed while processing an earlier order
+                    continue
+                if order['status'] not in allowed_states:
+                    del self.CANCELED_ORDERS[order_id]
                     continue
 
-                if order in self.PENDING_ORDERS:
-                    self.PENDING_ORDERS.remove(order)
+                if self.PENDING_ORDERS.pop(order_id, None) is not None:
+                    self._settle_pending_order(order_id)
                     self.LOGGER.debug(
                         f"Removed canceled order {order['order_id']} from PENDING_ORDERS")
-                if order in self.UPDATE_ORDERS:
-                    self.UPDATE_ORDERS.remove(order)
+                if self.UPDATE_ORDERS.pop(order_id, None) is not None:
                     self.LOGGER.debug(
                         f"Removed canceled order {order['order_id']} from UPDATE_ORDERS")
 
@@ -656,7 +927,7 @@ class PaperBroker(BaseBroker):
                     # but don't change its status or remove from ACTIVE_ORDERS
                     self.LOGGER.debug(
                         f"Order {order['order_id']} is already {order['status']}, removing from CANCELED_ORDERS only")
-                    self.CANCELED_ORDERS.remove(order)
+                    self.CANCELED_ORDERS.pop(order_id, None)
         except Exception as e:
             self.LOGGER.info(f"error in processCanceledOrders: {e}")
 
@@ -667,6 +938,47 @@ class PaperBroker(BaseBroker):
         #     raise NotImplementedError(f'Mode {self.MODE} not supported')
 
     def _update_position(self, order: IOrder):
+        """ Applies the order to its position and keeps the account aggregates in step with the change."""
+        key = (order['asset']['symbol'], order['order_id'])
+        tracking = key not in self._DIRTY_POSITIONS
+        if tracking:
+            self._DIRTY_POSITIONS[key] = self._get_position_aggregates(*key)
+        try:
+            self._apply_position_update(order)
+        finally:
+            if tracking:
+                self._flush_position_aggregates()
+                del self._DIRTY_POSITIONS[key]
+
+    def _flush_position_aggregates(self):
+        """ Add the change of every position being updated since the last flush to the account aggregates."""
+        for key, before in self._DIRTY_POSITIONS.items():
+            after = self._get_position_aggregates(*key)
+            if after == before:
+                continue
+            self._TOTAL_UNREALIZED_PL += after[0] - before[0]
+            self._TOTAL_MARKET_VALUE += after[1] - before[1]
+            self._OPEN_POSITIONS += after[2] - before[2]
+            self._DIRTY_POSITIONS[key] = after
+            if not np.isfinite(self._TOTAL_UNREALIZED_PL) or not np.isfinite(self._TOTAL_MARKET_VALUE):
+                # A NaN price went through a position - the running sums cannot recover from it
+                self._recompute_account_aggregates()
+            elif self._OPEN_POSITIONS == 0:
+                # Nothing open - drop any floating point drift
+                self._TOTAL_MARKET_VALUE = 0.0
+                if not any(self.Positions.values()):
+                    self._TOTAL_UNREALIZED_PL = 0.0
+
+    def _get_position_aggregates(self, symbol: str, orderId: uuid.UUID) -> tuple[float, float, int]:
+        """ The (unrealized_pl, market value, open count) a single position adds to the account aggregates."""
+        position = self.Positions.get(symbol, {}).get(orderId)
+        if position is None:
+            return 0.0, 0.0, 0
+        if position.get('qty', 0) != 0:
+            return position.get('unrealized_pl', 0), abs(position.get('market_value', 0)), 1
+        return position.get('unrealized_pl', 0), 0.0, 0
+
+    def _apply_position_update(self, order: IOrder):
         symbol = order['asset']['symbol']
         orderId = order['order_id']
         currentBar = self._get_current_bar(symbol)
@@ -719,6 +1031,7 @@ class PaperBroker(BaseBroker):
                         # self.ACCOUNT.equity += realized_pl
                         # TODO: factor in commission?
                         self.ACCOUNT.cash += realized_pl
+                        self._REALIZED_PL += realized_pl
 
                         self.LOGGER.debug(
                             f"[AUDIT] Realized P&L: {realized_pl}, Margin Released: {margin_used}")
@@ -726,7 +1039,7 @@ class PaperBroker(BaseBroker):
                         if self.Account.cash <= 0:
                             # No buying power left close the position
                             order['status'] = ITradeUpdateEvent.CANCELED
-                            self.CANCELED_ORDERS.append(order)
+                            self.CANCELED_ORDERS[order['order_id']] = order
                             raise BaseException({
                                 "code": "insufficient_funds",
                                 "data": {"order_id": order['order_id']}
@@ -848,12 +1161,13 @@ class PaperBroker(BaseBroker):
         Ensures price and qty columns are set correctly, prioritizes DCA accumulation over position closure conflicts.
         """
         symbol = order['asset']['symbol']
-        bar = self._get_current_bar(symbol)
-        if bar is None:
+        signals = self._SIGNALS.get(symbol)
+        if signals is None:
+            return
+        currentRow = self._get_current_bar_row(symbol)
+        if currentRow is None:
             # No bar found for this symbol/time
             return
-        currentBarIndex = bar.index
-        signals = self.HISTORICAL_DATA[symbol]['signals']
 
         # Check if this is DCA accumulation (same direction as existing position)
         current_position = self.get_position(symbol)
@@ -867,117 +1181,119 @@ class PaperBroker(BaseBroker):
         qty = order.get('filled_qty', order.get('qty', 0))
 
         if signalType == 'entry':
-            targetBarIndex = currentBarIndex
+            targetRow = currentRow
             
             # Check for conflicts (Reversal: Exit + Entry on same bar)
             # If we are entering, but there is already an exit on this bar, it's a reversal.
             # VBT can't handle both on same bar, so shift entry to next bar.
             conflict = False
-            
-            # DEBUG PRINTS (commented - enable if needed)
-            # print(f"DEBUG: _log_signal ENTRY {symbol} {order['side']} at {currentBarIndex}")
-            # print(f"DEBUG: Exits: {signals.loc[currentBarIndex, 'exits']}, Short Exits: {signals.loc[currentBarIndex, 'short_exits']}")
 
             if order['side'] == IOrderSide.BUY:
-                if signals.loc[currentBarIndex, 'exits'].bool():
+                if signals.exits[currentRow]:
                     conflict = True
             elif order['side'] == IOrderSide.SELL:
-                if signals.loc[currentBarIndex, 'short_exits'].bool():
+                if signals.short_exits[currentRow]:
                     conflict = True
             
-            # if conflict:
-            #     print(f"DEBUG: Conflict detected for {symbol} at {currentBarIndex}. DCA: {is_dca_accumulation}")
-            
             if conflict and not is_dca_accumulation:
-                # Find next bar index
-                try:
-                    # Get integer location
-                    iloc = signals.index.get_loc(currentBarIndex)
-                    # Get next location
-                    next_iloc = iloc + 1
-                    if next_iloc < len(signals.index):
-                        targetBarIndex = signals.index[next_iloc]
-                        self.LOGGER.debug(f"[VBT] Shifting {order['side']} Entry signal for {symbol} to next bar {targetBarIndex} to avoid conflict with Exit")
-                        # print(f"DEBUG: Shifted to {targetBarIndex}")
-                    else:
-                        self.LOGGER.warning(f"[VBT] Cannot shift Entry signal for {symbol} - end of data")
-                        # Fallback: overwrite (VBT will miss the exit, but better than crashing)
-                except Exception as e:
-                    self.LOGGER.error(f"Error shifting signal: {e}")
+                # Shift to the next bar
+                if currentRow + 1 < len(signals):
+                    targetRow = currentRow + 1
+                    self.LOGGER.debug(f"[VBT] Shifting {order['side']} Entry signal for {symbol} to next bar {signals.index[targetRow]} to avoid conflict with Exit")
+                else:
+                    self.LOGGER.warning(f"[VBT] Cannot shift Entry signal for {symbol} - end of data")
+                    # Fallback: overwrite (VBT will miss the exit, but better than crashing)
 
             if order['side'] == IOrderSide.BUY:
                 # For DCA: if conflicting exit exists (and not shifted), prioritize entry (accumulation)
-                if targetBarIndex == currentBarIndex and signals.loc[targetBarIndex, 'exits'].bool():
+                if targetRow == currentRow and signals.exits[targetRow]:
                     if is_dca_accumulation:
                         self.LOGGER.debug(
                             f"[DCA] Prioritizing BUY entry over exit for {symbol} - DCA accumulation")
-                        signals.loc[targetBarIndex, 'exits'] = False
+                        signals.exits[targetRow] = False
                     else:
                         # This should be handled by shift above, but if shift failed or logic gap:
                         self.LOGGER.debug(
                             f"[DCA] Skipping BUY entry for {symbol} - conflicting exit signal")
                         return
-                signals.loc[targetBarIndex, 'entries'] = True
-                signals.loc[targetBarIndex, 'qty'] += abs(qty)
+                signals.entries[targetRow] = True
+                signals.qty[targetRow] += abs(qty)
 
             elif order['side'] == IOrderSide.SELL:
                 # For DCA: if conflicting short exit exists (and not shifted), prioritize entry (accumulation)
-                if targetBarIndex == currentBarIndex and signals.loc[targetBarIndex, 'short_exits'].bool():
+                if targetRow == currentRow and signals.short_exits[targetRow]:
                     if is_dca_accumulation:
                         self.LOGGER.debug(
                             f"[DCA] Prioritizing SELL entry over short exit for {symbol} - DCA accumulation")
-                        signals.loc[targetBarIndex, 'short_exits'] = False
+                        signals.short_exits[targetRow] = False
                     else:
                          # This should be handled by shift above
                         self.LOGGER.debug(
                             f"[DCA] Skipping SELL entry for {symbol} - conflicting short exit signal")
                         return
-                signals.loc[targetBarIndex, 'short_entries'] = True
-                signals.loc[targetBarIndex, 'qty'] -= abs(qty)
+                signals.short_entries[targetRow] = True
+                signals.qty[targetRow] -= abs(qty)
 
             # Set the entry price
             if order.get('filled_price') is not None and not np.isnan(order['filled_price']):
-                signals.loc[targetBarIndex, 'price'] = order['filled_price']
+                signals.price[targetRow] = order['filled_price']
 
         elif signalType == 'exit':
             if order['side'] == IOrderSide.SELL:
                 # Clear conflicting entry if this is a true position closure
-                if signals.loc[currentBarIndex, 'entries'].bool():
+                if signals.entries[currentRow]:
                     self.LOGGER.debug(
                         f"[DCA] Exit SELL clearing conflicting entry for {symbol}")
-                    signals.loc[currentBarIndex, 'entries'] = False
-                signals.loc[currentBarIndex, 'exits'] = True
-                signals.loc[currentBarIndex, 'qty'] -= abs(qty)
+                    signals.entries[currentRow] = False
+                signals.exits[currentRow] = True
+                signals.qty[currentRow] -= abs(qty)
 
             elif order['side'] == IOrderSide.BUY:
                 # Clear conflicting short entry if this is a true position closure
-                if signals.loc[currentBarIndex, 'short_entries'].bool():
+                if signals.short_entries[currentRow]:
                     self.LOGGER.debug(
                         f"[DCA] Exit BUY clearing conflicting short entry for {symbol}")
-                    signals.loc[currentBarIndex, 'short_entries'] = False
-                signals.loc[currentBarIndex, 'short_exits'] = True
-                signals.loc[currentBarIndex, 'qty'] += abs(qty)
+                    signals.short_entries[currentRow] = False
+                signals.short_exits[currentRow] = True
+                signals.qty[currentRow] += abs(qty)
 
             # Set the exit price (prefer stop_price, fallback to filled_price)
             exit_price = order.get('stop_price')
             if exit_price is None or np.isnan(exit_price):
                 exit_price = order.get('filled_price')
             if exit_price is not None and not np.isnan(exit_price):
-                signals.loc[currentBarIndex, 'price'] = exit_price
+                signals.price[currentRow] = exit_price
 
         # Final validation: VectorBT cannot handle overlapping signals on same bar
         # This should rarely trigger now with improved logic above
-        if (signals.loc[currentBarIndex, 'entries'].bool() and
-                signals.loc[currentBarIndex, 'exits'].bool()):
+        if signals.entries[currentRow] and signals.exits[currentRow]:
             self.LOGGER.debug(
                 f"[VBT] Warning: Still have conflicting long signals for {symbol} on same bar - clearing exit")
-            signals.loc[currentBarIndex, 'exits'] = False
+            signals.exits[currentRow] = False
 
-        if (signals.loc[currentBarIndex, 'short_entries'].bool() and
-                signals.loc[currentBarIndex, 'short_exits'].bool()):
+        if signals.short_entries[currentRow] and signals.short_exits[currentRow]:
             self.LOGGER.debug(
                 f"[VBT] Warning: Still have conflicting short signals for {symbol} on same bar - clearing short exit")
-            signals.loc[currentBarIndex, 'short_exits'] = False
+            signals.short_exits[currentRow] = False
+
+    def _get_current_bar_row(self, symbol: str) -> Optional[int]:
+        """ Position of the current backtest bar in the symbol's bar data (the first bar when the step spans several bars)."""
+        if symbol in self._BAR_TIMESTAMPS:
+            current_time = self.get_current_time.replace(tzinfo=datetime.timezone.utc)
+            previous_time = current_time if self.PreviousTime is None else self.PreviousTime.replace(
+                tzinfo=datetime.timezone.utc)
+            rows = self._locate_bar_rows(symbol, previous_time, current_time)
+            return None if rows is None else rows[0]
+        bar = self._get_current_bar(symbol)
+        if bar is None or bar.empty:
+            return None
+        return self._SIGNALS[symbol].get_row(bar.index[0])
+
+    def _materialize_signals(self, symbol: Optional[str] = None):
+        """ Build the VectorBT signals DataFrame (HISTORICAL_DATA[symbol]['signals']) from the recorded signals."""
+        for signalSymbol in ([symbol] if symbol is not None else list(self._SIGNALS)):
+            if signalSymbol in self._SIGNALS and signalSymbol in self.HISTORICAL_DATA:
+                self.HISTORICAL_DATA[signalSymbol]['signals'] = self._SIGNALS[signalSymbol].to_frame()
 
     def _update_order(self, order: IOrder):
         if self.Orders.get(order['order_id']):
@@ -1002,7 +1318,7 @@ class PaperBroker(BaseBroker):
                         # Simply add to pending orders and let it accumulate
                         self.LOGGER.debug(
                             f"[DCA] Order for {order['asset']['symbol']} is DCA accumulation - allowing to proceed")
-                        self.PENDING_ORDERS.append(order)
+                        self._queue_pending_order(order)
                         return
 
                     # Handle position closure/reversal logic (existing logic for opposite direction orders)
@@ -1011,54 +1327,53 @@ class PaperBroker(BaseBroker):
                     tempCloseOrder = order.copy()
                     conflicting = False
                     # self.LOGGER.debug(f"[AUDIT] Processing new order {order['order_id']} {order['asset']['symbol']} {order['side']} {order['qty']}. Active orders: {len(self.ACTIVE_ORDERS)}")
-                    for i, activeOrder in enumerate(list(self.ACTIVE_ORDERS)):
+                    for activeOrder in list(self.ACTIVE_ORDERS.values()):
                         # self.LOGGER.debug(f"[AUDIT] Checking vs {activeOrder['order_id']} {activeOrder['asset']['symbol']} {activeOrder['side']} {activeOrder['qty']} {activeOrder['status']}")
                         if activeOrder['asset']['symbol'] == order['asset']['symbol'] and \
                                 activeOrder['side'] != order['side'] and \
                                 (activeOrder['status'] == ITradeUpdateEvent.FILLED or activeOrder['status'] == ITradeUpdateEvent.PARTIAL_FILLED):
 
-                            if order in self.PENDING_ORDERS:
-                                # remove the order from the pending orders
-                                self.PENDING_ORDERS.remove(order)
+                            # remove the order from the pending orders
+                            self.PENDING_ORDERS.pop(order['order_id'], None)
 
                             if np.isclose(activeOrder['qty'], tempCloseOrder['qty'], atol=1e-8):
                                 # close the position
-                                self.ACTIVE_ORDERS.remove(activeOrder)
+                                del self.ACTIVE_ORDERS[activeOrder['order_id']]
 
                                 tempCloseOrder['order_id'] = activeOrder['order_id']
                                 tempCloseOrder['filled_price'] = activeOrder['filled_price']
                                 tempCloseOrder['filled_qty'] = activeOrder['filled_qty']
                                 tempCloseOrder['status'] = ITradeUpdateEvent.FILLED
-                                self.CLOSE_ORDERS.append(tempCloseOrder.copy())
+                                self._queue_close_order(tempCloseOrder.copy())
                                 tempCloseOrder['qty'] = 0
                                 conflicting = True
 
                             elif (activeOrder['qty'] - tempCloseOrder['qty']) > 1e-8:
-                                # partially close the position
-                                self.ACTIVE_ORDERS.remove(activeOrder)
+                                # partially close the position - re-queue the reduced active order at the back
+                                del self.ACTIVE_ORDERS[activeOrder['order_id']]
                                 # reduce the quantity of the active order
                                 activeOrder['qty'] = np.round(activeOrder['qty'] - tempCloseOrder['qty'], 8)
-                                self.ACTIVE_ORDERS.append(activeOrder)
+                                self.ACTIVE_ORDERS[activeOrder['order_id']] = activeOrder
 
                                 # send the close order to the close orders
                                 tempCloseOrder['order_id'] = activeOrder['order_id']
                                 tempCloseOrder['filled_price'] = activeOrder['filled_price']
                                 tempCloseOrder['filled_qty'] = tempCloseOrder['qty']
                                 tempCloseOrder['status'] = ITradeUpdateEvent.FILLED
-                                self.CLOSE_ORDERS.append(tempCloseOrder.copy())
+                                self._queue_close_order(tempCloseOrder.copy())
                                 tempCloseOrder['qty'] = 0
                                 conflicting = True
                             else:
                                 # close multiple positions. quantityLeft > 0
                                 quantityLeft = np.round(tempCloseOrder['qty'] - activeOrder['qty'], 8)
-                                self.ACTIVE_ORDERS.remove(activeOrder)
+                                del self.ACTIVE_ORDERS[activeOrder['order_id']]
                                 # send the close order for the active order
                                 tempCloseOrder['order_id'] = activeOrder['order_id']
                                 tempCloseOrder['qty'] = activeOrder['qty']
                                 tempCloseOrder['filled_price'] = activeOrder['filled_price']
                                 tempCloseOrder['filled_qty'] = tempCloseOrder['qty']
                                 tempCloseOrder['status'] = ITradeUpdateEvent.FILLED
-                                self.CLOSE_ORDERS.append(tempCloseOrder.copy())
+                                self._queue_close_order(tempCloseOrder.copy())
                                 tempCloseOrder['qty'] = quantityLeft
                                 conflicting = True
                                 continue
@@ -1070,14 +1385,18 @@ class PaperBroker(BaseBroker):
                     if tempCloseOrder['qty'] > 0 and conflicting:
                         # Add the order to the pending orders
                         order['qty'] = tempCloseOrder['qty']
-                        self.PENDING_ORDERS.append(order)
+                        self._queue_pending_order(order)
                         return
 
-                self.PENDING_ORDERS.append(order)
+                self._queue_pending_order(order)
+
+        def queued(orders: dict[uuid.UUID, IOrder], queuedOrder: Optional[IOrder]) -> bool:
+            # Same value semantics as the previous `queuedOrder in orders` list scan, via the order_id key
+            return queuedOrder is not None and orders.get(queuedOrder['order_id']) == queuedOrder
 
         def onFilledOrder():
-            if oldOrder in self.PENDING_ORDERS:
-                self.PENDING_ORDERS.remove(oldOrder)
+            if queued(self.PENDING_ORDERS, oldOrder):
+                del self.PENDING_ORDERS[oldOrder['order_id']]
 
                 # update position of the order
 
@@ -1093,7 +1412,7 @@ class PaperBroker(BaseBroker):
                             order['legs']['stop_loss']['status'] = ITradeUpdateEvent.PENDING_NEW
                             order['legs']['stop_loss']['updated_at'] = self.get_current_time
                     # Add the order to the active orders
-                    self.ACTIVE_ORDERS.append(order)
+                    self.ACTIVE_ORDERS[order['order_id']] = order
                     if self.MODE == IStrategyMode.BACKTEST:
                         # log the entry signal
                         self._log_signal(order, 'entry')
@@ -1109,7 +1428,7 @@ class PaperBroker(BaseBroker):
                         self.FILLED_ORDERS_HISTORY.append(trade_record)
                         self.LOGGER.debug(f"[PAPER DEBUG] Entry Order: {trade_record['date']} | {trade_record['side']} {trade_record['qty']} @ ${trade_record['price']:.2f}")
 
-            elif oldOrder in self.ACTIVE_ORDERS:
+            elif queued(self.ACTIVE_ORDERS, oldOrder):
                 # update position of the order
                 self._update_position(order)
 
@@ -1134,23 +1453,18 @@ class PaperBroker(BaseBroker):
 
             # Check if the position is completely closed and remove it from the positions dictionary - if the qty is 0 or None
             if self.Positions[order['asset']['symbol']].get(order['order_id']) == None:
-                if oldOrder in self.ACTIVE_ORDERS:
-                    self.ACTIVE_ORDERS.remove(oldOrder)
+                if queued(self.ACTIVE_ORDERS, oldOrder):
+                    del self.ACTIVE_ORDERS[oldOrder['order_id']]
 
-                if oldOrder in self.CLOSE_ORDERS:
-                    self.CLOSE_ORDERS.remove(oldOrder)
-            if order in self.CLOSE_ORDERS:
-                # This is when the order was sent and we are closing a position with another order id than the original order id - order is the updated order with the new order id and oldOrder is the original order (in the filled state)
-                self.CLOSE_ORDERS.remove(order)
+                self._dequeue_close_order(oldOrder)
+            # This is when the order was sent and we are closing a position with another order id than the original order id - order is the updated order with the new order id and oldOrder is the original order (in the filled state)
+            self._dequeue_close_order(order)
 
         def onCanceledOrder():
-            if oldOrder in self.ACTIVE_ORDERS or order in self.ACTIVE_ORDERS:
+            if queued(self.ACTIVE_ORDERS, oldOrder) or queued(self.ACTIVE_ORDERS, order):
                 """ Should not really happen as the order state check should be before have already happened when cancelling the order """
                 # if order is already filled oldOrder['status'] == ITradeUpdateEvent.CANCELED and oldOrder in self.CANCELED_ORDERS:
-                if oldOrder in self.CANCELED_ORDERS:
-                    self.CANCELED_ORDERS.remove(oldOrder)
-                if order in self.CANCELED_ORDERS:
-                    self.CANCELED_ORDERS.remove(order)
+                self.CANCELED_ORDERS.pop(order['order_id'], None)
 
                 raise BaseException({
                     "code": "already_filled",
@@ -1158,15 +1472,14 @@ class PaperBroker(BaseBroker):
                 })
 
             self._update_position(order)
-            if (oldOrder['status'] == ITradeUpdateEvent.NEW) or (oldOrder in self.PENDING_ORDERS):
+            if (oldOrder['status'] == ITradeUpdateEvent.NEW) or queued(self.PENDING_ORDERS, oldOrder):
                 # Remove the order from the pending orders if it is not filled and give your money back
-                self.PENDING_ORDERS.remove(oldOrder)
+                self.PENDING_ORDERS.pop(oldOrder['order_id'], None)
 
-            if oldOrder in self.CLOSE_ORDERS:
-                self.CLOSE_ORDERS.remove(oldOrder)
+            self._dequeue_close_order(oldOrder)
 
-            if oldOrder in self.CANCELED_ORDERS:
-                self.CANCELED_ORDERS.remove(oldOrder)
+            if queued(self.CANCELED_ORDERS, oldOrder):
+                del self.CANCELED_ORDERS[oldOrder['order_id']]
         try:
             match order['status']:
                 case ITradeUpdateEvent.NEW:
@@ -1183,8 +1496,78 @@ class PaperBroker(BaseBroker):
             self.LOGGER.warning(f"Error updating order: {e}")
 
         self.Orders[order['order_id']] = order
+        if order['status'] in self._FINAL_ORDER_STATES:
+            self._forget_order_legs(order)
+        else:
+            self._index_order_legs(order)
         return order
 
+    def _queue_close_order(self, closeOrder: IOrder):
+        """ Queue a close order under (order_id of the active order it closes, close sequence).
+        Two partial closes of the same active order within one step stay two close orders, processed in request order.
+        """
+        key = (closeOrder['order_id'], self._CLOSE_SEQ)
+        self._CLOSE_SEQ += 1
+        self.CLOSE_ORDERS[key] = closeOrder
+        self._CLOSE_KEYS.setdefault(closeOrder['order_id'], []).append(key)
+
+    def _dequeue_close_order(self, order: Optional[IOrder]) -> bool:
+        """ Remove the first queued close order equal to the order (the `order in CLOSE_ORDERS` / `remove` value
+        semantics of the close order list) - returns whether one was removed."""
+        if order is None:
+            return False
+        keys = self._CLOSE_KEYS.get(order['order_id'])
+        if not keys:
+            return False
+        for key in keys:
+            if self.CLOSE_ORDERS[key] == order:
+                keys.remove(key)
+                if not keys:
+                    del self._CLOSE_KEYS[order['order_id']]
+                del self.CLOSE_ORDERS[key]
+                return True
+        return False
+
+    def _index_order_legs(self, order: IOrder):
+        """ Record the take profit / stop loss leg order_ids of an order so leg lookups do not scan every order."""
+        if not order.get('legs'):
+            return
+        for leg in order['legs'].values():
+            if not leg or leg.get('order_id') is None:
+                continue
+            parents = self._LEG_PARENTS.setdefault(leg['order_id'], [])
+            if order['order_id'] not in parents:
+                parents.append(order['order_id'])
+
+    def _get_leg_parents(self, legId) -> list[tuple[uuid.UUID, IOrder]]:
+        """ Orders that currently hold a take profit or stop loss leg with the given order_id."""
+        parents = []
+        for parentId in self._LEG_PARENTS.get(legId, []):
+            parentOrder = self.Orders.get(parentId)
+            if parentOrder is None or not parentOrder.get('legs'):
+                continue
+            if any(leg and leg.get('order_id') == legId for leg in parentOrder['legs'].values()):
+                parents.append((parentId, parentOrder))
+        return parents
+
+    def _forget_leg(self, legId, parentId):
+        """ Drop the parent of a leg from the leg index."""
+        parents = self._LEG_PARENTS.get(legId)
+        if parents is None:
+            return
+        if parentId in parents:
+            parents.remove(parentId)
+        if not parents:
+            del self._LEG_PARENTS[legId]
+
+    def _forget_order_legs(self, order: IOrder):
+        """ Drop the legs of an order that left the order book (closed, canceled or rejected) from the leg index."""
+        if not order.get('legs'):
+            return
+        for leg in order['legs'].values():
+            if leg and leg.get('order_id') is not None:
+                self._forget_leg(leg['order_id'], order['order_id'])
+
     def execute_insight_order(self, insight: Insight, asset: IAsset):
         super().execute_insight_order(insight, asset)
         orderRequest: IOrderRequest = {
@@ -1227,6 +1610,9 @@ class PaperBroker(BaseBroker):
     def _submit_order(self, orderRequest: IOrderRequest) -> IOrder:
         # check if the buying power is enough to place the order
         try:
+            if self.SHARED_ACCOUNT is not None:
+                # the other shards moved the account since this broker last read it
+                self.update_account_balance()
             if orderRequest['type'] == IOrderType.MARKET:
                 currentBar = self._get_current_bar(
                     orderRequest['symbol'])
@@ -1349,89 +1735,102 @@ class PaperBroker(BaseBroker):
             trade, ITradeUpdate), 'Trade must be an instance of ITradeUpdate'
         return trade.order, trade.event
 
-    def _applyTA(self, asset: IMarketDataStream):
+    def _fetch_historical_bars(self, asset: IMarketDataStream) -> pd.DataFrame:
+        """ Load the stream's bars for the backtest range. Stored streams go through the history cache of their stored_path,
+        so only the part of the range that was never stored is downloaded."""
         symbol = asset['symbol'] if asset.get(
             'feature') == None else asset['feature']
-        if not asset.get('applyTA') or not asset.get('TA'):
-            return
-        self.LOGGER.info(f"Applying TA for: {symbol}")
-        self.HISTORICAL_DATA[symbol]['bar'].ta.study(asset['TA'])
-
-    def _load_historical_bar_data(self, asset: IMarketDataStream):
-        try:
-            bar_data_path = None
-            symbol = asset['symbol'] if asset.get(
-                'feature') == None else asset['feature']
-            if asset.get('stored') and asset.get('stored_path'):
-                bar_data_path = asset['stored_path'] + \
-                    f'/bar/{asset["symbol"]}_{asset["time_frame"]
-                                              }_{self.START_DATE}-{self.END_DATE}.h5'
-
-            if asset.get('stored'):
-                if asset['stored_path']:
-                    if os.path.exists(bar_data_path):
-                        self.LOGGER.info(f"Loading data from {bar_data_path}")
-                        self.HISTORICAL_DATA[symbol]['bar'] = pd.read_hdf(
-                            bar_data_path)
-                        # check if the data is empty
-                        if self.HISTORICAL_DATA[symbol]['bar'].empty:
-                            raise Exception({
-                                "code": "no_data",
-                                "data": {"symbol": symbol}
-                            })
-                        # apply the TA strategy
-                        self._applyTA(asset)
-                        self.LOGGER.info(
-                            self.HISTORICAL_DATA[symbol]['bar'].describe())
-                        return True
-                    else:
-                        raise BaseException({
-                            "code": "file_not_found",
-                            "data": {"path": bar_data_path}
-                        })
-                else:
-                    raise BaseException({
-                        "code": "path_not_provided",
-                        "data": {"path": asset['stored_path']}
-                    })
-        except Exception as e:
-            raise e
-        except BaseException as e:
-            self.LOGGER.error(f"Error: {e.args[0]['code']} {e.args[0]['data']['path']}")
+        cache = None
+        if asset.get('stored'):
+            if asset.get('stored_path'):
+                cache = self._get_history_cache(asset['stored_path'])
+                self.LOGGER.info(f"Loading data from {cache.store.root} for {asset['symbol']} {asset['time_frame']}")
+            else:
+                self.LOGGER.error(f"Error: path_not_provided {asset.get('stored_path')}")
 
         if self.DataFeed == 'yf':
-            # Populate the HISTORICAL_DATA with the bar data
-            self.HISTORICAL_DATA[symbol]['bar'] = self.get_history(
-                asset, self.START_DATE, self.END_DATE, asset['time_frame'], False)
+            bar = self.get_history(
+                asset, self.START_DATE, self.END_DATE, asset['time_frame'], False, cache=cache)
 
             # check if the data is empty
-            if self.HISTORICAL_DATA[symbol]['bar'].empty:
+            if bar.empty:
                 raise Exception({
                     "code": "no_data",
                     "data": {"symbol": symbol}
                 })
-            # apply the TA strategy
-            self._applyTA(asset)
+            return bar
 
-            self.LOGGER.info(f"Loaded data for {symbol}")
-            self.LOGGER.info(self.HISTORICAL_DATA[symbol]['bar'].describe())
-            # if a stored path is provided save the data to the path
-            if asset.get('stored_path'):
-                # Create the directory if it does not exist
-                Path(asset['stored_path']+'/bar').mkdir(
-                    parents=True, exist_ok=True)
-                # Save the data to the path
-                self.LOGGER.info(self.HISTORICAL_DATA[symbol]['bar'].head(10))
+        raise BaseException({
+            "code": "feed_not_supported",
+            "data": {"feed": self.DataFeed}
+        })
 
-                # Save the data to the path in hdf5 format
-                self.LOGGER.info(f"Saving data to {bar_data_path}")
-                self.HISTORICAL_DATA[symbol]['bar'].to_hdf(
-                    bar_data_path, mode='a', key=asset["exchange"], index=True, format='table')
+    async def _load_historical_streams(self, assets: list[IMarketDataStream]) -> list[Optional[pd.DataFrame]]:
+        """ Load, validate and apply TA to every bar stream concurrently.
+        Downloads and file IO run in a bounded thread pool, the TA studies in a process pool (see PROCESS_TA).
+        The TA of a stream is computed once over the whole history, the study entries that read future bars are
+        left out and recorded in PREEMPTIVE_TA (see build_feature_matrix).
+        Results are returned in the order of `assets` - None for the streams that failed to load, a failure never stops the other streams.
+        """
+        loop = asyncio.get_running_loop()
+        results: list[Optional[pd.DataFrame]] = [None] * len(assets)
+        ta_assets = [asset for asset in assets if asset.get('applyTA') and asset.get('TA')]
 
-            return True
+        ta_pool = None
+        if self.PROCESS_TA and ta_assets:
+            try:
+                # The study is sent to the workers - make sure it can be
+                pickle.dumps(ta_assets[0]['TA'])
+                # spawn - forking a process with running threads (io pool, UI / SSM servers) can deadlock
+                ta_pool = ProcessPoolExecutor(max_workers=min(
+                    self.LOAD_WORKERS or os.cpu_count() or 1, os.cpu_count() or 1, len(ta_assets)),
+                    mp_context=multiprocessing.get_context("spawn"))
+            except Exception as e:
+                self.LOGGER.warning(f"TA process pool not available, applying TA in threads: {e}")
+                ta_pool = None
+
+        async def apply_ta(io_pool: ThreadPoolExecutor, bar: pd.DataFrame, study) -> tuple[pd.DataFrame, list[dict]]:
+            nonlocal ta_pool
+            if ta_pool is not None:
+                try:
+                    return await loop.run_in_executor(ta_pool, build_feature_matrix, bar, study, self.LOOKAHEAD_PROBE)
+                except BrokenProcessPool as e:
+                    self.LOGGER.warning(f"TA process pool failed, applying TA in threads: {e}")
+                    ta_pool = None
+            return await loop.run_in_executor(io_pool, build_feature_matrix, bar, study, self.LOOKAHEAD_PROBE)
+
+        async def load(i: int, io_pool: ThreadPoolExecutor, asset: IMarketDataStream):
+            symbol = asset.get("feature") or asset["symbol"]
+            started = timeit.default_timer()
+            try:
+                # the cache keeps the raw bars, the TA is always applied on load
+                bar = await loop.run_in_executor(io_pool, self._fetch_historical_bars, asset)
+                fetched = timeit.default_timer()
+                if asset.get('applyTA') and asset.get('TA'):
+                    self.LOGGER.info(f"Applying TA for: {symbol}")
+                    bar, lookahead = await apply_ta(io_pool, bar, asset['TA'])
+                    self.PREEMPTIVE_TA[symbol] = lookahead
+                    if lookahead:
+                        self.LOGGER.warning(
+                            f"TA for {symbol} reads future bars and is computed bar by bar: {[spec.get('kind') for spec in lookahead]}")
+                studied = timeit.default_timer()
+                results[i] = bar
+                self.LOGGER.info(
+                    f"Loaded data for {symbol}: {len(bar)} bars in {timeit.default_timer() - started:.2f}s (load {fetched - started:.2f}s, TA {studied - fetched:.2f}s)")
+            except (asyncio.CancelledError, KeyboardInterrupt, SystemExit):
+                raise
+            except BaseException as e:
+                self.LOGGER.error(
+                    f"Error loading historical data for {symbol} after {timeit.default_timer() - started:.2f}s: {e}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.LOAD_WORKERS) as io_pool:
+                await asyncio.gather(*(load(i, io_pool, asset) for i, asset in enumerate(assets)))
+        finally:
+            if ta_pool is not None:
+                ta_pool.shutdown(wait=False, cancel_futures=True)
+        return results
 
-        else:
-            self.LOGGER.error('DataFeed not supported')
     async def streamMarketData(self, callback, assetStreams):
         """Listen to market data and call the async callback with the data.
 
@@ -1444,40 +1843,25 @@ class PaperBroker(BaseBroker):
         # BACKTEST mode
         # -------------------
         if self.MODE == IStrategyMode.BACKTEST:
-            # load historical data
-            for asset in assetStreams:
+            # load historical data - all bar streams concurrently, results in stream order
+            load_assets = [asset for asset in assetStreams if asset["type"] == "bar"]
+            load_started = timeit.default_timer()
+            loaded_bars = await self._load_historical_streams(load_assets)
+            self.LOGGER.info(
+                f"Loaded {sum(bar is not None for bar in loaded_bars)}/{len(load_assets)} bar streams in {timeit.default_timer() - load_started:.2f}s")
+            for asset, bar in zip(load_assets, loaded_bars):
                 try:
                     symbol = asset.get("feature") or asset["symbol"]
-                    if asset["type"] != "bar":
-                        continue
-                    else:
-                        self.HISTORICAL_DATA[symbol] = {}
-
-                    # run load in a thread to avoid blocking event loop
-                    loaded = await asyncio.to_thread(self._load_historical_bar_data, asset)
-                    if not loaded:
+                    if bar is None:
                         assetStreams.remove(asset)
                         continue
+                    self.HISTORICAL_DATA[symbol] = {'bar': bar}
+                    self.LOGGER.info(bar.describe())
 
-                    # set up signals dataframe synchronously (cheap)
+                    # set up the signal recorder synchronously (cheap) - the signals dataframe is only built for VBT
                     if asset.get("feature") is None:
-                        bar_df = self.HISTORICAL_DATA[symbol]["bar"]
-                        size = bar_df.shape[0]
-                        signals_df = pd.DataFrame(
-                            {
-                                "entries": np.zeros(size),
-                                "short_entries": np.zeros(size),
-                                "exits": np.zeros(size),
-                                "short_exits": np.zeros(size),
-                                "price": np.zeros(size),
-                                "qty": np.zeros(size),
-                            },
-                            index=bar_df.index,
-                        )
-                        signals_df[["entries", "exits", "short_entries", "short_exits"]] = False
-                        signals_df[["qty"]] = 0
-                        signals_df[["price"]] = np.nan
-                        self.HISTORICAL_DATA[symbol]["signals"] = signals_df
+                        self._SIGNALS[symbol] = SignalRecorder(
+                            self.HISTORICAL_DATA[symbol]["bar"].index)
                         if TF is None:
                             TF = asset["time_frame"]
                     else:
@@ -1488,8 +1872,12 @@ class PaperBroker(BaseBroker):
                             inplace=True,
                         )
                         hasFeature = True
+                    # build the bar lookup index once the bar data is final
+                    self._index_bar_data(symbol)
                 except Exception as e:
                     self.LOGGER.exception(f"Error loading historical data for {asset.get('symbol')}: {e}")
+                    self.HISTORICAL_DATA.pop(symbol, None)
+                    self.PREEMPTIVE_TA.pop(symbol, None)
                     try:
                         assetStreams.remove(asset)
                     except ValueError:
@@ -1505,10 +1893,15 @@ class PaperBroker(BaseBroker):
                 self.LOGGER.error("No historical data loaded, aborting market stream.")
                 self.RUNNING_MARKET_STREAM = False
                 return
+            if self.SKIP_EMPTY_STEPS:
+                self._build_step_timeline(bar_assets)
+            if TF is not None:
+                # one account snapshot per step
+                self.ACCOUNT_HISTORY.reserve(
+                    (self.END_DATE - self.START_DATE) // TF.to_timeDelta() + 2)
 
             # Main backtest streaming loop
             if self.VERBOSE > 0:
-                import datetime, timeit
                 self.LOGGER.debug(f"Running Backtest - {datetime.datetime.now()}")
                 start_time = timeit.default_timer()
 
@@ -1550,8 +1943,11 @@ class PaperBroker(BaseBroker):
                                         self.LOGGER.exception("Error streaming bar back to strategy")
                                         continue
                             else:
-                                # non-feature: get the current bar (assume _get_current_bar is lightweight)
-                                barData = await asyncio.to_thread(self._get_current_bar, symbol)
+                                # non-feature: get the current bar - indexed lookups are cheap enough to run inline
+                                if symbol in self._BAR_TIMESTAMPS:
+                                    barData = self._get_current_bar(symbol)
+                                else:
+                                    barData = await asyncio.to_thread(self._get_current_bar, symbol)
                                 if barData is None or barData.empty:
                                     continue
                                 await callback(barData, timeframe=asset["time_frame"])
@@ -1560,7 +1956,22 @@ class PaperBroker(BaseBroker):
                         except Exception:
                             self.LOGGER.exception(f"Error producing bars for asset {asset.get('symbol')}")
                             continue
-                    
+
+                    if self._MARKET_STEP_HOOK is not None:
+                        try:
+                            await self._MARKET_STEP_HOOK()
+                        except asyncio.CancelledError:
+                            raise
+                        except Exception:
+                            self.LOGGER.exception("Error in market step hook")
+
+                    if self._can_fast_forward():
+                        # Nothing is live for the insight listener or trade stream - skip the step handshake
+                        self._FAST_FORWARD_STEPS += 1
+                        self.update_account_history()
+                        self.setCurrentTime(self._get_next_step_time(TF))
+                        await asyncio.sleep(0)
+                        continue
 
                     # signal market done for this timestep
                     self.LOGGER.debug(f"market step {self.BACKTEST_FlOW_CONTROL._step_id}: reporting market")
@@ -1580,8 +1991,8 @@ class PaperBroker(BaseBroker):
                     self.LOGGER.debug("Market: trade step completed, updating account and advancing time")
                     # log accounts etc
                     self.update_account_history()
-                    # advance time to next increment
-                    self.setCurrentTime(TF.get_next_time_increment(self.get_current_time))
+                    # advance time to next increment (or next bar when skipping empty steps)
+                    self.setCurrentTime(self._get_next_step_time(TF))
 
                     # prepare coordinator for next step
                     await self.BACKTEST_FlOW_CONTROL.step_complete()
@@ -1598,6 +2009,8 @@ class PaperBroker(BaseBroker):
 
                 if self.VERBOSE > 0:
                     self.LOGGER.debug(f"Backtest Completed: {timeit.default_timer() - start_time}")
+                if self.FAST_FORWARD:
+                    self.LOGGER.info(f"Fast forwarded {self._FAST_FORWARD_STEPS} backtest steps")
         elif  self.MODE == IStrategyMode.LIVE:
             # -------------------
             # LIVE mode
@@ -1728,7 +2141,7 @@ class PaperBroker(BaseBroker):
                 This would mean that the order would still be active and could be filled later on, thus adjusting the position size.
                 which would make the results inconsistent with the actual orders placed.
 
-                self.CLOSE_ORDERS.append(marketCloseOrder)
+                self._queue_close_order(marketCloseOrder)
                 then we can process the rest in the self._update_order() method
             """
             self._update_order(marketCloseOrder)
@@ -1791,6 +2204,14 @@ class PaperBroker(BaseBroker):
                 else:
                     previous_time = convert_to_utc(self.PreviousTime)
 
+                if symbol in self._BAR_TIMESTAMPS:
+                    # Fast path - binary search over the precomputed timestamp index
+                    rows = self._locate_bar_rows(
+                        symbol, previous_time, current_time)
+                    if rows is None:
+                        return None
+                    return self.HISTORICAL_DATA[symbol]['bar'].iloc[rows[0]:rows[1]]
+
                 found = find_next_bar(previous_time, current_time)
                 if found == None:
                     return None
@@ -1847,11 +2268,118 @@ class PaperBroker(BaseBroker):
 
         # raise NotImplementedError(f'Mode {self.MODE} not supported')
 
-    def get_VBT_results(self, timeFrame: ITimeFrame) -> dict[str, vbt.Portfolio]:
+    def set_fast_forward_guard(self, guard: Optional[Callable[[], bool]]):
+        """Registers the strategy callback used by FAST_FORWARD to check that no insight is live."""
+        self._FAST_FORWARD_GUARD = guard
+
+    def set_market_step_hook(self, hook: Optional[Callable[[], Awaitable[None]]]):
+        """Registers the strategy callback awaited after the bars of each backtest step were streamed."""
+        self._MARKET_STEP_HOOK = hook
+
+    def _has_live_orders(self) -> bool:
+        """Returns True if any order still needs to be processed by the trade stream."""
+        return bool(self.PENDING_ORDERS or self.ACTIVE_ORDERS or self.CLOSE_ORDERS or self.UPDATE_ORDERS or self.CANCELED_ORDERS)
+
+    def _can_fast_forward(self) -> bool:
+        """Returns True if the current backtest step can skip the market -> insight -> trade handshake.
+        Falls back to lock-step as soon as an order or a live insight exists.
+        """
+        if not self.FAST_FORWARD or self._FAST_FORWARD_GUARD is None:
+            return False
+        if self._has_live_orders():
+            return False
+        return self._FAST_FORWARD_GUARD()
+
+    def _build_step_timeline(self, assetStreams: List[IMarketDataStream]):
+        """Builds the union of all loaded bar timestamps once so the backtest clock can skip steps without data."""
+        self._STEP_TIMESTAMPS = None
+        timestamps = []
+        for asset in assetStreams:
+            symbol = asset.get("feature") or asset["symbol"]
+            if symbol not in self._BAR_TIMESTAMPS:
+                self.LOGGER.warning(
+                    f"Skip empty steps disabled - no bar index for {symbol}")
+                return
+            timestamps.append(self._BAR_TIMESTAMPS[symbol])
+        if not timestamps:
+            return
+        self._STEP_TIMESTAMPS = np.unique(np.concatenate(timestamps))
+        self.LOGGER.info(
+            f"Skip empty steps enabled - {len(self._STEP_TIMESTAMPS)} steps with data")
+
+    def _get_next_step_time(self, timeFrame: ITimeFrame) -> datetime.datetime:
+        """Returns the time of the next backtest step.
+        With SKIP_EMPTY_STEPS the clock jumps straight to the next time increment where at least one asset has a bar, or past the END_DATE once the data is exhausted.
+        """
+        nextTime = timeFrame.get_next_time_increment(self.get_current_time)
+        if not self.SKIP_EMPTY_STEPS or self._STEP_TIMESTAMPS is None:
+            return nextTime
+
+        position = int(np.searchsorted(self._STEP_TIMESTAMPS, pd.Timestamp(
+            nextTime.replace(tzinfo=datetime.timezone.utc)).value, side='left'))
+        if position >= len(self._STEP_TIMESTAMPS):
+            # No more bars - move past the end of the backtest
+            return max(nextTime, timeFrame.get_next_time_increment(self.END_DATE))
+
+        dataTime = pd.Timestamp(int(self._STEP_TIMESTAMPS[position])).to_pydatetime(
+            warn=False).replace(tzinfo=nextTime.tzinfo)
+        # Bars that are not on a time increment are picked up by the following increment
+        stepTime = timeFrame.get_time_increment(dataTime)
+        if stepTime != dataTime:
+            stepTime = timeFrame.get_next_time_increment(dataTime)
+        return max(nextTime, stepTime)
+
+    def _index_bar_data(self, symbol: str):
+        """Precompute the int64 (UTC ns) timestamp index of a symbol's backtest bars.
+        The index is only used when the bars are sorted and belong to a single symbol, otherwise `_get_current_bar` falls back to the MultiIndex lookup.
+        """
+        self._BAR_TIMESTAMPS.pop(symbol, None)
+        self._BAR_CURSORS.pop(symbol, None)
+        bar_df = self.HISTORICAL_DATA.get(symbol, {}).get('bar')
+        if not isinstance(bar_df, pd.DataFrame) or not isinstance(bar_df.index, pd.MultiIndex):
+            return
+        try:
+            symbols = bar_df.index.get_level_values('symbol')
+            timestamps = pd.DatetimeIndex(
+                bar_df.index.get_level_values('timestamp'))
+        except (KeyError, TypeError, ValueError) as e:
+            self.LOGGER.debug(f"Bar index not built for {symbol}: {e}")
+            return
+        if not (symbols == symbol).all() or not timestamps.is_monotonic_increasing:
+            self.LOGGER.debug(
+                f"Bar index not built for {symbol}: bars are not sorted or contain other symbols")
+            return
+        self._BAR_TIMESTAMPS[symbol] = np.asarray(
+            timestamps.asi8, dtype=np.int64)
+
+    def _locate_bar_rows(self, symbol: str, start: datetime.datetime, end: datetime.datetime) -> Optional[tuple[int, int]]:
+        """Returns the [first, last) row positions of the bar at `end`, or of the bars between `start` and `end` if there is no exact match.
+        Matches the `.loc[idx[symbol, end:end]]` then `.loc[idx[symbol, start:end]]` lookup. Repeated lookups for the same step are served from the cursor.
+        """
+        start_ns = pd.Timestamp(start).value
+        end_ns = pd.Timestamp(end).value
+        cursor = self._BAR_CURSORS.get(symbol)
+        if cursor is not None and cursor[0] == start_ns and cursor[1] == end_ns:
+            first, last = cursor[2], cursor[3]
+        else:
+            timestamps = self._BAR_TIMESTAMPS[symbol]
+            last = int(np.searchsorted(timestamps, end_ns, side='right'))
+            first = int(np.searchsorted(timestamps, end_ns, side='left'))
+            if first == last:
+                first = int(np.searchsorted(
+                    timestamps, start_ns, side='left'))
+            self._BAR_CURSORS[symbol] = (start_ns, end_ns, first, last)
+        if first >= last:
+            return None
+        return first, last
+
+    def get_VBT_results(self, timeFrame: ITimeFrame) -> dict[str, 'vbt.Portfolio']:
         """returns the backtest results from Vector BT - profit and loss,  profit and loss percentage, number of orders executed and filled, cag sharp rattio, percent win. etc."""
-        results: dict[str, vbt.Portfolio] = {}
+        # vectorbt (with quantstats, numba kernels) takes seconds to import - only load it for the results
+        import vectorbt as vbt
+        results: dict[str, 'vbt.Portfolio'] = {}
 
-        def calc_expectancy_ratio(trades: vbt.EntryTrades):
+        def calc_expectancy_ratio(trades: 'vbt.EntryTrades'):
             if len(trades) == 0:
                 return np.nan
 
@@ -1879,6 +2407,7 @@ class PaperBroker(BaseBroker):
         )
 
         if self.MODE == IStrategyMode.BACKTEST:
+            self._materialize_signals()
             for asset in tqdm(self.HISTORICAL_DATA.keys(), desc="Running VBT Backtest"):
                 # Use FILLED_ORDERS_HISTORY if available
                 trade_history = [t for t in self.FILLED_ORDERS_HISTORY if t['symbol'] == asset]
@@ -2164,6 +2693,7 @@ class PaperBroker(BaseBroker):
 
     def export_vbt_signals(self, asset, filename="vbt_signals.csv"):
         import pandas as pd
+        self._materialize_signals(asset)
         if asset in self.HISTORICAL_DATA and 'signals' in self.HISTORICAL_DATA[asset]:
             df = self.HISTORICAL_DATA[asset]['signals']
             df.to_csv(filename)
@@ -2175,30 +2705,37 @@ class PaperBroker(BaseBroker):
         if self.VERBOSE >= 2:
             self.LOGGER.info("Updating Account History")
             self.LOGGER.info(f"Account: {self.Account}")
-        self.ACCOUNT_HISTORY[self.get_current_time] = self.Account
+        account = self.Account
+        if self.SHARED_ACCOUNT is not None:
+            self.SHARED_ACCOUNT.update_positions(
+                self.SHARD, {symbol: position for symbol in self.Positions if (position := self.get_position(symbol))})
+        self.ACCOUNT_HISTORY.record(self.get_current_time, cash=account.cash, equity=account.equity, buying_power=account.buying_power,
+                                    margin=self._TOTAL_MARKET_VALUE / self.LEVERAGE, open_positions=self._OPEN_POSITIONS)
+
+    def get_account_history(self) -> pd.DataFrame:
+        """ Account snapshots per step as a DataFrame indexed by timestamp - cash, equity, buying_power, margin and open_positions."""
+        return self.ACCOUNT_HISTORY.to_frame()
 
     def update_account_balance(self):
         # Calculate total unrealized P&L across all positions
         # print("[AUDIT] Updating account balance")
 
         self.ACCOUNT.cash = max(np.round(self.ACCOUNT.cash, 2),0)
-        total_unrealized_pl = sum(
-            position.get('unrealized_pl', 0)
-            for positions in self.Positions.values()
-            for position in positions.values()
-        )
+        self._flush_position_aggregates()
+        if self.LOGGER.isEnabledFor(logging.DEBUG):
+            self._check_account_aggregates()
+
+        if self.SHARED_ACCOUNT is not None:
+            # the account over every shard
+            account = self.SHARED_ACCOUNT.update(self.SHARD, self._REALIZED_PL, self._TOTAL_UNREALIZED_PL,
+                                                 self._TOTAL_MARKET_VALUE, self._OPEN_POSITIONS)
+            self.ACCOUNT.cash, self.ACCOUNT.equity, self.ACCOUNT.buying_power = account.cash, account.equity, account.buying_power
+            return
 
-        # Calculate total market value of all open positions (ignore closed ones)
-        total_position_value = sum(
-            abs(position.get('market_value', 0))
-            for positions in self.Positions.values()
-            for position in positions.values()
-            if position.get('qty', 0) != 0
-        )
-        # Debug info: number of open positions and their total market value
-        open_positions = [p for positions in self.Positions.values() for p in positions.values() if p.get('qty', 0) != 0]
-        self.LOGGER.debug(f"[AUDIT] Open positions count: {len(open_positions)}; total market value: {total_position_value}")
-        # self.LOGGER.debug(f"[AUDIT] Open positions: {open_positions}")
+        # Running totals maintained by _update_position
+        total_unrealized_pl = self._TOTAL_UNREALIZED_PL
+        # Total market value of all open positions (ignore closed ones)
+        total_position_value = self._TOTAL_MARKET_VALUE
 
         # Update equity: cash + unrealized P&L
         self.ACCOUNT.equity = max(np.round(
@@ -2210,6 +2747,32 @@ class PaperBroker(BaseBroker):
             np.round(total_account_value_with_leverage - total_position_value, 2)), 0)
         self.LOGGER.debug(f"[AUDIT] Buying Power after calc: {self.ACCOUNT.buying_power}")
 
+    def _recompute_account_aggregates(self) -> tuple[float, float, int]:
+        """ Full recompute of the account aggregates over every position."""
+        total_unrealized_pl = sum(
+            position.get('unrealized_pl', 0)
+            for positions in self.Positions.values()
+            for position in positions.values()
+        )
+        open_positions = [p for positions in self.Positions.values() for p in positions.values() if p.get('qty', 0) != 0]
+        total_position_value = sum(abs(position.get('market_value', 0)) for position in open_positions)
+        self._TOTAL_UNREALIZED_PL = total_unrealized_pl
+        self._TOTAL_MARKET_VALUE = total_position_value
+        self._OPEN_POSITIONS = len(open_positions)
+        return total_unrealized_pl, total_position_value, len(open_positions)
+
+    def _check_account_aggregates(self):
+        """ Debug only - compare the running account aggregates with a full recompute and resync on drift."""
+        running = (self._TOTAL_UNREALIZED_PL, self._TOTAL_MARKET_VALUE, self._OPEN_POSITIONS)
+        total_unrealized_pl, total_position_value, open_positions = self._recompute_account_aggregates()
+        self.LOGGER.debug(f"[AUDIT] Open positions count: {open_positions}; total market value: {total_position_value}")
+
+        if not np.isclose(total_unrealized_pl, running[0], rtol=0, atol=1e-6, equal_nan=True) or \
+                not np.isclose(total_position_value, running[1], rtol=0, atol=1e-6, equal_nan=True) or \
+                open_positions != running[2]:
+            self.LOGGER.warning(
+                f"[AUDIT] Account aggregates out of sync - unrealized P&L {running[0]} != {total_unrealized_pl}, market value {running[1]} != {total_position_value}, open positions {running[2]} != {open_positions}")
+
     @property
     def Account(self) -> IAccount:
         """ Returns the state of the strategy."""
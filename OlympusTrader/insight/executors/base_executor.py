@@ -65,6 +65,10 @@ class BaseExecutor(abc.ABC):
     """Set of allowed alphas for the executor"""
     ALLOW_INSIGHT_CHANGE_STATE: bool = True
 
+    FILTER_VERSION: int = 0
+    """Bumped (on the class) whenever the state or allowed assets / alphas of an executor change, the strategy
+    recompiles its executor chains when it moves"""
+
     @abc.abstractmethod
     def __init__(self, strategy: BaseStrategy, state: InsightState, version: float = "1.0", allowed_assets:  Optional[set[str]] = None, allowed_alphas: Optional[set[str]] = None, allowed_insight_change_state: bool = True) -> None:
         self.NAME = self.__class__.__name__
@@ -108,7 +112,7 @@ class BaseExecutor(abc.ABC):
 
     def get_history(self, symbol: str) -> DataFrame:
         """Get the history of a symbol"""
-        return self.STRATEGY.history[symbol].loc[symbol]
+        return self.STRATEGY.history.view(symbol)
 
     def get_latest_bar(self, symbol: str) -> DataFrame:
         """Get the latest bar of a symbol"""
@@ -147,14 +151,29 @@ class BaseExecutor(abc.ABC):
         assert isinstance(
             state, InsightState), "State must be an instance of InsightState"
         self.state = state
+        BaseExecutor.FILTER_VERSION += 1
         return self
 
     def _add_allowed_asset(self, asset: str) -> Self:
         """Add an asset to the allowed assets"""
         self.ALLOWED_ASSETS.add(asset)
+        BaseExecutor.FILTER_VERSION += 1
         return self
 
     def _remove_allowed_asset(self, asset: str) -> Self:
         """Remove an asset from the allowed assets"""
         self.ALLOWED_ASSETS.remove(asset)
+        BaseExecutor.FILTER_VERSION += 1
+        return self
+
+    def _add_allowed_alpha(self, alpha: str) -> Self:
+        """Add an alpha to the allowed alphas"""
+        self.ALLOWED_ALPHAS.add(alpha)
+        BaseExecutor.FILTER_VERSION += 1
+        return self
+
+    def _remove_allowed_alpha(self, alpha: str) -> Self:
+        """Remove an alpha from the allowed alphas"""
+        self.ALLOWED_ALPHAS.remove(alpha)
+        BaseExecutor.FILTER_VERSION += 1
         return self
@@ -0,0 +1,45 @@
+from ..base_executor import BaseExecutor
+from ...insight import InsightState
+
+
+class GlobalRiskBudgetExecutor(BaseExecutor):
+    """
+    ### Global Risk Budget Executor
+    This executor keeps the insights of a strategy within a risk budget shared with other strategies (shards).
+
+    :param strategy (BaseStrategy): The strategy instance
+    :param budget (RiskBudget): The shared budget (usually a manager proxy handed out by ShardCoordinator)
+    :param state (InsightState): NEW reserves the insight notional and rejects the insight when it does not fit,
+        CLOSED / CANCELED / REJECTED release it.
+
+    #### How it works:
+    Register it last for NEW - once the quantity and entry price are set - and first for the terminal states, before
+    an executor removes the insight.
+    """
+
+    def __init__(self, strategy, budget, state: InsightState = InsightState.NEW, **kwargs):
+        super().__init__(strategy, state, "1.0", **kwargs)
+        self.budget = budget
+
+    def run(self, insight):
+        key = str(insight.INSIGHT_ID)
+        try:
+            if insight.state != InsightState.NEW:
+                self.budget.release(key)
+                return self.returnResults(True, True, "Released the global risk budget.")
+
+            price = insight.limit_price
+            if price is None:
+                price = self.get_latest_bar(insight.symbol)["close"]
+            if insight.quantity is None or price is None:
+                return self.returnResults(True, True, "Insight is not sized yet.")
+            notional = insight.quantity * price
+            if insight.uses_contract_size:
+                notional *= insight.ASSET.get("contract_size") or 1
+
+            if not self.budget.reserve(key, notional):
+                self.changeState(insight, InsightState.REJECTED, f"Global risk budget exceeded ({notional:.2f}): {self.budget.snapshot()}")
+                return self.returnResults(False, True, "Global risk budget exceeded.")
+            return self.returnResults(True, True)
+        except Exception as e:
+            return self.returnResults(False, False, f"Error checking the global risk budget: {e}")
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from types import NoneType
-from typing import List, Literal, TYPE_CHECKING, Optional, Self, Type, Union
+from typing import Callable, List, Literal, TYPE_CHECKING, Optional, Self, Type, Union
 from uuid import uuid4, UUID
 from numpy import isnan
 
@@ -120,6 +120,8 @@ class Insight:
     ]  # execution depends on
     state: InsightState = InsightState.NEW
     """State of the Insight"""
+    TERMINAL_STATES = (InsightState.CLOSED, InsightState.CANCELED, InsightState.REJECTED)
+    """States an insight does not leave on its own - archived by the InsightRegistry once handled"""
     createAt: datetime = datetime.now()
     updatedAt: datetime = datetime.now()
     filledAt: Optional[datetime] = None
@@ -143,6 +145,8 @@ class Insight:
     """Flag to check if the insight is the first to be filled for the execution - executor meta data"""
     _partial_filled_quantity: Optional[float] = None
     """Quantity patial filled for the insight"""
+    _ON_STATE_CHANGE: Optional[Callable[[Insight, InsightState], None]] = None
+    """Called with (insight, previous state) when the state changes - set by the InsightRegistry holding the insight"""
 
     MODE: IStrategyMode = IStrategyMode.LIVE
     BROKER: BaseBroker = None
@@ -497,7 +501,9 @@ class Insight:
                     self.state:^10} -> {state:^10}: {self.symbol:^8} : {self.strategyType} :",
                 message,
             )
-            self.state = state
+            previous, self.state = self.state, state
+            if self._ON_STATE_CHANGE is not None and previous != state:
+                self._ON_STATE_CHANGE(self, previous)
         else:
             print(
                 f"Updated Insight State: {self.state:^10} : {
@@ -1,2 +1,4 @@
 from .base_strategy import BaseStrategy
 from .strategy import Strategy
+from .host import StrategyHost
+from .sharding import ShardCoordinator
@@ -1,12 +1,13 @@
 from __future__ import annotations
 import abc
 import asyncio
-from dataclasses import asdict
+from dataclasses import asdict, replace
 import functools
 import os
 from pathlib import Path
+import threading
 from threading import BrokenBarrierError
-from time import sleep
+from time import monotonic, sleep
 from typing import Any, List, Optional, Literal, Self
 from uuid import uuid4, UUID
 import pandas as pd
@@ -20,7 +21,6 @@ from typing import TYPE_CHECKING
 import pandas_ta as ta
 import pytz
 from tqdm import tqdm
-from vectorbt.portfolio import Portfolio
 
 from ..broker.base_broker import BaseBroker
 from ..broker.interfaces import (
@@ -39,10 +39,18 @@ from .interfaces import (
     IMarketDataStream,
     IStrategyMetrics,
     IStrategyMode,
+    IStreamRoute,
 )
 from ..insight.insight import Insight, InsightState
 from ..utils.timeframe import ITimeFrame, ITimeFrameUnit
 from ..utils.types import AttributeDict
+from ..utils.historyBuffer import HistoryStore
+from ..utils.streamingTA import StreamingTA
+from ..utils.assetCache import AssetCache
+from ..utils.brokerStateCache import BrokerStateCache
+from ..utils.executorChains import ExecutorChains
+from ..utils.marketDataQueue import MarketDataQueue, OverflowPolicy
+from ..utils.insightRegistry import InsightArchive, InsightRegistry
 from ..utils.tools import ITradingTools
 
 from ..alpha.base_alpha import BaseAlpha
@@ -53,6 +61,10 @@ from OlympusTrader.insight.executors import BaseExecutor
 # from ..ui.base_ui import Dashboard
 import warnings
 
+if TYPE_CHECKING:
+    # vectorbt (and quantstats through it) is only loaded by the paper broker once the backtest results are computed
+    from vectorbt.portfolio import Portfolio
+
 
 import asyncio
 import functools
@@ -93,10 +105,10 @@ class BaseStrategy(abc.ABC):
     """Positions for the strategy"""
     ORDERS: Optional[dict[str, IOrder]] = field(default_factory=dict)
     """Orders for the strategy"""
-    HISTORY: dict[str, pd.DataFrame] = field(default_factory=dict)
-    """History for the strategy"""
-    INSIGHTS: dict[UUID, Insight] = field(default_factory=dict)
-    """Insights for the strategy"""
+    HISTORY: HistoryStore = field(default_factory=HistoryStore)
+    """History for the strategy - a ring buffer per symbol, `HISTORY[symbol]` is a DataFrame view of it"""
+    INSIGHTS: InsightRegistry = field(default_factory=InsightRegistry)
+    """Live insights for the strategy, indexed by state and symbol - terminal insights move to INSIGHTS.ARCHIVE"""
     UNIVERSE: dict[str, IAsset] = field(default_factory=dict)
     """Universe of assets for the strategy"""
    
@@ -151,7 +163,11 @@ class BaseStrategy(abc.ABC):
     shouldClosePartialFilledIfCancelled: bool = True
     """Insights that are partially filled and are cancelled should be closed if the insight is cancelled"""
     insightRateLimit: int = 1
-    """Insight rate limit"""
+    """Live mode: minimum seconds between two insight listener passes - events arriving sooner are handled together.
+    Insights an executor held back are tried again on the next pass"""
+    insightTimer: float = 60.0
+    """Live mode: seconds after which every insight is evaluated again even if no event marked it, for the executors
+    that act on time (expiry ...). 0 - only events"""
 
     BACKTESTING_CONFIG: IBacktestingConfig =  field(default_factory=lambda: IBacktestingConfig(preemptiveTA=False))
     """Backtesting configuration"""
@@ -168,6 +184,63 @@ class BaseStrategy(abc.ABC):
 
     # Internal Optimiser
     _MAX_HISTORY_SIZE: int = field(default=1000) # Max history size for the strategy
+    streamingTA: bool = field(default=True)
+    """Update the supported TA indicators (ema, sma, rsi, atr, macd, bbands) bar by bar instead of re-running the study over the history"""
+    _TA_ENGINES: dict[str, StreamingTA] = field(default_factory=dict, init=False)
+    """Streaming TA state per symbol"""
+    alphaWorkers: int = field(default=0)
+    """Run on_bar / generateInsights of each symbol in a thread pool of this size (0 - inline on the event loop).
+    Backtest bars are run together once every bar of the step is in the history, live bars up to alphaWorkers symbols
+    at a time from the market data queue - insights are registered in bar order"""
+    _ALPHA_POOL: Optional[ThreadPoolExecutor] = field(default=None, init=False)
+    """Thread pool for alphaWorkers"""
+    _ALPHA_QUEUE: list[tuple[str, pd.DataFrame]] = field(default_factory=list, init=False)
+    """Bars of the current backtest step / live market data batch waiting for the alpha pool"""
+    _ALPHA_LOCAL: threading.local = field(default_factory=threading.local, init=False)
+    """Insights added and orders submitted by an alpha pool thread - registered / submitted by the event loop once the
+    work is done"""
+    _STREAM_ROUTES: dict[tuple[str, str], IStreamRoute] = field(default_factory=dict, init=False)
+    """Bar routing table keyed by (symbol, time frame value) - see _routeStream"""
+    _STREAM_ROUTES_VERSION: Optional[tuple] = field(default=None, init=False)
+    """(stream count, resolution, tradeOnFeatureEvents) the routing table was built for"""
+    brokerStateTTL: float = field(default=1.0)
+    """Live mode: seconds the account / positions / orders fetched from the broker are reused before they are fetched
+    again, trade updates refresh them right away (0 - fetch on every read, always the case in backtests)"""
+    BROKER_STATE: Optional[BrokerStateCache] = field(default=None, init=False)
+    """Cached broker state snapshot - see brokerStateTTL, `BROKER_STATE.metrics()` reports the round trips it saved"""
+    _DIRTY_INSIGHTS: set[UUID] = field(default_factory=set, init=False)
+    """Live mode: insights an event may have changed the outcome of - the next insight listener pass evaluates them"""
+    _DIRTY_LOCK: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _INSIGHT_WAKE: Optional[asyncio.Event] = field(default=None, init=False)
+    """Set when insights are marked dirty, wakes the insight listener"""
+    _INSIGHT_LOOP: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False)
+    marketDataQueueSize: int = field(default=100)
+    """Live mode: bars of a symbol / time frame waiting for _on_bar before marketDataOverflow applies (0 - the broker
+    streams call _on_bar directly)"""
+    marketDataOverflow: OverflowPolicy = field(default="block")
+    """Live mode: what a full market data queue does with a new bar - block the broker stream, drop_oldest or coalesce"""
+    MARKET_DATA_QUEUE: Optional[MarketDataQueue] = field(default=None, init=False)
+    """Live mode market data queue - `MARKET_DATA_QUEUE.metrics()` reports the depth, drops and coalesced bars"""
+    market_data_queue: Optional[asyncio.Task] = field(default=None, init=False)
+    """Task feeding the market data queue to _on_bar"""
+    EXECUTOR_CHAINS: Optional[ExecutorChains] = field(default=None, init=False)
+    """INSIGHT_EXECUTORS compiled per (state, symbol, alpha) - `EXECUTOR_CHAINS.metrics()` reports the run time and
+    results of each executor"""
+    insightArchivePath: Optional[str] = field(default=None)
+    """JSON lines file every archived (closed, canceled, rejected) insight is appended to (None - memory only)"""
+    insightArchiveSize: int = field(default=10_000)
+    """Archived insights kept in memory for the UI"""
+    universeShard: Optional[set[str]] = field(default=None)
+    """Only the symbols of universe() in this set are loaded - the strategy runs one shard of the universe (see
+    ShardCoordinator). None - the whole universe"""
+    RISK_BUDGET: Optional[Any] = field(default=None, init=False)
+    """Global risk budget shared with the other shards (a RiskBudget proxy), None outside a sharded run"""
+    universeWorkers: int = field(default=8)
+    """Max concurrent broker get_ticker_info calls while loading the universe"""
+    assetCachePath: Optional[str] = field(default=None)
+    """Directory of the on-disk asset metadata cache (None - always ask the broker)"""
+    assetCacheTTL: datetime.timedelta = field(default_factory=lambda: datetime.timedelta(hours=24))
+    """How long cached asset metadata is used before it is fetched from the broker again"""
 
     # def __init__(
     #     self,
@@ -196,6 +269,11 @@ class BaseStrategy(abc.ABC):
         if not isinstance(self.VARIABLES, AttributeDict):
             self.VARIABLES = AttributeDict(self.VARIABLES)
 
+        if not isinstance(self.INSIGHTS, InsightRegistry):
+            self.INSIGHTS = InsightRegistry(self.INSIGHTS)
+        self.INSIGHTS.ARCHIVE = InsightArchive(self.insightArchivePath, self.insightArchiveSize)
+        self.EXECUTOR_CHAINS = ExecutorChains(self.INSIGHT_EXECUTORS)
+
         self.TOOLS = ITradingTools(self)
 
         # Validate timeframe
@@ -228,10 +306,16 @@ class BaseStrategy(abc.ABC):
             # self.BROKER.feed = IStrategyMode.BACKTEST
             pass
 
+        # Backtests read the in-memory paper state every bar - the equity moves with each bar, not with the clock
+        self.BROKER_STATE = BrokerStateCache(
+            {"account": self.BROKER.get_account, "positions": self.BROKER.get_positions, "orders": self.BROKER.get_orders},
+            ttl=0.0 if self.MODE == IStrategyMode.BACKTEST else self.brokerStateTTL,
+        )
+
         try:
-            self.ACCOUNT = self.BROKER.get_account()
-            self.POSITIONS = self.BROKER.get_positions()
-            self.ORDERS = self.BROKER.get_orders()
+            self.ACCOUNT = self.BROKER_STATE.get("account")
+            self.POSITIONS = self.BROKER_STATE.get("positions")
+            self.ORDERS = self.BROKER_STATE.get("orders")
 
             # Initialise the strategy metrics
             self.METRICS.updateStart(
@@ -469,6 +553,9 @@ class BaseStrategy(abc.ABC):
                 if hasattr(self, 'insight_listener') and not self.insight_listener.done():
                     self.insight_listener.cancel()
                     self.LOGGER.info("Cancelled insight_listener")
+                if self.market_data_queue is not None and not self.market_data_queue.done():
+                    self.market_data_queue.cancel()
+                    self.LOGGER.info("Cancelled market_data_queue")
                 
                 # Exiting the TaskGroup context will cancel all remaining tasks
                 self.LOGGER.info("Exiting TaskGroup...")
@@ -572,10 +659,14 @@ class BaseStrategy(abc.ABC):
             )
             self.LOGGER.info("Trade stream started")
 
+        # Run the step's alpha work before the broker reports the market step
+        if self.MODE == IStrategyMode.BACKTEST and self.alphaWorkers > 0 and hasattr(self.broker, "set_market_step_hook"):
+            self.broker.set_market_step_hook(self._runAlphaQueue)
+
         # Start market data stream
         if hasattr(self.broker, "streamMarketData"):
             self.market_data_stream = tg.create_task(
-            self.broker.streamMarketData(self._on_bar, self.STREAMS),
+            self.broker.streamMarketData(self._marketDataCallback(tg), self.STREAMS),
             name="market_data_stream",
             )
             self.LOGGER.info("Market data stream started")
@@ -634,6 +725,10 @@ class BaseStrategy(abc.ABC):
 
     async def _run_backtest_loop(self) -> None:
         """Backtest loop: waits for streams to start and controls backtest flow."""
+        # Allow the broker to stream bars back to back while no insight is live
+        if getattr(self.BROKER, "FAST_FORWARD", False):
+            self.BROKER.set_fast_forward_guard(self._can_fast_forward)
+
         # Wait until both market and trade streams are _RUNNING
         while not getattr(self.BROKER, 'RUNNING_MARKET_STREAM', False) or not getattr(self.BROKER, 'RUNNING_TRADE_STREAM', False):
             await asyncio.sleep(0.1)
@@ -657,6 +752,18 @@ class BaseStrategy(abc.ABC):
         if self.VERBOSE > 0:
             self.LOGGER.info("Backtest Completed:", timeit.default_timer() - start_time)
 
+    def _can_fast_forward(self) -> bool:
+        """Returns True if no insight needs the insight listener this step.
+        Insights in a terminal state only block the fast path while there are executors registered for their state,
+        the others are archived by the next listener pass.
+        """
+        if any(self.INSIGHTS.count(state) for state in (InsightState.NEW, InsightState.EXECUTED, InsightState.FILLED)):
+            return False
+        for state in Insight.TERMINAL_STATES:
+            if self.INSIGHTS.count(state) and len(self.INSIGHT_EXECUTORS[state]) > 0:
+                return False
+        return True
+
     async def run_teardown(self):
         """Clean up resources and save backtest results if applicable."""
         self.teardown()
@@ -667,6 +774,11 @@ class BaseStrategy(abc.ABC):
 
         self.ACCOUNT = self.BROKER.get_account()
         self.LOGGER.info(f"End Account: {self.ACCOUNT}")
+        if self.MODE != IStrategyMode.BACKTEST:
+            self.LOGGER.info(f"Broker state cache: {self.BROKER_STATE.metrics()}")
+        self.LOGGER.info(f"Executors: {self.EXECUTOR_CHAINS.metrics()}")
+        if self.MARKET_DATA_QUEUE is not None:
+            self.LOGGER.info(f"Market data queue: {self.MARKET_DATA_QUEUE.metrics()}")
         
         self.METRICS.updateEnd(
             (
@@ -729,8 +841,8 @@ class BaseStrategy(abc.ABC):
             SharedStrategyManager.register(
                 "get_insights",
                 callable=lambda: {
-                    str(key): asdict(insight.dataclass)
-                    for key, insight in self.INSIGHTS.items()
+                    **{record["insight_id"]: record for record in self.INSIGHTS.ARCHIVE.records()},
+                    **{str(key): asdict(insight.dataclass) for key, insight in self.INSIGHTS.items()},
                 },
             )
             # SharedStrategyManager.register(
@@ -759,29 +871,63 @@ class BaseStrategy(abc.ABC):
             self.LOGGER.error(f"Error in _startUISharedMemory: {e}")
             pass
 
+    async def _getBrokerState(self, kind: Literal["account", "positions", "orders"]):
+        """The cached broker state, fetched in a thread when it has to come from the broker."""
+        if self.BROKER_STATE.fresh(kind):
+            return self.BROKER_STATE.get(kind)
+        return await asyncio.to_thread(self.BROKER_STATE.get, kind)
+
     async def _insightListener(self):
         """Listen to the insights and manage the orders."""
         assert callable(
             self.executeInsight
         ), "executeInsight must be a callable function"
         self.LOGGER.info("Running Insight Listener")
-        self.ACCOUNT = await asyncio.to_thread(self.BROKER.get_account)
-        self.POSITIONS = await asyncio.to_thread(self.BROKER.get_positions)
+        self.ACCOUNT = await self._getBrokerState("account")
+        self.POSITIONS = await self._getBrokerState("positions")
         if self.POSITIONS == None:
             self.POSITIONS = {}
+        if self.MODE != IStrategyMode.BACKTEST:
+            self._INSIGHT_LOOP = asyncio.get_running_loop()
+            self._INSIGHT_WAKE = asyncio.Event()
+            self._markDirty(self.INSIGHTS.values())
+        timerDue = monotonic() + self.insightTimer
+        lastPass = 0.0
         try:
             while self._RUNNING:
 
                 if self.MODE == IStrategyMode.BACKTEST:
                     # Wait for market producers to finish this timestep
                     await self.BROKER.BACKTEST_FlOW_CONTROL.wait_for_market()
+                    batch = list(self.INSIGHTS)
                 else:
-                    await asyncio.sleep(self.insightRateLimit if (self.insightRateLimit >= 0) else 1)
-
-                for i in list(self.INSIGHTS):
+                    # Wait for an event to mark insights dirty (or the insight timer) and only evaluate those
+                    rateLimit = self.insightRateLimit if (self.insightRateLimit >= 0) else 1
+                    if monotonic() - lastPass < rateLimit:
+                        await asyncio.sleep(rateLimit - (monotonic() - lastPass))
+                    if self.insightTimer > 0:
+                        try:
+                            await asyncio.wait_for(self._INSIGHT_WAKE.wait(), max(timerDue - monotonic(), 0))
+                        except asyncio.TimeoutError:
+                            pass
+                        if monotonic() >= timerDue:
+                            self._markDirty(self.INSIGHTS.values())
+                            timerDue = monotonic() + self.insightTimer
+                    else:
+                        await self._INSIGHT_WAKE.wait()
+                    self._INSIGHT_WAKE.clear()
+                    lastPass = monotonic()
+                    with self._DIRTY_LOCK:
+                        dirty, self._DIRTY_INSIGHTS = self._DIRTY_INSIGHTS, set()
+                    batch = [i for i in self.INSIGHTS if i in dirty]
+
+                # terminal insights get this pass for their executors / executeInsight, then they are archived
+                terminal = [self.INSIGHTS[i] for i in batch if self.INSIGHTS[i].state in Insight.TERMINAL_STATES]
+                for i in batch:
                     insight = self.INSIGHTS.get(i, None)
                     if insight is None:
                         continue
+                    state = insight.state
                     try:
                         # if self.VERBOSE > 0:
                         # print(f'Execute Insight: {
@@ -790,10 +936,10 @@ class BaseStrategy(abc.ABC):
 
                         # Execute the insight Executors
                         passed = True
-                        for executor in self.INSIGHT_EXECUTORS[insight.state]:
-                            if not executor.should_run(insight):
-                                continue                            
-                            result = executor.run(self.INSIGHTS[insight.INSIGHT_ID])
+                        for executor in self.EXECUTOR_CHAINS.chain(insight):
+                            result = self.EXECUTOR_CHAINS.run(executor, self.INSIGHTS[insight.INSIGHT_ID])
+                            if result is None:
+                                continue
                             # Executor manage the insight state and mutates the insight
                             if not result.success:
                                 self.LOGGER.error(
@@ -807,6 +953,9 @@ class BaseStrategy(abc.ABC):
                             self.LOGGER.debug(f"Executor {result.executor}: {result.message}")
 
                         if not passed:
+                            # an executor held the insight back (buying power, market hours, a price condition ...)
+                            # - it is tried again on the next pass, at most once per insightRateLimit
+                            self._markDirty((insight,))
                             continue
 
                         # latestInsight = self.INSIGHTS.get(insight.INSIGHT_ID)
@@ -818,6 +967,9 @@ class BaseStrategy(abc.ABC):
                         # Change the flag to indicate that the insight has been ran once against the executor list
                         if insight.state == InsightState.FILLED and insight._first_on_fill:
                             insight._first_on_fill = False
+                        if insight.state != state:
+                            # the executors of the new state run on the next pass
+                            self._markDirty((insight,))
 
                         # if self.VERBOSE > 0:
                         # print('Time taken executeInsight:', symbol,
@@ -826,7 +978,9 @@ class BaseStrategy(abc.ABC):
                         continue
                     except Exception as e:
                         self.LOGGER.error("Error in _insightListener:", e)
+                        self._markDirty((insight,))
                         continue
+                self.INSIGHTS.archive(terminal)
 
                 if self.MODE == IStrategyMode.BACKTEST:
                     # signal insight stage done
@@ -844,8 +998,8 @@ class BaseStrategy(abc.ABC):
                 #         break
                 
                 # Update the account and positions
-                self.ACCOUNT = await asyncio.to_thread(self.BROKER.get_account)
-                self.POSITIONS = await asyncio.to_thread(self.BROKER.get_positions)
+                self.ACCOUNT = await self._getBrokerState("account")
+                self.POSITIONS = await self._getBrokerState("positions")
                 if self.POSITIONS == None:
                     self.POSITIONS = {}
         except asyncio.CancelledError:
@@ -857,6 +1011,8 @@ class BaseStrategy(abc.ABC):
 
     async def _on_trade_update(self, trade):
         """format the trade stream to the strategy."""
+        # the update changed the broker state - the next read fetches it
+        self.BROKER_STATE.invalidate()
         orderdata, event = self.BROKER.format_on_trade_update(trade)
         # check if there is data and that the order symbol is in the universe
         if orderdata and orderdata["asset"]["symbol"] not in self.UNIVERSE:
@@ -866,11 +1022,8 @@ class BaseStrategy(abc.ABC):
             f"Order: {event:<16} {orderdata['created_at']}: {orderdata['asset']['symbol']:^6}: {str(orderdata['filled_qty']):^8} / {orderdata['qty']:^8} : {orderdata['type']} / {orderdata['order_class']} : {orderdata['side']} @ {orderdata['limit_price'] if orderdata['limit_price'] is not None else orderdata['filled_price']} - {orderdata['order_id']}"
         )
         self.ORDERS[orderdata["order_id"]] = orderdata
-        for i, insight in self.INSIGHTS.items():
-            # Check if the insight is managing the order by checking the symbol
-            if insight.symbol != orderdata["asset"]["symbol"]:
-                continue
-
+        self._markDirty(self._orderInsights(orderdata["asset"]["symbol"], orderdata["order_id"]))
+        for insight in self.INSIGHTS.symbol(orderdata["asset"]["symbol"]):
             match insight.state:
                 case InsightState.NEW:
                     if orderdata["order_id"] == insight.order_id:
@@ -1119,18 +1272,61 @@ class BaseStrategy(abc.ABC):
     def _loadUniverse(self):
         """Loads the universe of the strategy."""
         assert callable(self.universe), "Universe must be a callable function"
-        universeSet = set(self.universe())
+        universeSet = list(dict.fromkeys(self.universe()))
+        if self.universeShard is not None:
+            universeSet = [symbol for symbol in universeSet if symbol in self.universeShard]
+        assets = self._fetchAssets(universeSet)
         for symbol in universeSet:
-            self._loadAsset(symbol)
+            self._loadAsset(symbol, assets.get(symbol))
         assert len(self.UNIVERSE) != 0, "No assets loaded into the universe"
 
         for asset in self.UNIVERSE.values():
             # Init all assets in the strategy
             self._init(asset)
 
-    def _loadAsset(self, symbol: str):
+    def _fetchAssets(self, symbols: List[str]) -> dict[str, Optional[IAsset]]:
+        """Asset metadata for the symbols - from the asset cache (see assetCachePath) when it is fresh,
+        the rest from the broker with up to universeWorkers concurrent requests."""
+        cache = None
+        if self.assetCachePath:
+            cache = AssetCache(self.assetCachePath, f"{self.BROKER.NAME.value}-{self.BROKER.DataFeed}", self.assetCacheTTL)
+        assets: dict[str, Optional[IAsset]] = {}
+        for symbol in symbols:
+            cached = cache.get(symbol) if cache is not None else None
+            if cached is not None:
+                assets[symbol] = cached
+                # later broker lookups are served from memory as well
+                self.BROKER.TICKER_INFO.setdefault(symbol, cached)
+        missing = [symbol for symbol in symbols if symbol not in assets]
+        if not missing:
+            return assets
+
+        workers = max(1, min(self.universeWorkers, len(missing))) if self.BROKER.CONCURRENT_TICKER_INFO else 1
+        started = timeit.default_timer()
+
+        def fetch(symbol: str) -> Optional[IAsset]:
+            try:
+                return self.BROKER.get_ticker_info(symbol)
+            except Exception as e:
+                self.LOGGER.error(f"Failed to get ticker info for {symbol}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for symbol, assetInfo in zip(missing, pool.map(fetch, missing)):
+                assets[symbol] = assetInfo
+                # failed lookups are not cached
+                if cache is not None and assetInfo:
+                    cache.put(symbol, assetInfo)
+        if cache is not None:
+            cache.save()
+        self.LOGGER.info(
+            f"Fetched {len(missing)} assets from the broker in {timeit.default_timer() - started:.2f}s ({len(symbols) - len(missing)} cached)")
+        return assets
+
+    def _loadAsset(self, symbol: str, assetInfo: Optional[IAsset] = None):
         """Loads the asset into the universe of the strategy."""
-        assetInfo = self.BROKER.get_ticker_info(symbol)
+        if assetInfo is None:
+            assetInfo = self.BROKER.get_ticker_info(symbol)
         if assetInfo and assetInfo["status"] == "active" and assetInfo["tradable"]:
             self.UNIVERSE[assetInfo["symbol"]] = assetInfo
             self.HISTORY[assetInfo["symbol"]] = pd.DataFrame()
@@ -1224,6 +1420,7 @@ class BaseStrategy(abc.ABC):
             executor._override_state(state)
 
         self.INSIGHT_EXECUTORS[executor.state].append(executor)
+        self.EXECUTOR_CHAINS.invalidate()
 
     def add_executors(self, executors: List[BaseExecutor], state: InsightState = None):
         """Adds a list of executors to the strategy."""
@@ -1247,9 +1444,51 @@ class BaseStrategy(abc.ABC):
         """Adds an insight to the strategy."""
         assert isinstance(insight, Insight), "insight must be of type Insight object"
 
+        pending = getattr(self._ALPHA_LOCAL, "insights", None)
+        if pending is not None:
+            # added from an alpha pool thread - registered in bar order once the work is merged
+            pending.append(insight)
+            return
+
         insight.set_mode(self.BROKER, self.assets[insight.symbol], self.MODE)
 
         self.INSIGHTS[insight.INSIGHT_ID] = insight
+        self._markDirty((insight,))
+
+    def _markDirty(self, insights: Iterable[Insight]):
+        """Live mode: queue the insights for the next insight listener pass and wake it. Safe to call from the broker
+        stream threads."""
+        if self.MODE == IStrategyMode.BACKTEST:
+            # backtests evaluate every insight on every step
+            return
+        with self._DIRTY_LOCK:
+            size = len(self._DIRTY_INSIGHTS)
+            self._DIRTY_INSIGHTS.update(insight.INSIGHT_ID for insight in insights)
+            if len(self._DIRTY_INSIGHTS) == size:
+                return
+        if self._INSIGHT_WAKE is None:
+            # the listener marks every insight when it starts
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._INSIGHT_LOOP:
+            self._INSIGHT_WAKE.set()
+        elif not self._INSIGHT_LOOP.is_closed():
+            self._INSIGHT_LOOP.call_soon_threadsafe(self._INSIGHT_WAKE.set)
+
+    def _orderInsights(self, symbol: str, orderId: str) -> list[Insight]:
+        """The symbol's insights the order belongs to - entry, close, partial close or leg order."""
+        insights = []
+        for insight in self.INSIGHTS.symbol(symbol):
+            orderIds = {insight.order_id, insight.close_order_id}
+            if insight.legs:
+                orderIds.update(leg["order_id"] for leg in (insight.takeProfitOrderLeg, insight.stopLossOrderLeg, insight.trailingStopOrderLeg) if leg)
+            orderIds.update(partialClose["order_id"] for partialClose in insight.partial_closes)
+            if orderId in orderIds:
+                insights.append(insight)
+        return insights
 
     async def _on_bar(self, bar: Any, timeframe: ITimeFrame):
         """format the bar stream to the strategy."""
@@ -1269,9 +1508,9 @@ class BaseStrategy(abc.ABC):
                 self.LOGGER.warning("Bar is None or empty in _on_bar")
                 return
 
-            self.ACCOUNT = self.BROKER.get_account()
-            self.POSITIONS = self.BROKER.get_positions()
-            self.ORDERS = self.BROKER.get_orders() or {}
+            self.ACCOUNT = self.BROKER_STATE.get("account")
+            self.POSITIONS = self.BROKER_STATE.get("positions")
+            self.ORDERS = self.BROKER_STATE.get("orders") or {}
             self.POSITIONS = self.POSITIONS or {}
 
             symbol, timestamp = None, None
@@ -1289,53 +1528,46 @@ class BaseStrategy(abc.ABC):
                     self.LOGGER.warning("Symbol is None - ignoring BaseStrategy_on_bar")
                     return
                 # Feature event check
-                isFeature = False
-                for stream in self.STREAMS:
-                    if (
-                        stream["type"] == "bar"
-                        and (stream["symbol"] == symbol or stream["feature"] == symbol)
-                        and stream["time_frame"].value != self.resolution.value
-                    ):
-                        if stream["time_frame"].value == timeframe.value and stream["time_frame"].is_time_increment(timestamp):
-                            isFeature = True
-                            # Update the feature symbol name
-                            if stream["feature"] != symbol:
-                                data.rename(index={symbol: stream["feature"]}, inplace=True)
-                                symbol = stream["feature"]
-                            self.LOGGER.info(f"Feature Bar is part of the resolution of the strategy: {symbol} - {timestamp} - {datetime.datetime.now()}")
-                            break
+                route = self._routeStream(symbol, timeframe)
+                isFeature = route.feature is not None and route.time_frame.is_time_increment(timestamp)
+                if isFeature:
+                    # Update the feature symbol name
+                    if route.feature != symbol:
+                        data.rename(index={symbol: route.feature}, inplace=True)
+                        symbol = route.feature
+                    self.LOGGER.info(f"Feature Bar is part of the resolution of the strategy: {symbol} - {timestamp} - {datetime.datetime.now()}")
                 if (
-                    self.resolution.value == timeframe.value
+                    route.isResolution
                     and self.resolution.is_time_increment(timestamp)
                 ) or isFeature:
                     if self.VERBOSE > 0:
                         self.LOGGER.info(f"New Bar is part of the resolution of the strategy: {symbol} - {timestamp} - {datetime.datetime.now()}")
                         start_time = timeit.default_timer()
-                    # Append to history and remove duplicates
-                    self.HISTORY[symbol] = pd.concat([self.HISTORY[symbol], data])
-                    self.HISTORY[symbol] = self.HISTORY[symbol].loc[
-                        ~self.HISTORY[symbol].index.duplicated(keep="first")
-                    ]
-                    
-                    # Truncate history to prevent memory leaks and slow TA calculations
+                    # Append to history (duplicates are ignored) and truncate it to prevent memory leaks and slow TA calculations
                     MAX_HISTORY_SIZE = self.WARM_UP + self._MAX_HISTORY_SIZE # Keep a buffer above warm up
-                    if len(self.HISTORY[symbol]) > MAX_HISTORY_SIZE:
-                         self.HISTORY[symbol] = self.HISTORY[symbol].iloc[-MAX_HISTORY_SIZE:]
+                    history = self.HISTORY.append(symbol, data, MAX_HISTORY_SIZE)
 
-                    if len(self.HISTORY[symbol]) < self.WARM_UP:
-                        self.LOGGER.info(f"Waiting for warm up: {symbol} - {len(self.HISTORY[symbol])} / {self.WARM_UP}")
+                    if len(history) < self.WARM_UP:
+                        self.LOGGER.info(f"Waiting for warm up: {symbol} - {len(history)} / {self.WARM_UP}")
                         return
-                    if (
-                        not self.BACKTESTING_CONFIG.get("preemptiveTA")
-                        and self.MODE == IStrategyMode.BACKTEST
-                    ) or (self.MODE != IStrategyMode.BACKTEST):
-                        self.HISTORY[symbol].ta.study(self.TaStrategy)
+                    if self.MODE == IStrategyMode.BACKTEST and symbol in self.BROKER.PREEMPTIVE_TA:
+                        # The bar already carries the TA computed over the whole history, only the entries that
+                        # read future bars are computed on the point-in-time history
+                        if self.BROKER.PREEMPTIVE_TA[symbol]:
+                            self._applyTA(symbol, self.BROKER.PREEMPTIVE_TA[symbol])
+                    else:
+                        self._applyTA(symbol)
                     try:
-                        if (not isFeature) or (isFeature and self.tradeOnFeatureEvents):
-                            self.on_bar(symbol, data)
-                            self._generateInsights(symbol)
+                        if route.trade:
+                            if self.alphaWorkers > 0:
+                                await self._submitAlphaWork(symbol, data)
+                            else:
+                                self.on_bar(symbol, data)
+                                self._generateInsights(symbol)
                     except Exception as e:
                         self.LOGGER.error(f"Error in on_bar: {e}")
+                    # the new bar can change the outcome of the asset insights
+                    self._markDirty(self.INSIGHTS.symbol(symbol.split("~")[0]))
                     if self.VERBOSE > 0:
                         self.LOGGER.debug(f"Time taken on_bar: {symbol} {timeit.default_timer() - start_time}")
                 # else: not part of resolution/feature event
@@ -1352,9 +1584,138 @@ class BaseStrategy(abc.ABC):
         return
         
 
+    def _marketDataCallback(self, tg: asyncio.TaskGroup) -> Callable[[Any, ITimeFrame], Awaitable]:
+        """The callback the broker market data stream delivers the strategy bars to. Live bars go through a bounded
+        queue (drained by a task started in `tg`) so a slow _on_bar cannot pile them up in memory."""
+        if self.MODE != IStrategyMode.BACKTEST and self.marketDataQueueSize > 0:
+            self.MARKET_DATA_QUEUE = MarketDataQueue(self.marketDataQueueSize, self.marketDataOverflow)
+            self.market_data_queue = tg.create_task(self._drainMarketData(), name=f"{self.NAME}-market_data_queue")
+            return self.MARKET_DATA_QUEUE.put
+        return self._on_bar
+
+    async def _drainMarketData(self):
+        """Feed the queued live bars to _on_bar one at a time. With alphaWorkers the bars waiting for up to alphaWorkers
+        symbols are taken together and their alpha work runs at the same time in the alpha pool (see _runAlphaQueue)."""
+        try:
+            while self._RUNNING:
+                if self.alphaWorkers > 0:
+                    for bar, timeframe in await self.MARKET_DATA_QUEUE.get_batch(self.alphaWorkers):
+                        await self._on_bar(bar, timeframe)
+                    await self._runAlphaQueue()
+                else:
+                    bar, timeframe = await self.MARKET_DATA_QUEUE.get()
+                    await self._on_bar(bar, timeframe)
+        except asyncio.CancelledError:
+            pass
+
+    def _routeStream(self, symbol: str, timeframe: ITimeFrame) -> IStreamRoute:
+        """The route of a bar of (symbol, time frame) in one lookup. The table is rebuilt when the streams, the resolution
+        or tradeOnFeatureEvents change."""
+        version = (len(self.STREAMS), self.resolution.value, self.tradeOnFeatureEvents)
+        if version != self._STREAM_ROUTES_VERSION:
+            self._STREAM_ROUTES = self._buildStreamRoutes()
+            self._STREAM_ROUTES_VERSION = version
+        route = self._STREAM_ROUTES.get((symbol, timeframe.value))
+        if route is None:
+            route = self._STREAM_ROUTES[(symbol, timeframe.value)] = IStreamRoute(
+                time_frame=timeframe, isResolution=timeframe.value == self.resolution.value)
+        return route
+
+    def _buildStreamRoutes(self) -> dict[tuple[str, str], IStreamRoute]:
+        """Feature routes keyed by (symbol, time frame value) and (feature, time frame value) - the first stream wins."""
+        routes: dict[tuple[str, str], IStreamRoute] = {}
+        for stream in self.STREAMS:
+            if (
+                stream["type"] != "bar"
+                or stream.get("feature") is None
+                or stream["time_frame"].value == self.resolution.value
+            ):
+                continue
+            route = IStreamRoute(time_frame=stream["time_frame"], feature=stream["feature"], trade=self.tradeOnFeatureEvents)
+            routes.setdefault((stream["symbol"], stream["time_frame"].value), route)
+            routes.setdefault((stream["feature"], stream["time_frame"].value), route)
+        return routes
+
+    def _alphaPool(self) -> ThreadPoolExecutor:
+        if self._ALPHA_POOL is None:
+            self._ALPHA_POOL = ThreadPoolExecutor(max_workers=self.alphaWorkers, thread_name_prefix=f"{self.NAME}-alpha")
+        return self._ALPHA_POOL
+
+    def _alphaWork(self, symbol: str, data: pd.DataFrame) -> tuple[list[Insight], list[Insight], Optional[Exception]]:
+        """Run on_bar and generateInsights for the symbol in an alpha pool thread.
+        Returns the insights it added (collected instead of registered), the insights it submitted (deferred until they
+        are registered) and the error it raised, if any."""
+        insights: list[Insight] = []
+        orders: list[Insight] = []
+        self._ALPHA_LOCAL.insights = insights
+        self._ALPHA_LOCAL.orders = orders
+        try:
+            self.on_bar(symbol, data)
+            self._generateInsights(symbol)
+        except Exception as e:
+            return insights, orders, e
+        finally:
+            self._ALPHA_LOCAL.insights = None
+            self._ALPHA_LOCAL.orders = None
+        return insights, orders, None
+
+    def _mergeAlphaWork(self, symbol: str, insights: list[Insight], orders: list[Insight], error: Optional[Exception]):
+        for insight in insights:
+            self.add_insight(insight)
+        # the insights own their orders before the broker sends a trade update for them
+        for insight in orders:
+            try:
+                self.submit_order(insight)
+            except BaseException as e:
+                self.LOGGER.error(f"Error submitting order: {symbol} {insight.INSIGHT_ID} {e}")
+        if error is not None:
+            self.LOGGER.error(f"Error in on_bar: {symbol} {error}")
+
+    async def _submitAlphaWork(self, symbol: str, data: pd.DataFrame):
+        """Run the symbol's alpha work in the alpha pool (see alphaWorkers)."""
+        if self.MODE == IStrategyMode.BACKTEST or self.MARKET_DATA_QUEUE is not None:
+            # run with the rest of the step / market data batch (see _runAlphaQueue) so every alpha sees the same histories
+            self._ALPHA_QUEUE.append((symbol, data))
+            return
+        insights, orders, error = await asyncio.get_running_loop().run_in_executor(self._alphaPool(), self._alphaWork, symbol, data)
+        self._mergeAlphaWork(symbol, insights, orders, error)
+
+    async def _runAlphaQueue(self):
+        """Run the queued bars in the alpha pool and register their insights in bar order - the backtest market step hook
+        (before the step is reported to the insight listener) and the end of a live market data batch."""
+        queue, self._ALPHA_QUEUE = self._ALPHA_QUEUE, []
+        if not queue:
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._alphaPool()
+        results = await asyncio.gather(*(loop.run_in_executor(pool, self._alphaWork, symbol, data) for symbol, data in queue))
+        for (symbol, _), (insights, orders, error) in zip(queue, results):
+            self._mergeAlphaWork(symbol, insights, orders, error)
+
+    def _applyTA(self, symbol: str, specs: Optional[List[dict]] = None):
+        """Apply the TA strategy (or only the given study entries) to the symbol's history. Supported indicators are
+        updated for the new bars only, the rest of the study is recomputed over the history."""
+        specs = self.TaStrategy.ta if specs is None else specs
+        if not self.streamingTA:
+            self.HISTORY[symbol].ta.study(replace(self.TaStrategy, ta=specs))
+            return
+        engine = self._TA_ENGINES.get(symbol)
+        if engine is None or engine.specs != specs:
+            # new symbol or add_ta changed the study
+            engine = self._TA_ENGINES[symbol] = StreamingTA(specs, talib=ta.Imports["talib"])
+        engine.update(self.HISTORY.buffer(symbol))
+        if engine.fallback:
+            self.HISTORY[symbol].ta.study(replace(self.TaStrategy, ta=engine.fallback))
+
     def submit_order(self, insight: Insight):
-        """Submits an order to the broker."""
+        """Submits an order to the broker.
+        Called from an alpha pool thread (see alphaWorkers) the order is submitted by the event loop once the insights
+        of the bar are registered - it returns None."""
         assert isinstance(insight, Insight), "insight must be of type Insight object"
+        orders = getattr(self._ALPHA_LOCAL, "orders", None)
+        if orders is not None:
+            orders.append(insight)
+            return None
         try:
             if self.INSIGHTS.get(insight.INSIGHT_ID) == None:
                 # Make sure the insight is added to the strategy
@@ -1391,12 +1752,12 @@ class BaseStrategy(abc.ABC):
         return self.ORDERS
 
     @property
-    def history(self) -> dict[str, pd.DataFrame]:
+    def history(self) -> HistoryStore:
         """Returns the candle history of the strategy."""
         return self.HISTORY
 
     @property
-    def insights(self) -> dict[UUID, Insight]:
+    def insights(self) -> InsightRegistry:
         """Returns the insights of the strategy."""
         return self.INSIGHTS
 
@@ -1498,4 +1859,7 @@ class BaseStrategy(abc.ABC):
             await self.run_teardown()
         except Exception:
             self.LOGGER.exception("Error in run_teardown")
-        self._RUNNING = False
\ No newline at end of file
+        self._RUNNING = False
+        if self._ALPHA_POOL is not None:
+            self._ALPHA_POOL.shutdown(wait=False, cancel_futures=True)
+            self._ALPHA_POOL = None
\ No newline at end of file
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import signal
+from typing import Any, Awaitable, Callable, Optional
+
+from ..broker.base_broker import BaseBroker
+from ..broker.interfaces import ITradeUpdateEvent
+from ..utils.marketDataQueue import bar_symbol
+from ..utils.timeframe import ITimeFrame
+from .base_strategy import BaseStrategy
+from .interfaces import IMarketDataStream, IStrategyMode
+
+
+class StrategyHost:
+    """
+    Runs several live strategies in one event loop over one broker connection.
+
+    The strategies are created with the same broker instance. The host opens the broker trade stream and market data
+    stream once for all of them:
+      - market data: the streams of every strategy are subscribed once per (symbol, time frame) and each bar is fanned
+        out to the strategies that asked for it (through their market data queue)
+      - trade updates: routed to the strategy whose insights own the order (entry, close, partial close or leg order),
+        updates of orders no strategy owns go to every strategy trading the symbol
+      - broker state: the strategies read the account / positions / orders through one shared snapshot
+
+    The UI / shared memory servers of the strategies are not started - they would bind the same ports.
+
+    Usage:
+      broker = AlpacaBroker(paper=True)
+      host = StrategyHost(broker, [MeanReversion(broker, ...), Breakout(broker, ...)])
+      host.run()
+    """
+    BROKER: BaseBroker
+    """The broker connection shared by the strategies"""
+    STRATEGIES: list[BaseStrategy]
+    """Hosted strategies"""
+    STREAMS: list[IMarketDataStream]
+    """Broker market data subscription - one stream per (symbol, time frame)"""
+    LOGGER: logging.Logger
+    FINAL_EVENTS = (ITradeUpdateEvent.FILLED, ITradeUpdateEvent.CANCELED, ITradeUpdateEvent.REJECTED,
+                    ITradeUpdateEvent.EXPIRED, ITradeUpdateEvent.CLOSED)
+    """Order updates after which the order owner is forgotten"""
+
+    def __init__(self, broker: BaseBroker, strategies: Optional[list[BaseStrategy]] = None, watchdogTimeout: float = 30.0, teardownTimeout: float = 20.0):
+        self.BROKER = broker
+        self.STRATEGIES = []
+        self.STREAMS = []
+        self.LOGGER = logging.getLogger("OlympusTrader.StrategyHost")
+        self.watchdogTimeout = watchdogTimeout
+        self.teardownTimeout = teardownTimeout
+        self._RUNNING = False
+        self._SUBSCRIBERS: dict[tuple[str, str], list[BaseStrategy]] = {}
+        """(symbol, time frame value) -> strategies streaming it"""
+        self._CALLBACKS: dict[BaseStrategy, Callable[[Any, ITimeFrame], Awaitable]] = {}
+        self._ORDER_OWNERS: dict[str, BaseStrategy] = {}
+        """order id -> strategy owning it, filled as trade updates are routed"""
+        for strategy in strategies or []:
+            self.add_strategy(strategy)
+
+    def add_strategy(self, strategy: BaseStrategy):
+        """Adds a strategy to the host. It must use the host broker and run in live mode."""
+        assert isinstance(strategy, BaseStrategy), "strategy must be of type BaseStrategy object"
+        assert strategy.BROKER is self.BROKER, "strategy must use the host broker instance"
+        assert strategy.MODE != IStrategyMode.BACKTEST, "backtests run one strategy per paper broker"
+        if self.STRATEGIES:
+            # one snapshot of the account for every strategy - a trade update of any of them refreshes it
+            strategy.BROKER_STATE = self.STRATEGIES[0].BROKER_STATE
+        if strategy.WITHUI or strategy.WITHSSM:
+            self.LOGGER.warning(f"{strategy.NAME}: UI / shared memory servers are not started by the host")
+        self.STRATEGIES.append(strategy)
+
+    def _subscribe(self):
+        """Merge the strategy streams into one subscription per (symbol, time frame)."""
+        self.STREAMS = []
+        self._SUBSCRIBERS = {}
+        for strategy in self.STRATEGIES:
+            for stream in strategy.STREAMS:
+                key = (stream["symbol"], stream["time_frame"].value)
+                subscribers = self._SUBSCRIBERS.get(key)
+                if subscribers is None:
+                    subscribers = self._SUBSCRIBERS[key] = []
+                    self.STREAMS.append(stream)
+                if strategy not in subscribers:
+                    subscribers.append(strategy)
+        self.LOGGER.info(
+            f"Subscribed {len(self.STREAMS)} streams for {len(self.STRATEGIES)} strategies "
+            f"({sum(len(strategy.STREAMS) for strategy in self.STRATEGIES)} requested)")
+
+    async def _on_bar(self, bar: Any, timeframe: ITimeFrame):
+        """Fan the bar out to the strategies streaming its symbol and time frame."""
+        subscribers = self._SUBSCRIBERS.get((bar_symbol(bar), timeframe.value))
+        if not subscribers:
+            return
+        for i, strategy in enumerate(subscribers):
+            # _on_bar renames feature bars in place - every strategy but the last gets its own copy
+            data = bar.copy() if i < len(subscribers) - 1 and hasattr(bar, "copy") else bar
+            try:
+                await self._CALLBACKS[strategy](data, timeframe)
+            except Exception as e:
+                self.LOGGER.error(f"{strategy.NAME}: error delivering bar: {e}")
+
+    def _owners(self, symbol: str, orderId: str) -> list[BaseStrategy]:
+        owner = self._ORDER_OWNERS.get(orderId)
+        if owner is not None:
+            return [owner]
+        for strategy in self.STRATEGIES:
+            if strategy._orderInsights(symbol, orderId):
+                self._ORDER_OWNERS[orderId] = strategy
+                return [strategy]
+        return [strategy for strategy in self.STRATEGIES if symbol in strategy.UNIVERSE]
+
+    async def _on_trade_update(self, trade):
+        """Route the trade update to the strategy owning the order."""
+        try:
+            orderdata, event = self.BROKER.format_on_trade_update(trade)
+        except Exception as e:
+            self.LOGGER.error(f"Failed to format trade update: {e}")
+            return
+        if not orderdata:
+            return
+        for strategy in self._owners(orderdata["asset"]["symbol"], orderdata["order_id"]):
+            try:
+                await strategy._on_trade_update(trade)
+            except Exception as e:
+                self.LOGGER.error(f"{strategy.NAME}: error in trade update: {e}")
+        if event in self.FINAL_EVENTS:
+            # a later update of the order finds its owner again through the insights
+            self._ORDER_OWNERS.pop(orderdata["order_id"], None)
+
+    def run(self):
+        """Starts the hosted strategies."""
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            self.LOGGER.info("Stopped by user")
+
+    async def _run_streams(self):
+        """Stay alive while the broker streams run."""
+        while not getattr(self.BROKER, "RUNNING_MARKET_STREAM", False) or not getattr(self.BROKER, "RUNNING_TRADE_STREAM", False):
+            await asyncio.sleep(0.1)
+        while getattr(self.BROKER, "RUNNING_MARKET_STREAM", False) and getattr(self.BROKER, "RUNNING_TRADE_STREAM", False) and self._RUNNING:
+            await asyncio.sleep(1)
+
+    async def _run(self) -> None:
+        assert len(self.STRATEGIES) > 0, "No strategies to host"
+        self._RUNNING = True
+        for strategy in self.STRATEGIES:
+            strategy._RUNNING = True
+            await strategy._start_strategy()
+        self._subscribe()
+
+        loop = asyncio.get_running_loop()
+        stop_event = asyncio.Event()
+
+        def _signal_handler():
+            self.LOGGER.info("Received stop signal")
+            self._RUNNING = False
+            stop_event.set()
+
+        for s in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(s, _signal_handler)
+            except NotImplementedError:
+                pass
+
+        async def _shutdown_watchdog():
+            await stop_event.wait()
+            try:
+                await asyncio.sleep(self.watchdogTimeout)
+            except asyncio.CancelledError:
+                return
+            self.LOGGER.warning("Shutdown timed out. Forcing exit via watchdog.")
+            import os
+            os._exit(1)
+
+        watchdog_task = asyncio.create_task(_shutdown_watchdog())
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = []
+            if hasattr(self.BROKER, "startTradeStream"):
+                tasks.append(tg.create_task(self.BROKER.startTradeStream(self._on_trade_update), name="trade_stream"))
+            self._CALLBACKS = {strategy: strategy._marketDataCallback(tg) for strategy in self.STRATEGIES}
+            if hasattr(self.BROKER, "streamMarketData"):
+                tasks.append(tg.create_task(self.BROKER.streamMarketData(self._on_bar, self.STREAMS), name="market_data_stream"))
+            for strategy in self.STRATEGIES:
+                strategy.insight_listener = tg.create_task(strategy._insightListener(), name=f"{strategy.NAME}-insight_listener")
+                tasks.append(strategy.insight_listener)
+            self.LOGGER.info(f"Hosting {', '.join(strategy.NAME for strategy in self.STRATEGIES)}")
+
+            main_task = tg.create_task(self._run_streams(), name="host_main")
+            stop_task = tg.create_task(stop_event.wait(), name="stop_signal_waiter")
+            await asyncio.wait([main_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+
+            self._RUNNING = False
+            for strategy in self.STRATEGIES:
+                try:
+                    await asyncio.wait_for(strategy._shutdown(), timeout=self.teardownTimeout)
+                except Exception as e:
+                    self.LOGGER.exception(f"{strategy.NAME}: error during teardown: {e}")
+            if hasattr(self.BROKER, "closeTradeStream"):
+                try:
+                    await self.BROKER.closeTradeStream()
+                except Exception as e:
+                    self.LOGGER.exception(f"Error closing trade stream: {e}")
+            stop_event.set()
+            tasks += [main_task, stop_task]
+            tasks += [strategy.market_data_queue for strategy in self.STRATEGIES if strategy.market_data_queue is not None]
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        self.LOGGER.info("Strategies stopped")
+        watchdog_task.cancel()
@@ -28,6 +28,18 @@ class IBacktestingConfig(TypedDict):
     preemptiveTA: Optional[bool] = False
 
 
+@dataclass(frozen=True)
+class IStreamRoute:
+    """How the strategy handles a bar of a (symbol, time frame) - resolved once from the market data streams."""
+    time_frame: ITimeFrame
+    feature: Optional[str] = None
+    """ The feature name the bar is stored under, None when the bar is not a feature event """
+    isResolution: bool = False
+    """ The time frame is the strategy resolution """
+    trade: bool = True
+    """ on_bar / generateInsights run for the bar (feature events only with tradeOnFeatureEvents) """
+
+
 class IStrategyMode(Enum):
     BACKTEST = 'Backtest'
     LIVE = 'Live'
@@ -121,3 +133,26 @@ class IStrategyMetrics:
         self.total_pnl += pnl
         self.total_closed += 1
         self.updateDerivedMetrics()
+
+    @classmethod
+    def merge(cls, metrics: List['IStrategyMetrics'], starting_cash: float, ending_cash: float) -> 'IStrategyMetrics':
+        """ Combine the metrics of strategies trading separate parts of the universe (shards) of one account - the
+        counts and PnL are summed over the shards, the dates span all of them and the cash is the account's (each
+        shard saw the same account, its cash is not added up) """
+        merged = cls()
+        starts = [m.start_date for m in metrics if m.start_date is not None]
+        ends = [m.end_date for m in metrics if m.end_date is not None]
+        merged.start_date = min(starts) if starts else None
+        merged.end_date = max(ends) if ends else None
+        merged.starting_cash = starting_cash
+        merged.ending_cash = ending_cash
+        for m in metrics:
+            merged.total_open += m.total_open
+            merged.total_closed += m.total_closed
+            merged.total_wins += m.total_wins
+            merged.total_losses += m.total_losses
+            merged.total_profit += m.total_profit
+            merged.total_loss += m.total_loss
+            merged.total_pnl += m.total_pnl
+        merged.updateDerivedMetrics()
+        return merged
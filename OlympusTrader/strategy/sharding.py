@@ -0,0 +1,162 @@
+import inspect
+import logging
+import multiprocessing
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Iterable, Optional
+
+from ..broker.base_broker import BaseBroker
+from ..insight.executors.general.globalRiskBudget import GlobalRiskBudgetExecutor
+from ..insight.insight import Insight, InsightState
+from ..utils.riskBudget import RiskBudget
+from ..utils.sharedAccount import SharedAccount
+from .base_strategy import BaseStrategy
+from .interfaces import IStrategyMetrics
+
+
+class ShardManager(BaseManager):
+    """Serves the SharedAccount and RiskBudget of a sharded run from the coordinator process."""
+
+
+ShardManager.register("SharedAccount", SharedAccount)
+ShardManager.register("RiskBudget", RiskBudget)
+
+
+def shard_universe(symbols: Iterable[str], shards: int) -> list[set[str]]:
+    """Split the universe into `shards` sets of (nearly) the same size - the same symbols always land in the same shard."""
+    assert shards > 0, "shards must be positive"
+    result: list[set[str]] = [set() for _ in range(shards)]
+    for i, symbol in enumerate(sorted(set(symbols))):
+        result[i % shards].add(symbol)
+    return [shard for shard in result if shard]
+
+
+def _run_shard(strategyClass: type[BaseStrategy], broker: Callable[[], BaseBroker], shard: int, symbols: set[str],
+               setup: Optional[Callable[[BaseStrategy], None]], account: Optional[SharedAccount],
+               budget: Optional[RiskBudget], strategyKwargs: dict) -> dict:
+    """Worker process: run the strategy on its shard of the universe and return its results."""
+    start = timeit.default_timer()
+    kwargs = dict(strategyKwargs)
+    # the UI / shared memory servers of the shards would bind the same ports
+    if "ui" in inspect.signature(strategyClass.__init__).parameters:
+        kwargs.update(ui=False, ssm=False)
+    else:
+        kwargs.update(WITHUI=False, WITHSSM=False)
+    shardBroker = broker()
+    if account is not None:
+        shardBroker.attach_shared_account(account, shard)
+    strategy = strategyClass(shardBroker, universeShard=set(symbols), **kwargs)
+
+    if budget is not None:
+        strategy.RISK_BUDGET = budget
+        # reserve once the insight is sized, release before a terminal executor removes the insight
+        strategy.INSIGHT_EXECUTORS[InsightState.NEW].append(GlobalRiskBudgetExecutor(strategy, budget))
+        for state in Insight.TERMINAL_STATES:
+            strategy.INSIGHT_EXECUTORS[state].appendleft(GlobalRiskBudgetExecutor(strategy, budget, state))
+        strategy.EXECUTOR_CHAINS.invalidate()
+    if setup is not None:
+        setup(strategy)
+
+    strategy.run()
+    account = strategy.BROKER.get_account()
+    return {
+        "symbols": sorted(strategy.UNIVERSE),
+        "metrics": asdict(strategy.METRICS),
+        "equity": getattr(account, "equity", None) if account is not None else None,
+        "elapsed": timeit.default_timer() - start,
+    }
+
+
+class ShardCoordinator:
+    """
+    Runs a strategy over a large universe as K worker processes, each trading its own shard of the symbols.
+
+    Each worker builds the strategy with `universeShard` (only its symbols of universe() are loaded), a broker from the
+    `broker` factory for the bars and orders of its symbols, and runs the whole alpha / executor pipeline for its shard.
+    The coordinator process:
+      - owns the broker account: a SharedAccount opened with the account of the `broker` factory that every shard
+        broker trades through a manager proxy - orders are checked against its buying power, fills move its cash and
+        the shards read its positions (brokers without `attach_shared_account`, the live ones, already share the
+        exchange account)
+      - owns the global risk budget (`buyingPower`, `maxPositions`) the shards reserve against before an entry is
+        submitted and release once the insight is closed, canceled or rejected (GlobalRiskBudgetExecutor)
+      - merges the shard METRICS into one IStrategyMetrics (trade counts and PnL summed, the cash of the one account)
+
+    The strategy class, broker factory and setup callable are sent to the workers - they must be importable (module
+    level, e.g. functools.partial(PaperBroker, cash=25_000, ...)). In a backtest the shards are not in lockstep, the
+    account and the budget move in the order the shards reach their fills and reservations.
+
+    Usage:
+      coordinator = ShardCoordinator(MyStrategy, functools.partial(PaperBroker, cash=25_000, ...), universe, shards=4,
+                                     setup=add_bar_events, buyingPower=100_000, maxPositions=20, mode=IStrategyMode.BACKTEST)
+      metrics = coordinator.run()
+    """
+    SHARDS: list[set[str]]
+    """Symbols of each worker"""
+    RESULTS: list[dict]
+    """Per shard: symbols, metrics, account equity when the shard finished and elapsed seconds"""
+    ACCOUNT: Optional[dict]
+    """Shared account snapshot at the end of the run"""
+    RISK: Optional[dict]
+    """Risk budget snapshot at the end of the run"""
+    METRICS: Optional[IStrategyMetrics]
+    """Merged metrics of the shards"""
+
+    def __init__(self, strategy: type[BaseStrategy], broker: Callable[[], BaseBroker], universe: Iterable[str],
+                 shards: int, setup: Optional[Callable[[BaseStrategy], None]] = None,
+                 buyingPower: Optional[float] = None, maxPositions: Optional[int] = None, **strategyKwargs: Any):
+        assert inspect.isclass(strategy) and issubclass(strategy, BaseStrategy), "strategy must be a BaseStrategy class"
+        self.strategy = strategy
+        self.broker = broker
+        self.setup = setup
+        self.buyingPower = buyingPower
+        self.maxPositions = maxPositions
+        self.strategyKwargs = strategyKwargs
+        self.SHARDS = shard_universe(universe, shards)
+        self.RESULTS = []
+        self.ACCOUNT = None
+        self.RISK = None
+        self.METRICS = None
+        self.LOGGER = logging.getLogger(f"OlympusTrader.ShardCoordinator.{strategy.__name__}")
+
+    def run(self) -> IStrategyMetrics:
+        """Run every shard to completion and return the merged metrics."""
+        context = multiprocessing.get_context("spawn")
+        broker = self.broker()
+        opening = broker.get_account()
+        manager = ShardManager(ctx=context)
+        manager.start()
+        try:
+            account = None
+            if hasattr(broker, "attach_shared_account"):
+                account = manager.SharedAccount(opening)
+            budget = None
+            if self.buyingPower is not None or self.maxPositions is not None:
+                budget = manager.RiskBudget(self.buyingPower, self.maxPositions)
+
+            self.LOGGER.info(f"Running {len(self.SHARDS)} shards: {[len(shard) for shard in self.SHARDS]} symbols")
+            with ProcessPoolExecutor(max_workers=len(self.SHARDS), mp_context=context) as pool:
+                futures = [
+                    pool.submit(_run_shard, self.strategy, self.broker, i, shard, self.setup, account, budget,
+                                self.strategyKwargs)
+                    for i, shard in enumerate(self.SHARDS)
+                ]
+                self.RESULTS = [future.result() for future in futures]
+            if account is not None:
+                self.ACCOUNT = account.snapshot()
+            else:
+                current = broker.get_account()
+                self.ACCOUNT = {"cash": current.cash, "equity": current.equity, "buyingPower": current.buying_power}
+            self.LOGGER.info(f"Account: {self.ACCOUNT}")
+            if budget is not None:
+                self.RISK = budget.snapshot()
+                self.LOGGER.info(f"Risk budget: {self.RISK}")
+        finally:
+            manager.shutdown()
+
+        self.METRICS = IStrategyMetrics.merge([IStrategyMetrics(**result["metrics"]) for result in self.RESULTS],
+                                              opening.equity, self.ACCOUNT["equity"])
+        self.LOGGER.info(f"Merged METRICS: {self.METRICS}")
+        return self.METRICS
@@ -0,0 +1,68 @@
+import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+from ..broker.interfaces import IAsset
+
+
+class AssetCache:
+    """
+    On-disk cache of broker asset metadata (IAsset) with a time to live.
+
+    One JSON file per broker / data feed holds {symbol: {"asset": IAsset, "cached": epoch seconds}} keyed by the symbol
+    the universe asked for. Entries older than `ttl` are treated as missing. The file is written atomically
+    (temp file + replace) so a crashed start never leaves a half written cache behind.
+
+    Usage:
+      cache = AssetCache('data', 'PaperBroker-yf', datetime.timedelta(hours=24))
+      asset = cache.get('AAPL')  # None when missing or expired
+      cache.put('AAPL', broker.get_ticker_info('AAPL'))
+      cache.save()
+    """
+
+    def __init__(self, path: str, name: str, ttl: datetime.timedelta = datetime.timedelta(hours=24)):
+        self.path = os.path.join(path, 'assets', f'{name}.json')
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            # an unreadable cache is rebuilt from the broker
+            return {}
+
+    def get(self, symbol: str) -> Optional[IAsset]:
+        """The cached asset, None when it was never cached or is older than the TTL."""
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if not entry or time.time() - entry.get('cached', 0) > self.ttl.total_seconds():
+            return None
+        return IAsset(**entry['asset'])
+
+    def put(self, symbol: str, asset: IAsset):
+        with self._lock:
+            self._entries[symbol] = {'asset': dict(asset), 'cached': time.time()}
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if anything was added."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f'{self.path}.{uuid.uuid4().hex}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
@@ -0,0 +1,229 @@
+import glob
+import json
+import os
+import re
+import threading
+import uuid
+from typing import Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+
+class BarStore:
+    """
+    Columnar on-disk bar store - one directory per symbol / time frame / month with a memory-mapped `.npy` file per column.
+
+    Layout:
+      {root}/bar/{symbol}/{time_frame}/meta.json       - columns, covered ranges and migrated .h5 files
+      {root}/bar/{symbol}/{time_frame}/{YYYY-MM}/timestamp.npy   - int64 ns UTC, sorted and unique
+      {root}/bar/{symbol}/{time_frame}/{YYYY-MM}/{column}.npy    - float64
+
+    Ranges are half open - [start, end). Range reads only touch the months in range and only copy the rows in range
+    out of the memory maps. Writes merge into the existing months (new rows win on the same timestamp) and record
+    the covered range, `gaps` returns the parts of a range that were never stored. Legacy `{symbol}_{time_frame}_{START}-{END}.h5`
+    files in `{root}/bar` are migrated into the store the first time the symbol / time frame is read.
+
+    Usage:
+      store = BarStore(stored_path)
+      store.write('AAPL', '1Min', bars, start, end)
+      store.read('AAPL', '1Min', start, end)  # None when the range was never stored
+    """
+    BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+    _H5_RANGE = re.compile(
+        r'_(\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}:\d{2}(?:\.\d+)?)?(?:[+-]\d{2}:\d{2})?)-(\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}:\d{2}(?:\.\d+)?)?(?:[+-]\d{2}:\d{2})?)\.h5$')
+
+    def __init__(self, root: str):
+        self.root = os.path.join(root, 'bar')
+        self._lock = threading.RLock()
+        self._migrated: set[tuple[str, str]] = set()
+
+    @staticmethod
+    def _to_ns(timestamp) -> int:
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize('UTC')
+        return int(timestamp.value)
+
+    def _series_path(self, symbol: str, timeFrame: str) -> str:
+        return os.path.join(self.root, quote(symbol, safe=''), str(timeFrame))
+
+    def _read_meta(self, path: str) -> dict:
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'columns': [], 'coverage': [], 'migrated': []}
+
+    def _write_meta(self, path: str, meta: dict):
+        os.makedirs(path, exist_ok=True)
+        tmp = os.path.join(path, f'.meta.{uuid.uuid4().hex}.json')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    @staticmethod
+    def _save(path: str, name: str, values: np.ndarray):
+        # Write next to the target and swap it in, a reader never sees a half written column
+        tmp = os.path.join(path, f'.{name}.{uuid.uuid4().hex}.npy')
+        np.save(tmp, values)
+        os.replace(tmp, os.path.join(path, f'{name}.npy'))
+
+    @staticmethod
+    def _merge_ranges(ranges: list[list[int]]) -> list[list[int]]:
+        merged: list[list[int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    @staticmethod
+    def _months(start: int, end: int) -> list[str]:
+        months = np.arange(np.datetime64(start, 'ns').astype('datetime64[M]'),
+                           np.datetime64(end, 'ns').astype('datetime64[M]') + 1)
+        return [str(month) for month in months]
+
+    def gaps(self, symbol: str, timeFrame: str, start, end) -> list[tuple[int, int]]:
+        """The parts of [start, end) that were never stored, as (start_ns, end_ns) ranges."""
+        with self._lock:
+            self._migrate_h5(symbol, timeFrame)
+            start, end = self._to_ns(start), self._to_ns(end)
+            meta = self._read_meta(self._series_path(symbol, timeFrame))
+            gaps = []
+            for s, e in meta['coverage']:
+                if e <= start:
+                    continue
+                if s >= end:
+                    break
+                if s > start:
+                    gaps.append((start, s))
+                start = max(start, e)
+            if start < end:
+                gaps.append((start, end))
+            return gaps
+
+    def covers(self, symbol: str, timeFrame: str, start, end) -> bool:
+        """Whether [start, end) was fully stored before."""
+        return not self.gaps(symbol, timeFrame, start, end)
+
+    def read(self, symbol: str, timeFrame: str, start, end, partial: bool = False) -> Optional[pd.DataFrame]:
+        """The stored bars with start <= timestamp < end, indexed by (symbol, timestamp).
+        None if the range is not fully covered - unless partial is set, then whatever is stored in the range is returned."""
+        with self._lock:
+            if not partial and not self.covers(symbol, timeFrame, start, end):
+                return None
+            start, end = self._to_ns(start), self._to_ns(end)
+            path = self._series_path(symbol, timeFrame)
+            columns = self._read_meta(path)['columns']
+
+            timestamps: list[np.ndarray] = []
+            values: dict[str, list[np.ndarray]] = {column: [] for column in columns}
+            for month in self._months(start, end - 1):
+                monthPath = os.path.join(path, month)
+                if not os.path.exists(os.path.join(monthPath, 'timestamp.npy')):
+                    continue
+                ts = np.load(os.path.join(monthPath, 'timestamp.npy'), mmap_mode='r')
+                lo, hi = np.searchsorted(ts, start, 'left'), np.searchsorted(ts, end, 'left')
+                if lo >= hi:
+                    continue
+                timestamps.append(np.asarray(ts[lo:hi]))
+                for column in columns:
+                    columnPath = os.path.join(monthPath, f'{column}.npy')
+                    if os.path.exists(columnPath):
+                        values[column].append(np.asarray(np.load(columnPath, mmap_mode='r')[lo:hi]))
+                    else:
+                        values[column].append(np.full(hi - lo, np.nan))
+
+            ts = np.concatenate(timestamps) if timestamps else np.empty(0, dtype=np.int64)
+            index = pd.MultiIndex.from_arrays(
+                [np.full(len(ts), symbol, dtype=object), pd.to_datetime(ts, utc=True)], names=['symbol', 'timestamp'])
+            return pd.DataFrame({column: (np.concatenate(parts) if parts else np.empty(0)) for column, parts in values.items()},
+                                index=index)
+
+    def write(self, symbol: str, timeFrame: str, bars: pd.DataFrame, start=None, end=None):
+        """Merge the bars into the store and mark [start, end) (default: the first bar to just after the last) as covered -
+        an empty range stores the bars without covering anything. Only the numeric bar columns are kept."""
+        if isinstance(bars.index, pd.MultiIndex):
+            timestamps = bars.index.get_level_values('timestamp')
+        else:
+            timestamps = bars.index
+        timestamps = pd.DatetimeIndex(timestamps)
+        if timestamps.tz is None:
+            timestamps = timestamps.tz_localize('UTC')
+        ts = timestamps.as_unit('ns').asi8
+        columns = [column for column in bars.columns if column in self.BAR_COLUMNS]
+
+        with self._lock:
+            self._migrate_h5(symbol, timeFrame)
+            path = self._series_path(symbol, timeFrame)
+            meta = self._read_meta(path)
+            meta['columns'] = list(dict.fromkeys(meta['columns'] + columns))
+
+            if len(ts):
+                values = {column: bars[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in columns}
+                months = ts.astype('datetime64[ns]').astype('datetime64[M]')
+                for month in np.unique(months):
+                    rows = months == month
+                    self._write_month(os.path.join(path, str(month)), meta['columns'], ts[rows],
+                                      {column: value[rows] for column, value in values.items()})
+
+                start = self._to_ns(start) if start is not None else int(ts.min())
+                end = self._to_ns(end) if end is not None else int(ts.max()) + 1
+            elif start is None or end is None:
+                return
+            else:
+                start, end = self._to_ns(start), self._to_ns(end)
+            if end > start:
+                meta['coverage'] = self._merge_ranges(meta['coverage'] + [[start, end]])
+            self._write_meta(path, meta)
+
+    def _write_month(self, path: str, columns: list[str], ts: np.ndarray, values: dict[str, np.ndarray]):
+        os.makedirs(path, exist_ok=True)
+        stored = os.path.join(path, 'timestamp.npy')
+        if os.path.exists(stored):
+            old_ts = np.load(stored)
+            old = {column: (np.load(os.path.join(path, f'{column}.npy'))
+                            if os.path.exists(os.path.join(path, f'{column}.npy')) else np.full(len(old_ts), np.nan))
+                   for column in columns}
+        else:
+            old_ts = np.empty(0, dtype=np.int64)
+            old = {column: np.empty(0) for column in columns}
+
+        merged_ts = np.concatenate([old_ts, ts])
+        # stable sort keeps the old row before the new one on the same timestamp - keep the last of each run
+        order = np.argsort(merged_ts, kind='stable')
+        merged_ts = merged_ts[order]
+        keep = np.append(merged_ts[1:] != merged_ts[:-1], True) if len(merged_ts) else np.empty(0, dtype=bool)
+
+        for column in columns:
+            new = values.get(column, np.full(len(ts), np.nan))
+            self._save(path, column, np.concatenate([old[column], new])[order][keep])
+        # the timestamps go last, they define how many rows the month has
+        self._save(path, 'timestamp', merged_ts[keep])
+
+    def _migrate_h5(self, symbol: str, timeFrame: str):
+        """One-shot import of the legacy `{symbol}_{time_frame}_{START}-{END}.h5` files."""
+        key = (symbol, str(timeFrame))
+        if key in self._migrated:
+            return
+        self._migrated.add(key)
+
+        path = self._series_path(symbol, timeFrame)
+        meta = self._read_meta(path)
+        pattern = os.path.join(glob.escape(self.root), f'{glob.escape(symbol)}_{glob.escape(str(timeFrame))}_*.h5')
+        for file in sorted(glob.glob(pattern)):
+            name = os.path.basename(file)
+            if name in meta['migrated']:
+                continue
+            bars = pd.read_hdf(file)
+            match = self._H5_RANGE.search(name)
+            if match:
+                self.write(symbol, timeFrame, bars, match.group(1), match.group(2))
+            else:
+                self.write(symbol, timeFrame, bars)
+            meta = self._read_meta(path)
+            meta['migrated'].append(name)
+            self._write_meta(path, meta)
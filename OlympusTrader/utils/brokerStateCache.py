@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Any, Callable, Literal
+
+
+BrokerStateKind = Literal['account', 'positions', 'orders']
+
+
+class BrokerStateCache:
+    """
+    Account / positions / orders snapshot of a broker, reused for `ttl` seconds instead of fetched on every call.
+
+    Trade updates call `invalidate()` so the next read fetches the state the update changed, the TTL bounds how old
+    a snapshot can get when no update arrives (e.g. equity moving with the price). ttl 0 fetches on every call.
+
+    `metrics()` reports per kind how many reads were served from the cache and how old the served snapshots were,
+    i.e. how many broker round trips the cache removed and what staleness it traded for them.
+
+    Usage:
+      state = BrokerStateCache({'account': broker.get_account, 'positions': broker.get_positions, 'orders': broker.get_orders}, ttl=1.0)
+      state.get('account')
+      state.invalidate()  # on a trade update
+    """
+    KINDS: tuple[BrokerStateKind, ...] = ('account', 'positions', 'orders')
+
+    def __init__(self, fetchers: dict[BrokerStateKind, Callable[[], Any]], ttl: float = 0.0):
+        self.fetchers = fetchers
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._values: dict[str, Any] = {}
+        self._fetched: dict[str, float] = {}
+        self._generation: dict[str, int] = {kind: 0 for kind in self.KINDS}
+        self._metrics = {kind: {'reads': 0, 'fetches': 0, 'invalidations': 0, 'age': 0.0, 'max_age': 0.0}
+                         for kind in self.KINDS}
+
+    def fresh(self, kind: BrokerStateKind) -> bool:
+        """Whether a read of the kind is served from the cache."""
+        fetched = self._fetched.get(kind)
+        return fetched is not None and time.monotonic() - fetched < self.ttl
+
+    def get(self, kind: BrokerStateKind) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            metrics = self._metrics[kind]
+            metrics['reads'] += 1
+            fetched = self._fetched.get(kind)
+            if fetched is not None and now - fetched < self.ttl:
+                age = now - fetched
+                metrics['age'] += age
+                metrics['max_age'] = max(metrics['max_age'], age)
+                return self._values[kind]
+            metrics['fetches'] += 1
+            generation = self._generation[kind]
+        # fetch outside the lock - a slow broker call must not block the reads of the other kinds
+        value = self.fetchers[kind]()
+        with self._lock:
+            # a trade update that arrived during the fetch may not be in the value - keep it uncached
+            if self._generation[kind] == generation:
+                self._values[kind] = value
+                self._fetched[kind] = now
+        return value
+
+    def invalidate(self, *kinds: BrokerStateKind):
+        """Drop the snapshots (all kinds by default) so the next read fetches them."""
+        with self._lock:
+            for kind in kinds or self.KINDS:
+                self._generation[kind] += 1
+                if self._fetched.pop(kind, None) is not None:
+                    self._metrics[kind]['invalidations'] += 1
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Per kind: reads, fetches, cached reads (round trips saved), invalidations and the average / max age in
+        seconds of the snapshots served from the cache."""
+        with self._lock:
+            result = {}
+            for kind, metrics in self._metrics.items():
+                cached = metrics['reads'] - metrics['fetches']
+                result[kind] = {
+                    'reads': metrics['reads'],
+                    'fetches': metrics['fetches'],
+                    'cached': cached,
+                    'invalidations': metrics['invalidations'],
+                    'avg_age': metrics['age'] / cached if cached else 0.0,
+                    'max_age': metrics['max_age'],
+                }
+            return result
@@ -0,0 +1,84 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class EquityCurve:
+    """
+    Account snapshots (one row per step) in a preallocated NumPy structured array.
+
+    Recording the same timestamp twice overwrites the last row, so it behaves like the
+    {timestamp: account} history it replaces. The array grows (doubling) if the
+    preallocated capacity runs out.
+
+    Usage:
+      curve = EquityCurve(capacity=steps)
+      curve.record(time, cash, equity, buying_power, margin, open_positions)
+      curve.to_frame()  # DataFrame indexed by timestamp
+    """
+    DTYPE = np.dtype([
+        ('timestamp', 'datetime64[ns]'),
+        ('cash', np.float64),
+        ('equity', np.float64),
+        ('buying_power', np.float64),
+        ('margin', np.float64),
+        ('open_positions', np.int64),
+    ])
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros(max(int(capacity), 1), dtype=self.DTYPE)
+        self._size = 0
+        self._tz: Optional[datetime.tzinfo] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def reserve(self, capacity: int):
+        """Make room for at least `capacity` rows."""
+        capacity = int(capacity)
+        if capacity > len(self._data):
+            data = np.zeros(capacity, dtype=self.DTYPE)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    def _to_ns(self, timestamp: datetime.datetime) -> np.datetime64:
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None:
+            if self._tz is None:
+                self._tz = timestamp.tzinfo
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+        return np.datetime64(timestamp.value, 'ns')
+
+    def record(self, timestamp: datetime.datetime, cash: float, equity: float, buying_power: float, margin: float, open_positions: int):
+        """Append a snapshot - or overwrite the last one if it has the same timestamp."""
+        ts = self._to_ns(timestamp)
+        if self._size and self._data['timestamp'][self._size - 1] == ts:
+            row = self._size - 1
+        else:
+            if self._size == len(self._data):
+                self.reserve(len(self._data) * 2)
+            row = self._size
+            self._size += 1
+        self._data[row] = (ts, cash, equity, buying_power, margin, open_positions)
+
+    @property
+    def values(self) -> np.ndarray:
+        """The recorded rows (a view, not a copy)."""
+        return self._data[:self._size]
+
+    def last(self) -> Optional[np.void]:
+        return self._data[self._size - 1] if self._size else None
+
+    def to_frame(self) -> pd.DataFrame:
+        """The snapshots as a DataFrame indexed by timestamp."""
+        values = self.values
+        index = pd.DatetimeIndex(values['timestamp'], name='timestamp')
+        if self._tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self._tz)
+        return pd.DataFrame({name: values[name].copy() for name in self.DTYPE.names if name != 'timestamp'}, index=index)
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import deque
+from typing import Hashable, Optional
+
+from ..insight.executors.base_executor import BaseExecutor, ExecutorResults
+from ..insight.insight import Insight, InsightState
+
+
+class ExecutorChains:
+    """
+    The executors the insight listener runs for an insight, compiled once per (state, symbol, alpha).
+
+    `chain()` filters `INSIGHT_EXECUTORS[state]` with the executor allowed assets / alphas the first time a key is seen
+    and reuses the list afterwards - the listener no longer calls `should_run` on every executor for every insight on
+    every pass. The compiled chains are dropped when an executor is added or any executor filter changes
+    (`BaseExecutor.FILTER_VERSION`). Executors that override `should_run` stay in the chain and are checked per insight.
+
+    `run()` times every executor and counts its results, `metrics()` reports them per executor.
+
+    Usage:
+      chains = ExecutorChains(strategy.INSIGHT_EXECUTORS)
+      for executor in chains.chain(insight):
+          result = chains.run(executor, insight)
+    """
+
+    def __init__(self, executors: dict[InsightState, deque[BaseExecutor]]):
+        self.executors = executors
+        self._chains: dict[tuple[InsightState, str, Hashable], tuple[BaseExecutor, ...]] = {}
+        self._compiled = None
+        self.version = 0
+        """Bumped when an executor is registered - see `invalidate()`"""
+        self._lock = threading.Lock()
+        self._metrics: dict[BaseExecutor, dict[str, float]] = {}
+
+    def invalidate(self):
+        """Drop the compiled chains, the next insight of each key compiles them again."""
+        self.version += 1
+
+    def _current(self) -> tuple:
+        # direct changes to the INSIGHT_EXECUTORS deques are picked up through their size
+        return (self.version, BaseExecutor.FILTER_VERSION, tuple(len(executors) for executors in self.executors.values()))
+
+    def chain(self, insight: Insight) -> tuple[BaseExecutor, ...]:
+        """The executors to run for the insight in its current state, in the order they were added."""
+        version = self._current()
+        if version != self._compiled:
+            self._chains = {}
+            self._compiled = version
+        key = (insight.state, insight.symbol, insight.strategyType)
+        chain = self._chains.get(key)
+        if chain is None:
+            chain = tuple(
+                executor for executor in self.executors.get(insight.state, ())
+                if type(executor).should_run is not BaseExecutor.should_run
+                or (executor.isAllowedAsset(insight.symbol) and executor.isAllowedAlpha(insight.strategyType))
+            )
+            self._chains[key] = chain
+        return chain
+
+    def run(self, executor: BaseExecutor, insight: Insight) -> Optional[ExecutorResults]:
+        """Run the executor on the insight and record the time it took and its result, None when it should not run."""
+        if type(executor).should_run is not BaseExecutor.should_run and not executor.should_run(insight):
+            return None
+        start = time.perf_counter()
+        result = executor.run(insight)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            metrics = self._metrics.get(executor)
+            if metrics is None:
+                metrics = self._metrics[executor] = {'runs': 0, 'passed': 0, 'failed': 0, 'errors': 0, 'time': 0.0, 'max_time': 0.0}
+            metrics['runs'] += 1
+            if not result.success:
+                metrics['errors'] += 1
+            elif result.passed:
+                metrics['passed'] += 1
+            else:
+                metrics['failed'] += 1
+            metrics['time'] += elapsed
+            metrics['max_time'] = max(metrics['max_time'], elapsed)
+        return result
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Per executor ("STATE:Name"): runs, passed, failed (did not pass), errors (did not run successfully) and the
+        average / max run time in seconds."""
+        with self._lock:
+            result = {}
+            for executor, metrics in self._metrics.items():
+                name = f"{executor.state.name}:{executor.NAME}"
+                if name in result:
+                    name = f"{name}#{id(executor):x}"
+                result[name] = {
+                    'runs': metrics['runs'],
+                    'passed': metrics['passed'],
+                    'failed': metrics['failed'],
+                    'errors': metrics['errors'],
+                    'avg_time': metrics['time'] / metrics['runs'] if metrics['runs'] else 0.0,
+                    'max_time': metrics['max_time'],
+                }
+            return result
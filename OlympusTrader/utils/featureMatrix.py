@@ -0,0 +1,64 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+
+def _apply_spec(frame: pd.DataFrame, spec: dict) -> list:
+    """Run one study entry on the frame (in place) and return the columns it added."""
+    before = set(frame.columns)
+    # a copy - study() writes `append` into the entries it runs
+    frame.ta.study(ta.Study(name="FeatureMatrix", ta=[dict(spec)], cores=0), cores=0)
+    return [column for column in frame.columns if column not in before]
+
+
+def _same(full: pd.Series, prefix: pd.Series) -> bool:
+    """Whether the rows of the prefix run match the same rows of the full run."""
+    try:
+        a = full.to_numpy(dtype=np.float64, na_value=np.nan)
+        b = prefix.to_numpy(dtype=np.float64, na_value=np.nan)
+    except (TypeError, ValueError):
+        return full.reset_index(drop=True).equals(prefix.reset_index(drop=True))
+    return bool(np.allclose(a, b, rtol=1e-9, atol=1e-12, equal_nan=True))
+
+
+def _reads_future(spec: dict) -> bool:
+    """Entries that are shifted back by design (a negative offset)."""
+    offset = spec.get('offset')
+    return isinstance(offset, (int, float, np.number)) and offset < 0
+
+
+def build_feature_matrix(bars: pd.DataFrame, study: ta.Study, probe: Optional[float] = 0.5) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    Apply the study to the full history once and return (bars with the TA columns, look-ahead entries).
+
+    A TA value is only safe to precompute if it does not depend on later bars. Each entry is run again on the first
+    `probe` fraction of the history - a causal indicator gives the same values on those rows, any column that changes
+    (centered windows, negative offsets, indicators normalised over the whole sample ...) read bars from the future.
+    Those entries are returned instead of being added to the bars so they can be computed bar by bar on the
+    point-in-time history. probe None / 0 skips the check (negative offsets are still treated as look-ahead).
+
+    Module level so it can run in a worker process.
+    """
+    entries = list(study.ta) if study is not None and study.ta else []
+    specs = [spec for spec in entries if not _reads_future(spec)]
+    if not specs or bars is None or bars.empty:
+        return bars, [spec for spec in entries if _reads_future(spec)]
+
+    columns: list[list] = [_apply_spec(bars, spec) for spec in specs]
+
+    rows = int(len(bars) * probe) if probe else 0
+    if 0 < rows < len(bars):
+        head = bars.iloc[:rows]
+        prefix = head.drop(columns=[column for added in columns for column in added]).copy()
+        leaky = {id(spec) for spec in entries if _reads_future(spec)}
+        for spec, added in zip(specs, columns):
+            prefix_added = _apply_spec(prefix, spec)
+            if set(prefix_added) != set(added) or not all(_same(head[column], prefix[column]) for column in added):
+                leaky.add(id(spec))
+        bars.drop(columns=[column for spec, added in zip(specs, columns) if id(spec) in leaky for column in added],
+                  inplace=True)
+        return bars, [spec for spec in entries if id(spec) in leaky]
+
+    return bars, [spec for spec in entries if _reads_future(spec)]
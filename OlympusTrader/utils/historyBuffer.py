@@ -0,0 +1,341 @@
+from collections.abc import MutableMapping
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class HistoryBuffer:
+    """
+    Bar history of one symbol in a preallocated column-oriented buffer (one float64 column per OHLCV / indicator field).
+    Non-numeric columns (text, bools ...) are kept next to it, one object array per column - they are not coerced.
+
+    Rows live in a window [start, end) of a buffer twice the history limit. Appending writes at `end` and trimming
+    only moves `start`, the window is copied back to the front once the buffer end is reached - O(1) amortized per bar.
+    `frame()` is a DataFrame over the window (no copy of the values) indexed by (symbol, timestamp) like the bars,
+    cached until the next append.
+
+    Columns added to or replaced on that DataFrame (e.g. by `df.ta.study`) are copied back into the buffer on the next
+    append, so they are kept like they were on the concatenated history DataFrame, non-numeric ones included.
+
+    Timestamps are unique and sorted - a bar with a timestamp already in the history is ignored (the first one is kept).
+    A frame shares memory with the buffer, hold on to a `.copy()` to keep a snapshot past the next append.
+    """
+    INDEX_NAMES = ['symbol', 'timestamp']
+
+    def __init__(self, symbol: str, capacity: int = 1024):
+        self.symbol = symbol
+        self.columns: list = []
+        self._column_index: dict = {}
+        self._values = np.empty((max(int(capacity), 1), 0), dtype=np.float64)
+        self._timestamps = np.zeros(max(int(capacity), 1), dtype=np.int64)
+        self._start = 0
+        self._end = 0
+        self._tz = None
+        self._frame: Optional[pd.DataFrame] = None
+        self._row_columns: dict[tuple, tuple] = {}
+        self._frame_columns: Optional[pd.Index] = None
+        self._objects: dict = {}
+        """Non-numeric columns - an object array per column, aligned with the timestamps"""
+        self._order: list = []
+        """Every column in the order it was first seen - the frame column order"""
+        # bumped when a late bar is inserted before the end - the window is no longer append only
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """The window timestamps (int64 UTC nanoseconds, a view)."""
+        return self._timestamps[self._start:self._end]
+
+    def column(self, name) -> np.ndarray:
+        """A column of the window (a view)."""
+        self._absorb()
+        return self._values[self._start:self._end, self._column_index[name]]
+
+    def write(self, name, rows: slice, values: np.ndarray):
+        """Write values into rows (window positions) of a column, adding the column if needed."""
+        self._absorb()
+        if name in self._objects:
+            self._objects[name][self._start + rows.start:self._start + rows.stop] = values
+            return
+        column = self._column_index.get(name)
+        if column is None:
+            column = self._add_column(name)
+        self._values[self._start + rows.start:self._start + rows.stop, column] = values
+
+    def frame(self) -> pd.DataFrame:
+        """The history as a DataFrame indexed by (symbol, timestamp) - built on the buffer, not copied."""
+        if self._frame is None:
+            size = len(self)
+            timestamps = pd.DatetimeIndex(self._timestamps[self._start:self._end].view('datetime64[ns]'))
+            if self._tz is not None:
+                timestamps = timestamps.tz_localize('UTC').tz_convert(self._tz)
+            index = pd.MultiIndex(levels=[[self.symbol], timestamps], codes=[np.zeros(size, dtype=np.int8), np.arange(size)],
+                                  names=self.INDEX_NAMES, verify_integrity=False)
+            if self._frame_columns is None:
+                self._frame_columns = pd.Index(self.columns)
+            self._frame = pd.DataFrame(self._values[self._start:self._end], index=index,
+                                       columns=self._frame_columns, copy=False)
+            for name in self._order:
+                if name in self._objects:
+                    # inferred like a concatenated column - bool when every row holds one, object otherwise
+                    self._frame.insert(self._order.index(name), name,
+                                       pd.Series(self._objects[name][self._start:self._end], index=index).infer_objects())
+        return self._frame
+
+    def view(self) -> pd.DataFrame:
+        """`frame()` indexed by timestamp only (what `frame().loc[symbol]` returns) without copying the values."""
+        frame = self.frame()
+        view = frame.copy(deep=False)
+        view.index = frame.index.get_level_values(1)
+        return view
+
+    def _add_column(self, name) -> int:
+        self._column_index[name] = len(self.columns)
+        self.columns.append(name)
+        self._order.append(name)
+        self._values = np.concatenate(
+            [self._values, np.full((len(self._values), 1), np.nan)], axis=1)
+        self._row_columns.clear()
+        self._frame_columns = None
+        return self._column_index[name]
+
+    def _add_object(self, name) -> np.ndarray:
+        column = self._column_index.get(name)
+        if column is None:
+            values = np.full(len(self._timestamps), np.nan, dtype=object)
+            self._order.append(name)
+        else:
+            # a numeric column that now holds text / bools - moved out of the float buffer with its values
+            values = self._values[:, column].astype(object)
+            self._values = np.delete(self._values, column, axis=1)
+            self.columns.remove(name)
+            self._column_index = {other: i for i, other in enumerate(self.columns)}
+        self._objects[name] = values
+        self._row_columns.clear()
+        self._frame_columns = None
+        return values
+
+    @staticmethod
+    def _is_numeric(series: pd.Series) -> bool:
+        """Whether the column goes in the float64 buffer - numbers, not bools / text / timestamps."""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return False
+        if pd.api.types.is_numeric_dtype(dtype):
+            return True
+        if dtype != object:
+            return False
+        try:
+            converted = pd.to_numeric(series)
+        except (TypeError, ValueError):
+            return False
+        return pd.api.types.is_numeric_dtype(converted) and not pd.api.types.is_bool_dtype(converted)
+
+    def _absorb(self):
+        """Copy the columns added to / replaced on the cached frame back into the buffer."""
+        frame, self._frame = self._frame, None
+        if frame is None or len(frame) != len(self):
+            return
+        values = None
+        if not self._objects:
+            # a single float block is still the buffer itself, anything else is copied back in one go - unless a column
+            # is not a number (bools / text make the frame object), those are kept as they are below
+            values = frame.to_numpy()
+            if values.dtype.kind not in 'fiu':
+                values = None
+            elif list(frame.columns) == self.columns and np.may_share_memory(values, self._values):
+                return
+        if values is not None:
+            for name in frame.columns:
+                if name not in self._column_index:
+                    self._add_column(name)
+            if frame.columns.is_unique:
+                columns = [self._column_index[name] for name in frame.columns]
+                self._values[self._start:self._end, columns] = values
+                return
+        for name, series in frame.items():
+            if name in self._objects or not self._is_numeric(series):
+                objects = self._objects.get(name)
+                if objects is None:
+                    objects = self._add_object(name)
+                objects[self._start:self._end] = series.to_numpy(dtype=object)
+                continue
+            column = self._column_index.get(name)
+            if column is not None and np.may_share_memory(series.to_numpy(), self._values):
+                continue
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            if column is None:
+                column = self._add_column(name)
+            self._values[self._start:self._end, column] = values
+
+    def _reserve(self, rows: int, limit: Optional[int]):
+        """Make room for `rows` more rows after the window."""
+        if self._end + rows <= len(self._values):
+            return
+        size = len(self)
+        capacity = max(len(self._values), 2 * max(limit or 0, size + rows))
+        if capacity > len(self._values):
+            values = np.full((capacity, len(self.columns)), np.nan)
+            timestamps = np.zeros(capacity, dtype=np.int64)
+            objects = {name: np.full(capacity, np.nan, dtype=object) for name in self._objects}
+        else:
+            values, timestamps, objects = self._values, self._timestamps, self._objects
+        values[:size] = self._values[self._start:self._end]
+        timestamps[:size] = self._timestamps[self._start:self._end]
+        for name, column in self._objects.items():
+            objects[name][:size] = column[self._start:self._end]
+        self._values, self._timestamps, self._objects = values, timestamps, objects
+        self._start, self._end = 0, size
+
+    def _plan(self, data: pd.DataFrame) -> tuple:
+        """How bars with these columns are written - (buffer positions of the numeric columns, their positions in the
+        bars or None when every column is numeric, (name, position) of the non-numeric columns)."""
+        numeric, objects = [], []
+        for position, name in enumerate(data.columns):
+            if name not in self._objects and self._is_numeric(data.iloc[:, position]):
+                numeric.append(position)
+                if name not in self._column_index:
+                    self._add_column(name)
+            else:
+                objects.append((name, position))
+                if name not in self._objects:
+                    self._add_object(name)
+        columns = np.array([self._column_index[data.columns[position]] for position in numeric], dtype=np.intp)
+        plan = (columns, None if len(numeric) == len(data.columns) else numeric, objects)
+        self._row_columns[tuple(data.columns)] = plan
+        return plan
+
+    def _to_rows(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, dict]:
+        """(timestamps, values in buffer column order, non-numeric values per column) of the bars."""
+        index = data.index
+        if isinstance(index, pd.MultiIndex):
+            index = index.get_level_values('timestamp' if 'timestamp' in index.names else -1)
+        if not isinstance(index, pd.DatetimeIndex):
+            index = pd.DatetimeIndex(index)
+        if len(self) == 0 and self._tz is None:
+            self._tz = index.tz
+        if index.tz is None and self._tz is not None:
+            index = index.tz_localize(self._tz)
+        timestamps = index.as_unit('ns').asi8
+
+        plan = self._row_columns.get(tuple(data.columns))
+        if plan is None:
+            plan = self._plan(data)
+        try:
+            data_values = (data if plan[1] is None else data.iloc[:, plan[1]]).to_numpy(dtype=np.float64, na_value=np.nan)
+        except (TypeError, ValueError):
+            # a numeric column now holds text - it moves to the non-numeric columns
+            plan = self._plan(data)
+            data_values = (data if plan[1] is None else data.iloc[:, plan[1]]).to_numpy(dtype=np.float64, na_value=np.nan)
+        columns, _, objectColumns = plan
+
+        values = np.full((len(data), len(self.columns)), np.nan)
+        values[:, columns] = data_values
+        objects = {name: data.iloc[:, position].to_numpy(dtype=object) for name, position in objectColumns}
+        return timestamps, values, objects
+
+    def append(self, data: pd.DataFrame, limit: Optional[int] = None):
+        """Append the bars and keep at most `limit` rows (None - no limit)."""
+        self._absorb()
+        if data is None or data.empty:
+            return
+        timestamps, values, objects = self._to_rows(data)
+
+        keep = ~pd.Index(timestamps).duplicated(keep='first')
+        if not keep.all():
+            timestamps, values = timestamps[keep], values[keep]
+            objects = {name: column[keep] for name, column in objects.items()}
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, values = timestamps[order], values[order]
+            objects = {name: column[order] for name, column in objects.items()}
+
+        if len(self) and timestamps[0] <= self._timestamps[self._end - 1]:
+            # bars at or before the end of the history - only insert the unseen ones
+            for i, (timestamp, row) in enumerate(zip(timestamps, values)):
+                self._insert(timestamp, row, {name: column[i] for name, column in objects.items()}, limit)
+        else:
+            rows = len(timestamps)
+            self._reserve(rows, limit)
+            self._values[self._end:self._end + rows] = values
+            self._timestamps[self._end:self._end + rows] = timestamps
+            for name, column in self._objects.items():
+                column[self._end:self._end + rows] = objects.get(name, np.nan)
+            self._end += rows
+
+        if limit is not None and len(self) > limit:
+            self._start = self._end - limit
+
+    def _insert(self, timestamp: int, row: np.ndarray, objects: dict, limit: Optional[int]):
+        window = self._timestamps[self._start:self._end]
+        position = int(np.searchsorted(window, timestamp))
+        if position < len(window) and window[position] == timestamp:
+            return
+        self._reserve(1, limit)
+        at = self._start + position
+        self._values[at + 1:self._end + 1] = self._values[at:self._end]
+        self._timestamps[at + 1:self._end + 1] = self._timestamps[at:self._end]
+        self._values[at] = row
+        self._timestamps[at] = timestamp
+        for name, column in self._objects.items():
+            column[at + 1:self._end + 1] = column[at:self._end]
+            column[at] = objects.get(name, np.nan)
+        self._end += 1
+        self.version += 1
+
+    @classmethod
+    def from_frame(cls, symbol: str, data: Optional[pd.DataFrame]) -> 'HistoryBuffer':
+        buffer = cls(symbol, capacity=len(data) if data is not None else 1)
+        if data is not None and not data.empty:
+            buffer.append(data)
+        return buffer
+
+
+class HistoryStore(MutableMapping):
+    """
+    The strategy HISTORY - a `HistoryBuffer` per symbol behind a dict of DataFrames.
+
+    `history[symbol]` returns the DataFrame view of the buffer and assigning a DataFrame replaces the buffer,
+    so code written against `dict[str, pd.DataFrame]` keeps working.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._buffers: dict[str, HistoryBuffer] = {}
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        return self._buffers[symbol].frame()
+
+    def __setitem__(self, symbol: str, data: pd.DataFrame):
+        self._buffers[symbol] = HistoryBuffer.from_frame(symbol, data)
+
+    def __delitem__(self, symbol: str):
+        del self._buffers[symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._buffers)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._buffers
+
+    def buffer(self, symbol: str) -> HistoryBuffer:
+        if symbol not in self._buffers:
+            self._buffers[symbol] = HistoryBuffer(symbol)
+        return self._buffers[symbol]
+
+    def append(self, symbol: str, data: pd.DataFrame, limit: Optional[int] = None) -> HistoryBuffer:
+        """Append the bars to the symbol's history and keep at most `limit` rows."""
+        buffer = self.buffer(symbol)
+        buffer.append(data, limit)
+        return buffer
+
+    def view(self, symbol: str) -> pd.DataFrame:
+        """The symbol's history indexed by timestamp."""
+        return self._buffers[symbol].view()
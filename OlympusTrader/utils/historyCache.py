@@ -0,0 +1,75 @@
+import datetime
+from typing import Callable, Optional
+
+import pandas as pd
+
+from .barStore import BarStore
+from .timeframe import ITimeFrame
+
+
+HistoryFetcher = Callable[[dict, datetime.datetime, datetime.datetime, ITimeFrame], pd.DataFrame]
+"""(asset, start, end, resolution) -> bars indexed by (symbol, timestamp) with start <= timestamp < end"""
+
+
+class HistoryCache:
+    """
+    Gap aware history cache on top of a BarStore.
+
+    A request for [start, end) is served from disk when it is already covered. Otherwise only the missing
+    gaps are fetched, merged into the store and the whole range is read back. The fetcher is any callable
+    with the `HistoryFetcher` signature so the cache can run against a stub data source.
+
+    Only what the fetched bars prove is marked as covered, so a short download is fetched again on the next request:
+      - never past now - later bars do not exist yet, and a bar that has not closed yet is not covered
+      - never past the last fetched bar - the tail may be missing because the source capped the range (e.g. the
+        yfinance intraday lookback) or the download was cut short
+      - a gap that fetches no bars at all is only covered when it lies in the past between stored bars (a weekend,
+        a halt) - anything else may be a failed download and must not be cached as "no data"
+
+    Usage:
+      cache = HistoryCache('data', broker._download_history)
+      cache.get(asset, start, end, resolution)
+    """
+
+    def __init__(self, path: str, fetcher: HistoryFetcher, store: Optional[BarStore] = None):
+        self.store = store if store is not None else BarStore(path)
+        self.fetcher = fetcher
+        # requests served from disk without fetching / gaps fetched from the data source
+        self.hits = 0
+        self.fetches = 0
+
+    @staticmethod
+    def _to_datetime(ns: int) -> datetime.datetime:
+        return pd.Timestamp(ns, unit='ns', tz='UTC').to_pydatetime()
+
+    @staticmethod
+    def _to_ns(timestamp) -> int:
+        timestamp = pd.Timestamp(timestamp)
+        return int((timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp).value)
+
+    def _covered_after(self, symbol: str, timeFrame: str, ns: int) -> bool:
+        """Whether bars were stored from ns on - the data source has bars after a gap that ends at ns."""
+        return not self.store.gaps(symbol, timeFrame, ns, ns + 1)
+
+    def get(self, asset: dict, start: datetime.datetime, end: datetime.datetime, resolution: ITimeFrame) -> pd.DataFrame:
+        symbol, timeFrame = asset['symbol'], str(resolution)
+        gaps = self.store.gaps(symbol, timeFrame, start, end)
+        if not gaps:
+            self.hits += 1
+        now = self._to_ns(datetime.datetime.now(datetime.timezone.utc))
+        step = pd.Timedelta(resolution.to_timeDelta()).value
+        for gapStart, gapEnd in gaps:
+            self.fetches += 1
+            bars = self.fetcher(asset, self._to_datetime(gapStart), self._to_datetime(gapEnd), resolution)
+            if bars is None or bars.empty:
+                if gapEnd <= now and self._covered_after(symbol, timeFrame, gapEnd):
+                    self.store.write(symbol, timeFrame, pd.DataFrame(), gapStart, gapEnd)
+                continue
+            timestamps = bars.index.get_level_values('timestamp') if isinstance(bars.index, pd.MultiIndex) else bars.index
+            last = self._to_ns(pd.DatetimeIndex(timestamps).max())
+            # covered up to the end of the last bar (the tail may be missing) - and not the last bar if it is still open
+            coverEnd = min(gapEnd, last + step) if last + step <= now else min(gapEnd, last)
+            self.store.write(symbol, timeFrame, bars, gapStart, coverEnd)
+
+        # part of the range may not have been fetched - return what is held
+        return self.store.read(symbol, timeFrame, start, end, partial=True)
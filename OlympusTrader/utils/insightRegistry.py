@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+from collections import deque
+from collections.abc import MutableMapping
+from dataclasses import asdict
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+
+from ..insight.insight import Insight, InsightState
+
+
+class InsightArchive:
+    """
+    Compact record of the insights that reached a terminal state (CLOSED, CANCELED, REJECTED).
+
+    Only the `IInsight` snapshot (plain dict) of an insight is kept - not the insight with its broker, asset and legs.
+    The last `limit` records stay in memory, with a `path` every record is also appended to a JSON lines file so the
+    full history survives past the in-memory window and the process.
+
+    Usage:
+      archive = InsightArchive('data/insights.jsonl', limit=10_000)
+      archive.add(insight)
+      archive.records()  # newest last
+    """
+
+    def __init__(self, path: Optional[str] = None, limit: Optional[int] = 10_000):
+        self.path = path
+        self._records: deque[dict] = deque(maxlen=limit)
+        self._lock = threading.Lock()
+        # terminal state counts over every archived insight, not only the ones still in memory
+        self.counts: dict[str, int] = {state.value: 0 for state in Insight.TERMINAL_STATES}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, insight: Insight):
+        record = asdict(insight.dataclass)
+        with self._lock:
+            self._records.append(record)
+            self.counts[record['state']] = self.counts.get(record['state'], 0) + 1
+            self.total += 1
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+
+    def get(self, insight_id) -> Optional[dict]:
+        """The record of an archived insight still in memory."""
+        insight_id = str(insight_id)
+        with self._lock:
+            for record in reversed(self._records):
+                if record['insight_id'] == insight_id:
+                    return record
+        return None
+
+    def records(self, symbol: Optional[str] = None) -> list[dict]:
+        """The in-memory records (oldest first), only the symbol's when given."""
+        with self._lock:
+            return [record for record in self._records if symbol is None or record['symbol'] == symbol]
+
+
+class InsightRegistry(MutableMapping):
+    """
+    The strategy INSIGHTS - the live insights by id, indexed by state and by symbol.
+
+    It is a `dict[UUID, Insight]` to the code using it, the indexes follow the state changes the insights report
+    (`Insight.updateState`). `state(...)` and `symbol(...)` return the matching insights in the order they were added
+    without walking the rest.
+
+    Deleting an insight in a terminal state (CLOSED, CANCELED, REJECTED) moves it to the `ARCHIVE`, `archive()`
+    does the same for one that is still registered - so the live mapping only holds what the strategy can still act on.
+    """
+    TERMINAL_STATES = Insight.TERMINAL_STATES
+
+    def __init__(self, *args, archive: Optional[InsightArchive] = None, **kwargs):
+        self._insights: dict[UUID, Insight] = {}
+        self._order: dict[UUID, int] = {}
+        self._sequence = 0
+        self._by_state: dict[InsightState, dict[UUID, Insight]] = {state: {} for state in InsightState}
+        self._by_symbol: dict[str, dict[UUID, Insight]] = {}
+        self.ARCHIVE = archive if archive is not None else InsightArchive()
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, insight_id: UUID) -> Insight:
+        return self._insights[insight_id]
+
+    def __setitem__(self, insight_id: UUID, insight: Insight):
+        if insight_id in self._insights:
+            self._unindex(insight_id, self._insights[insight_id])
+        else:
+            self._order[insight_id] = self._sequence
+            self._sequence += 1
+        self._insights[insight_id] = insight
+        self._by_state[insight.state][insight_id] = insight
+        self._by_symbol.setdefault(insight.symbol, {})[insight_id] = insight
+        insight._ON_STATE_CHANGE = self._moved
+
+    def __delitem__(self, insight_id: UUID):
+        insight = self._insights.pop(insight_id)
+        self._unindex(insight_id, insight)
+        del self._order[insight_id]
+        insight._ON_STATE_CHANGE = None
+        if insight.state in self.TERMINAL_STATES:
+            self.ARCHIVE.add(insight)
+
+    def __iter__(self) -> Iterator[UUID]:
+        return iter(self._insights)
+
+    def __len__(self) -> int:
+        return len(self._insights)
+
+    def __contains__(self, insight_id) -> bool:
+        return insight_id in self._insights
+
+    def _unindex(self, insight_id: UUID, insight: Insight):
+        for index in self._by_state.values():
+            if index.pop(insight_id, None) is not None:
+                break
+        symbol = self._by_symbol.get(insight.symbol)
+        if symbol is not None:
+            symbol.pop(insight_id, None)
+            if not symbol:
+                del self._by_symbol[insight.symbol]
+
+    def _moved(self, insight: Insight, previous: InsightState):
+        insight_id = insight.INSIGHT_ID
+        if self._insights.get(insight_id) is not insight:
+            return
+        if self._by_state[previous].pop(insight_id, None) is None:
+            self._unindex(insight_id, insight)
+            self._by_symbol.setdefault(insight.symbol, {})[insight_id] = insight
+        self._by_state[insight.state][insight_id] = insight
+
+    def state(self, *states: InsightState) -> list[Insight]:
+        """The insights in any of the states, in the order they were added."""
+        if len(states) == 1:
+            return list(self._by_state[states[0]].values())
+        insights = [insight for state in states for insight in self._by_state[state].values()]
+        insights.sort(key=lambda insight: self._order[insight.INSIGHT_ID])
+        return insights
+
+    def count(self, state: InsightState) -> int:
+        return len(self._by_state[state])
+
+    def symbol(self, symbol: str) -> list[Insight]:
+        """The symbol's insights, in the order they were added."""
+        return list(self._by_symbol.get(symbol, {}).values())
+
+    def archive(self, insights: Iterable[Insight]):
+        """Move the insights that are in a terminal state to the archive."""
+        for insight in list(insights):
+            if insight.state in self.TERMINAL_STATES and self._insights.get(insight.INSIGHT_ID) is insight:
+                del self[insight.INSIGHT_ID]
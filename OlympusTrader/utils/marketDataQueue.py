@@ -0,0 +1,194 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Hashable, Literal, Optional
+
+import pandas as pd
+
+from .timeframe import ITimeFrame
+
+
+OverflowPolicy = Literal['block', 'drop_oldest', 'coalesce']
+
+
+def bar_symbol(bar: Any) -> Hashable:
+    """The symbol of a bar from a broker market data stream - the first level of a (symbol, timestamp) frame index or
+    the `symbol` of a raw broker bar."""
+    if isinstance(bar, pd.DataFrame) and not bar.empty:
+        index = bar.index[0]
+        return index[0] if isinstance(index, tuple) else index
+    return getattr(bar, 'symbol', None)
+
+
+class MarketDataQueue:
+    """
+    Bounded per (symbol, time frame) queue between the broker market data producers and the strategy `_on_bar`.
+
+    `put` is the callback handed to `broker.streamMarketData`, `get` returns the next bar round robin over the symbols
+    so a busy symbol does not starve the others. When a symbol has `maxsize` bars waiting the overflow policy applies:
+      - block: the producer waits until the strategy took a bar (backpressure on the broker stream)
+      - drop_oldest: the oldest waiting bar is dropped
+      - coalesce: the bar is merged into the newest waiting one - open of the older bar, high / low over both, close of
+        the newer, volumes summed, at the newer timestamp (a bar with the same timestamp replaces it)
+
+    Producers may run on another thread / event loop than the strategy (e.g. the alpaca stream client).
+    `metrics()` reports per symbol the queue depth and how many bars were dropped, coalesced or made a producer wait.
+
+    Usage:
+      queue = MarketDataQueue(maxsize=100, policy='coalesce')
+      await broker.streamMarketData(queue.put, streams)
+      bar, timeframe = await queue.get()
+      bars = await queue.get_batch(4)  # up to 4 bars of different symbols
+    """
+    POLICIES: tuple[OverflowPolicy, ...] = ('block', 'drop_oldest', 'coalesce')
+
+    def __init__(self, maxsize: int = 100, policy: OverflowPolicy = 'block'):
+        assert maxsize > 0, 'maxsize must be positive'
+        assert policy in self.POLICIES, f'policy must be one of {self.POLICIES}'
+        self.maxsize = maxsize
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._queues: dict[tuple[Hashable, str], deque[tuple[Any, ITimeFrame]]] = {}
+        self._ready: deque[tuple[Hashable, str]] = deque()
+        """Keys with bars waiting, in the order they are served"""
+        self._getters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._putters: dict[tuple[Hashable, str], deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._metrics: dict[Hashable, dict[str, int]] = {}
+
+    @staticmethod
+    def _waiter() -> tuple[asyncio.AbstractEventLoop, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        return loop, loop.create_future()
+
+    @staticmethod
+    def _wake(waiters: Optional[deque]):
+        """Wake the first waiter that is still waiting, from any thread."""
+        while waiters:
+            loop, future = waiters.popleft()
+            if future.done():
+                # cancelled
+                continue
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                future.set_result(None)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+            return
+
+    @staticmethod
+    def _coalesce(older: Any, newer: Any) -> Any:
+        """One bar spanning both bars, at the newer bar timestamp."""
+        if (
+            not isinstance(older, pd.DataFrame)
+            or not isinstance(newer, pd.DataFrame)
+            or older.empty
+            or newer.empty
+            or older.index[-1] == newer.index[-1]
+        ):
+            return newer
+        bar = newer.iloc[-1:].copy()
+        if 'open' in bar.columns:
+            bar['open'] = older['open'].iloc[0]
+        if 'high' in bar.columns:
+            bar['high'] = max(older['high'].max(), bar['high'].iloc[0])
+        if 'low' in bar.columns:
+            bar['low'] = min(older['low'].min(), bar['low'].iloc[0])
+        if 'volume' in bar.columns:
+            bar['volume'] = older['volume'].sum() + bar['volume'].iloc[0]
+        return bar
+
+    async def put(self, bar: Any, timeframe: ITimeFrame):
+        symbol = bar_symbol(bar)
+        key = (symbol, timeframe.value)
+        while True:
+            with self._lock:
+                queue = self._queues.get(key)
+                if queue is None:
+                    queue = self._queues[key] = deque()
+                metrics = self._metrics.get(symbol)
+                if metrics is None:
+                    metrics = self._metrics[symbol] = {
+                        'received': 0, 'delivered': 0, 'dropped': 0, 'coalesced': 0, 'blocked': 0, 'max_depth': 0}
+                if len(queue) < self.maxsize:
+                    queue.append((bar, timeframe))
+                    metrics['received'] += 1
+                    metrics['max_depth'] = max(metrics['max_depth'], len(queue))
+                    if len(queue) == 1:
+                        self._ready.append(key)
+                        self._wake(self._getters)
+                    return
+                if self.policy == 'drop_oldest':
+                    queue.popleft()
+                    queue.append((bar, timeframe))
+                    metrics['received'] += 1
+                    metrics['dropped'] += 1
+                    return
+                if self.policy == 'coalesce':
+                    queue[-1] = (self._coalesce(queue[-1][0], bar), timeframe)
+                    metrics['received'] += 1
+                    metrics['coalesced'] += 1
+                    return
+                # block until the strategy takes a bar of the key
+                metrics['blocked'] += 1
+                waiter = self._waiter()
+                self._putters.setdefault(key, deque()).append(waiter)
+            await waiter[1]
+
+    def _take(self, key: tuple[Hashable, str]) -> tuple[Any, ITimeFrame]:
+        """Pop the oldest bar of the key at the head of _ready - called with the lock held."""
+        self._ready.popleft()
+        queue = self._queues[key]
+        bar, timeframe = queue.popleft()
+        if queue:
+            self._ready.append(key)
+        self._metrics[key[0]]['delivered'] += 1
+        self._wake(self._putters.get(key))
+        return bar, timeframe
+
+    async def get(self) -> tuple[Any, ITimeFrame]:
+        """The next bar and its time frame - the oldest bar of the next symbol in turn."""
+        while True:
+            with self._lock:
+                while self._ready:
+                    key = self._ready[0]
+                    if not self._queues[key]:
+                        self._ready.popleft()
+                        continue
+                    return self._take(key)
+                waiter = self._waiter()
+                self._getters.append(waiter)
+            await waiter[1]
+
+    async def get_batch(self, limit: int) -> list[tuple[Any, ITimeFrame]]:
+        """Up to `limit` bars of different symbols, taken in turn like `get` - waits for the first bar only. The batch
+        ends at the first symbol already in it, so a symbol's bars are never in the same batch."""
+        batch = [await self.get()]
+        symbols = {bar_symbol(batch[0][0])}
+        with self._lock:
+            while len(batch) < limit and self._ready:
+                key = self._ready[0]
+                if not self._queues[key]:
+                    self._ready.popleft()
+                    continue
+                if key[0] in symbols:
+                    break
+                symbols.add(key[0])
+                batch.append(self._take(key))
+        return batch
+
+    def depth(self) -> int:
+        """Bars waiting over every symbol."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def metrics(self) -> dict[Hashable, dict[str, int]]:
+        """Per symbol: depth (bars waiting now), max_depth, received, delivered, dropped (drop_oldest), coalesced and
+        blocked (times a producer had to wait)."""
+        with self._lock:
+            result = {symbol: {'depth': 0, **metrics} for symbol, metrics in self._metrics.items()}
+            for (symbol, _), queue in self._queues.items():
+                result[symbol]['depth'] += len(queue)
+            return result
@@ -0,0 +1,111 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from typing import Hashable, Iterator, Optional
+
+
+class PriceTriggerIndex:
+    """
+    Sorted price levels per (symbol, book) used by the paper fill simulator to find the orders
+    whose trigger price can be reached by a bar without checking every resting order.
+
+    A book is any hashable label, e.g. (IOrderType.LIMIT, IOrderSide.BUY) or ('take_profit', IOrderSide.SELL).
+    Each key (order_id) holds at most one price per book. Queries return keys in price order and are
+    inclusive on both bounds, callers re-check their exact fill condition on the returned keys.
+
+    Usage:
+      index = PriceTriggerIndex()
+      index.add('AAPL', ('limit', 'buy'), 101.5, order_id)
+      index.between('AAPL', ('limit', 'buy'), bar.low, bar.high)
+      index.discard(order_id)
+    """
+
+    def __init__(self):
+        self._levels: dict[str, dict[Hashable, list[tuple[float, int, Hashable]]]] = {}
+        self._keys: dict[Hashable, dict[Hashable, tuple[str, tuple[float, int, Hashable]]]] = {}
+        self._seq = count()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._keys))
+
+    def symbols(self) -> list[str]:
+        """Symbols that currently have at least one price level."""
+        return [symbol for symbol, books in self._levels.items() if any(books.values())]
+
+    def books(self, symbol: str) -> list[Hashable]:
+        return [book for book, levels in self._levels.get(symbol, {}).items() if levels]
+
+    def levels(self, key: Hashable) -> dict[Hashable, float]:
+        """The indexed price of the key in each book."""
+        return {book: entry[0] for book, (_, entry) in self._keys.get(key, {}).items()}
+
+    def add(self, symbol: str, book: Hashable, price: Optional[float], key: Hashable) -> bool:
+        """Index (or move) the key at price in the book. Returns False when the price cannot be indexed."""
+        if price is None or isinstance(price, bool):
+            return False
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            return False
+        if math.isnan(price):
+            return False
+
+        current = self._keys.get(key, {}).get(book)
+        if current is not None:
+            if current[0] == symbol and current[1][0] == price:
+                return True
+            self._remove(key, book)
+
+        entry = (price, next(self._seq), key)
+        insort(self._levels.setdefault(symbol, {}).setdefault(book, []), entry)
+        self._keys.setdefault(key, {})[book] = (symbol, entry)
+        return True
+
+    def discard(self, key: Hashable, book: Optional[Hashable] = None):
+        """Remove the key from one book, or from every book when book is None."""
+        if key not in self._keys:
+            return
+        for keyBook in ([book] if book is not None else list(self._keys[key])):
+            self._remove(key, keyBook)
+
+    def _remove(self, key: Hashable, book: Hashable):
+        keyBooks = self._keys.get(key)
+        if not keyBooks or book not in keyBooks:
+            return
+        symbol, entry = keyBooks.pop(book)
+        if not keyBooks:
+            del self._keys[key]
+        levels = self._levels[symbol][book]
+        # (price, seq) is unique so the entry sits exactly at the left insertion point
+        i = bisect_left(levels, entry[:2])
+        if i < len(levels) and levels[i] is entry:
+            del levels[i]
+
+    def between(self, symbol: str, book: Hashable, low: float, high: float) -> list[Hashable]:
+        """Keys with low <= price <= high."""
+        levels = self._levels.get(symbol, {}).get(book)
+        if not levels or not (low <= high):
+            return []
+        start = bisect_left(levels, (low,))
+        end = bisect_right(levels, (high, math.inf))
+        return [entry[2] for entry in levels[start:end]]
+
+    def at_or_below(self, symbol: str, book: Hashable, price: float) -> list[Hashable]:
+        """Keys with price <= the given price."""
+        levels = self._levels.get(symbol, {}).get(book)
+        if not levels or math.isnan(price):
+            return []
+        return [entry[2] for entry in levels[:bisect_right(levels, (price, math.inf))]]
+
+    def at_or_above(self, symbol: str, book: Hashable, price: float) -> list[Hashable]:
+        """Keys with price >= the given price."""
+        levels = self._levels.get(symbol, {}).get(book)
+        if not levels or math.isnan(price):
+            return []
+        return [entry[2] for entry in levels[bisect_left(levels, (price,)):]]
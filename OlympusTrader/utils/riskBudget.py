@@ -0,0 +1,62 @@
+import threading
+from typing import Optional
+
+
+class RiskBudget:
+    """
+    Global buying power and open position limits shared by strategies running as separate processes (shards).
+
+    Every insight reserves its notional (quantity x entry price) before it is submitted and releases it once it is
+    closed, canceled or rejected. A reservation that would take the reserved notional over `buyingPower` or the
+    number of reservations over `maxPositions` is denied. None disables a limit.
+
+    It lives in the coordinator process - the shards call it through a multiprocessing manager proxy
+    (see ShardCoordinator) and GlobalRiskBudgetExecutor.
+
+    Usage:
+      budget = RiskBudget(buyingPower=100_000, maxPositions=10)
+      if budget.reserve(str(insight.INSIGHT_ID), insight.quantity * insight.limit_price):
+          insight.submit()
+      budget.release(str(insight.INSIGHT_ID))
+    """
+
+    def __init__(self, buyingPower: Optional[float] = None, maxPositions: Optional[int] = None):
+        self.buyingPower = buyingPower
+        self.maxPositions = maxPositions
+        self._lock = threading.Lock()
+        self._reserved: dict[str, float] = {}
+        self._denied = 0
+        self._peak = 0.0
+
+    def reserve(self, key: str, notional: float) -> bool:
+        """Reserve (or resize the reservation of) the key, False when it does not fit the limits."""
+        notional = abs(float(notional))
+        with self._lock:
+            current = self._reserved.get(key)
+            positions = len(self._reserved) + (current is None)
+            reserved = sum(self._reserved.values()) - (current or 0.0) + notional
+            if (
+                (self.maxPositions is not None and positions > self.maxPositions)
+                or (self.buyingPower is not None and reserved > self.buyingPower)
+            ):
+                self._denied += 1
+                return False
+            self._reserved[key] = notional
+            self._peak = max(self._peak, reserved)
+            return True
+
+    def release(self, key: str):
+        with self._lock:
+            self._reserved.pop(key, None)
+
+    def snapshot(self) -> dict:
+        """Reserved notional and positions now, the peak reserved notional and the denied reservations."""
+        with self._lock:
+            return {
+                'buyingPower': self.buyingPower,
+                'maxPositions': self.maxPositions,
+                'reserved': sum(self._reserved.values()),
+                'positions': len(self._reserved),
+                'peak': self._peak,
+                'denied': self._denied,
+            }
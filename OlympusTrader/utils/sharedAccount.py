@@ -0,0 +1,81 @@
+import dataclasses
+import threading
+from typing import Optional
+
+import numpy as np
+
+from ..broker.interfaces import IAccount, IPosition
+
+
+class SharedAccount:
+    """
+    The one broker account of a sharded run - the shard brokers trade it instead of an account of their own.
+
+    Each shard broker keeps the order book and positions of its symbols (their bars are only loaded there) and reports
+    its realized P&L and open position totals after every position change. The account is worked out over every shard
+    the way PaperBroker.update_account_balance does it for a single broker:
+      - cash: starting cash + the realized P&L of every shard
+      - equity: cash + the unrealized P&L of every shard
+      - buying power: cash x leverage - the market value of the open positions of every shard
+
+    It lives in the coordinator process - the shards call it through a multiprocessing manager proxy (see
+    ShardCoordinator and PaperBroker.attach_shared_account). Each call is atomic, an order check and its fill are not:
+    two shards can both pass the buying power check of the same step, the RiskBudget reserves entries across shards.
+
+    Usage:
+      account = SharedAccount(broker.get_account())
+      account.update(shard, realizedPL, unrealizedPL, marketValue, openPositions).buying_power
+      account.get_positions(exclude=shard)
+    """
+
+    def __init__(self, account: IAccount):
+        self.startingCash = account.cash
+        self._account = dataclasses.replace(account)
+        self._lock = threading.Lock()
+        self._shards: dict[int, tuple[float, float, float, int]] = {}
+        """Shard -> (realized P&L, unrealized P&L, market value, open positions) last reported"""
+        self._positions: dict[int, dict[str, IPosition]] = {}
+
+    def _refresh(self):
+        """Work the account out over the shard totals - called with the lock held."""
+        realized = sum(totals[0] for totals in self._shards.values())
+        unrealized = sum(totals[1] for totals in self._shards.values())
+        marketValue = sum(totals[2] for totals in self._shards.values())
+        self._account.cash = max(np.round(self.startingCash + realized, 2), 0)
+        self._account.equity = max(np.round(self._account.cash + unrealized, 2), 0)
+        self._account.buying_power = max(np.round(self._account.cash * self._account.leverage - marketValue, 2), 0)
+
+    def update(self, shard: int, realizedPL: float, unrealizedPL: float, marketValue: float, openPositions: int) -> IAccount:
+        """Record the totals of the shard and return the account over every shard."""
+        with self._lock:
+            self._shards[shard] = (float(realizedPL), float(unrealizedPL), float(marketValue), int(openPositions))
+            self._refresh()
+            return dataclasses.replace(self._account)
+
+    def update_positions(self, shard: int, positions: dict[str, IPosition]):
+        """Replace the open positions reported by the shard (once per step)."""
+        with self._lock:
+            self._positions[shard] = positions
+
+    def get_account(self) -> IAccount:
+        with self._lock:
+            return dataclasses.replace(self._account)
+
+    def get_positions(self, exclude: Optional[int] = None) -> dict[str, IPosition]:
+        """The open positions of every shard, but the `exclude` one, as of the last step they reported."""
+        with self._lock:
+            return {symbol: position for shard, positions in self._positions.items() if shard != exclude
+                    for symbol, position in positions.items()}
+
+    def snapshot(self) -> dict:
+        """Starting cash, the account now and the open positions / market value over every shard."""
+        with self._lock:
+            return {
+                'startingCash': self.startingCash,
+                'cash': self._account.cash,
+                'equity': self._account.equity,
+                'buyingPower': self._account.buying_power,
+                'marketValue': sum(totals[2] for totals in self._shards.values()),
+                'openPositions': sum(totals[3] for totals in self._shards.values()),
+                'shards': len(self._shards),
+            }
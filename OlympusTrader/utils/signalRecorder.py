@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+
+class SignalRecorder:
+    """
+    Columnar backtest signals for one asset, preallocated for every bar and addressed by bar position.
+    Written on every fill by the paper broker and only turned into the VectorBT `from_signals` DataFrame on request.
+
+    Columns:
+      entries, short_entries, exits, short_exits - bool
+      price - float, NaN when no fill happened on the bar
+      qty - float, signed (long entries / short exits add, short entries / long exits subtract)
+    """
+    COLUMNS = ('entries', 'short_entries', 'exits', 'short_exits', 'price', 'qty')
+
+    def __init__(self, index: pd.Index):
+        size = len(index)
+        self.index = index
+        self.entries = np.zeros(size, dtype=bool)
+        self.short_entries = np.zeros(size, dtype=bool)
+        self.exits = np.zeros(size, dtype=bool)
+        self.short_exits = np.zeros(size, dtype=bool)
+        self.price = np.full(size, np.nan, dtype=np.float64)
+        self.qty = np.zeros(size, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get_row(self, label) -> int:
+        """Bar position of an index label."""
+        row = self.index.get_loc(label)
+        if isinstance(row, slice):
+            return row.start
+        if isinstance(row, np.ndarray):
+            return int(np.flatnonzero(row)[0])
+        return int(row)
+
+    def to_frame(self) -> pd.DataFrame:
+        """The signals as a DataFrame on the bar index (copies the arrays)."""
+        return pd.DataFrame({column: getattr(self, column).copy() for column in self.COLUMNS}, index=self.index)
@@ -0,0 +1,327 @@
+import math
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+from .historyBuffer import HistoryBuffer
+
+
+NAN = float('nan')
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+def _length(spec: dict, key: str, default: int) -> Optional[int]:
+    """The pandas-ta length parameter, None when it is not a usable int."""
+    value = spec.get(key)
+    if value is None:
+        return default
+    return int(value) if _is_int(value) and value > 0 else None
+
+
+def _non_zero(value: float) -> float:
+    """pandas-ta non_zero_range - zero ranges get an epsilon so they can be divided by."""
+    return value + np.finfo(float).eps if value == 0 else value
+
+
+class _EMA:
+    """pandas-ta ema: SMA of the first `length` values, then ewm(span=length, adjust=False)."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.value = NAN
+        self._seed: list[float] = []
+
+    def update(self, x: float) -> float:
+        if math.isnan(self.value):
+            if not math.isnan(x):
+                self._seed.append(x)
+            if len(self._seed) < self.length:
+                return NAN
+            self.value = sum(self._seed) / len(self._seed)
+            self._seed = []
+            return self.value
+        if not math.isnan(x):
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class _RMA:
+    """pandas-ta rma: ewm(alpha=1/length, adjust=False) from the first value."""
+
+    def __init__(self, length: int, value: float = NAN):
+        self.alpha = 1.0 / length
+        self.value = value
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        self.value = x if math.isnan(self.value) else (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class _Window:
+    """The last `length` values."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values: deque[float] = deque(maxlen=length)
+
+    def update(self, x: float) -> bool:
+        self.values.append(x)
+        return len(self.values) == self.length and not any(math.isnan(v) for v in self.values)
+
+
+class StreamingIndicator:
+    """One pandas-ta indicator updated a bar at a time. `update` returns a value per column (NaN until ready)."""
+    columns: tuple[str, ...] = ()
+
+    def update(self, open: float, high: float, low: float, close: float) -> tuple[float, ...]:
+        raise NotImplementedError
+
+
+class StreamingEMA(StreamingIndicator):
+    def __init__(self, length: int):
+        self.columns = (f"EMA_{length}",)
+        self._ema = _EMA(length)
+
+    def update(self, open, high, low, close):
+        return (self._ema.update(close),)
+
+
+class StreamingSMA(StreamingIndicator):
+    def __init__(self, length: int):
+        self.columns = (f"SMA_{length}",)
+        self._window = _Window(length)
+
+    def update(self, open, high, low, close):
+        if not self._window.update(close):
+            return (NAN,)
+        return (sum(self._window.values) / self._window.length,)
+
+
+class StreamingRSI(StreamingIndicator):
+    def __init__(self, length: int, scalar: float):
+        self.columns = (f"RSI_{length}",)
+        self.scalar = scalar
+        self._positive = _RMA(length)
+        self._negative = _RMA(length)
+        self._close = NAN
+
+    def update(self, open, high, low, close):
+        change, self._close = close - self._close, close
+        if math.isnan(change):
+            return (NAN,)
+        positive = self._positive.update(max(change, 0.0))
+        negative = abs(self._negative.update(min(change, 0.0)))
+        if positive + negative == 0:
+            return (NAN,)
+        return (self.scalar * positive / (positive + negative),)
+
+
+class StreamingATR(StreamingIndicator):
+    """pandas-ta atr: true range, SMA of the first `length` ranges, then rma."""
+
+    def __init__(self, length: int):
+        self.columns = (f"ATRr_{length}",)
+        self._seed: list[float] = []
+        self._length = length
+        self._rma: Optional[_RMA] = None
+        self._close = NAN
+
+    def update(self, open, high, low, close):
+        previous, self._close = self._close, close
+        ranges = [abs(high - low), abs(high - previous), abs(previous - low)]
+        ranges = [r for r in ranges if not math.isnan(r)]
+        true_range = max(ranges) if ranges else NAN
+        if self._rma is None:
+            self._seed.append(true_range)
+            if len(self._seed) < self._length:
+                return (NAN,)
+            seed = [r for r in self._seed if not math.isnan(r)]
+            self._rma = _RMA(self._length, sum(seed) / len(seed) if seed else NAN)
+            self._seed = []
+            return (self._rma.value,)
+        return (self._rma.update(true_range),)
+
+
+class StreamingMACD(StreamingIndicator):
+    def __init__(self, fast: int, slow: int, signal: int):
+        if slow < fast:
+            fast, slow = slow, fast
+        props = f"_{fast}_{slow}_{signal}"
+        self.columns = (f"MACD{props}", f"MACDh{props}", f"MACDs{props}")
+        self._fast = _EMA(fast)
+        self._slow = _EMA(slow)
+        self._signal = _EMA(signal)
+
+    def update(self, open, high, low, close):
+        macd = self._fast.update(close) - self._slow.update(close)
+        if math.isnan(macd):
+            return (NAN, NAN, NAN)
+        signal = self._signal.update(macd)
+        return (macd, macd - signal, signal)
+
+
+class StreamingBBands(StreamingIndicator):
+    def __init__(self, length: int, lower_std: float, upper_std: float, ddof: int):
+        props = f"_{length}_{lower_std}_{upper_std}"
+        self.columns = (f"BBL{props}", f"BBM{props}", f"BBU{props}", f"BBB{props}", f"BBP{props}")
+        self.lower_std, self.upper_std, self.ddof = float(lower_std), float(upper_std), ddof
+        self._window = _Window(length)
+
+    def update(self, open, high, low, close):
+        if not self._window.update(close):
+            return (NAN,) * 5
+        values = self._window.values
+        mid = sum(values) / len(values)
+        std = math.sqrt(sum((v - mid) ** 2 for v in values) / (len(values) - self.ddof))
+        lower, upper = mid - self.lower_std * std, mid + self.upper_std * std
+        width = _non_zero(upper - lower)
+        return (lower, mid, upper, 100 * width / mid if mid else NAN, _non_zero(close - lower) / width)
+
+
+# parameters a streaming indicator accepts, any other key (prefix, suffix, col_names, fillna, params ...) uses the full recompute
+# (`append` is written into the entries by df.ta.study)
+_COMMON = {'kind', 'talib', 'offset', 'append'}
+_KINDS: dict[str, set[str]] = {
+    'ema': _COMMON | {'length', 'presma', 'adjust'},
+    'sma': _COMMON | {'length'},
+    'rsi': _COMMON | {'length', 'scalar', 'drift', 'mamode'},
+    'atr': _COMMON | {'length', 'drift', 'mamode', 'prenan', 'percent', 'presma'},
+    'macd': _COMMON | {'fast', 'slow', 'signal', 'asmode'},
+    'bbands': _COMMON | {'length', 'lower_std', 'upper_std', 'ddof', 'mamode'},
+}
+# kinds where TA-Lib (used by pandas-ta when installed) is seeded differently from the pandas-ta formulas
+_TALIB_DIFFERS = {'rsi', 'atr', 'macd', 'bbands'}
+
+
+def streaming_indicator(spec: dict, talib: bool = False) -> Optional[Callable[[], StreamingIndicator]]:
+    """A factory for the streaming version of a pandas-ta study entry, None when it has to be recomputed.
+
+    talib: TA-Lib is installed - pandas-ta uses it unless the entry sets talib=False.
+    """
+    kind = spec.get('kind')
+    if kind not in _KINDS or not set(spec) <= _KINDS[kind]:
+        return None
+    if spec.get('offset') not in (None, 0):
+        return None
+    if talib and spec.get('talib', True) is not False and kind in _TALIB_DIFFERS:
+        return None
+    if spec.get('drift') not in (None, 1) or spec.get('presma') not in (None, True) \
+            or spec.get('adjust') not in (None, False) or spec.get('prenan') not in (None, False) \
+            or spec.get('percent') not in (None, False) or spec.get('asmode') not in (None, False):
+        return None
+
+    match kind:
+        case 'ema' | 'sma':
+            length = _length(spec, 'length', 10)
+            if length is None:
+                return None
+            return (lambda: StreamingEMA(length)) if kind == 'ema' else (lambda: StreamingSMA(length))
+        case 'rsi':
+            length = _length(spec, 'length', 14)
+            scalar = spec.get('scalar')
+            scalar = float(scalar) if isinstance(scalar, (int, float, np.number)) else 100.0
+            if length is None or spec.get('mamode') not in (None, 'rma'):
+                return None
+            return lambda: StreamingRSI(length, scalar)
+        case 'atr':
+            length = _length(spec, 'length', 14)
+            if length is None or spec.get('mamode') not in (None, 'rma'):
+                return None
+            return lambda: StreamingATR(length)
+        case 'macd':
+            fast, slow, signal = _length(spec, 'fast', 12), _length(spec, 'slow', 26), _length(spec, 'signal', 9)
+            if None in (fast, slow, signal):
+                return None
+            return lambda: StreamingMACD(fast, slow, signal)
+        case 'bbands':
+            length = _length(spec, 'length', 5)
+            lower_std, upper_std = spec.get('lower_std', 2.0), spec.get('upper_std', 2.0)
+            if length is None or spec.get('mamode') not in (None, 'sma') \
+                    or not all(isinstance(std, (int, float)) and std > 0 for std in (lower_std, upper_std)):
+                return None
+            ddof = spec.get('ddof')
+            ddof = int(ddof) if _is_int(ddof) and 0 <= ddof < length else 1
+            return lambda: StreamingBBands(length, lower_std, upper_std, ddof)
+    return None
+
+
+class StreamingTA:
+    """
+    Incremental TA for one symbol's history. The supported study entries (ema, sma, rsi, atr, macd, bbands) are
+    updated for the new bars only and written into the HistoryBuffer under the pandas-ta column names,
+    `fallback` holds the entries that still need `df.ta.study`.
+
+    The state is rebuilt from the whole history when the history is replaced or a late bar is inserted, so the values
+    match a full recompute. Once the history is truncated the streaming values keep their state from the older bars
+    where a recompute would restart at the start of the window.
+
+    Usage:
+      engine = StreamingTA(study.ta, talib=ta.Imports['talib'])
+      engine.update(history.buffer(symbol))
+      if engine.fallback: history[symbol].ta.study(replace(study, ta=engine.fallback))
+    """
+
+    def __init__(self, specs: list[dict], talib: bool = False):
+        self.specs = list(specs)
+        self._factories: list[Callable[[], StreamingIndicator]] = []
+        self.fallback: list[dict] = []
+        for spec in self.specs:
+            factory = streaming_indicator(spec, talib)
+            if factory is None:
+                self.fallback.append(spec)
+            else:
+                self._factories.append(factory)
+        self._indicators: list[StreamingIndicator] = []
+        self._buffer: Optional[HistoryBuffer] = None
+        self._version = -1
+        self._last: Optional[int] = None
+
+    @property
+    def streaming(self) -> bool:
+        return bool(self._factories)
+
+    def reset(self):
+        self._indicators = [factory() for factory in self._factories]
+        self._last = None
+
+    def update(self, buffer: HistoryBuffer):
+        """Run the indicators over the bars added to the buffer since the last update."""
+        if not self._factories or len(buffer) == 0:
+            return
+        timestamps = buffer.timestamps
+        first = 0
+        if self._buffer is buffer and self._version == buffer.version and self._last is not None:
+            if timestamps[-1] == self._last:
+                return
+            position = int(np.searchsorted(timestamps, self._last))
+            if position < len(timestamps) and timestamps[position] == self._last:
+                first = position + 1
+        if first == 0:
+            self.reset()
+        self._buffer, self._version = buffer, buffer.version
+
+        try:
+            open, high, low, close = (buffer.column(name) for name in ('open', 'high', 'low', 'close'))
+        except KeyError:
+            return
+        rows = len(timestamps) - first
+        outputs = [np.full((rows, len(indicator.columns)), np.nan) for indicator in self._indicators]
+        for row in range(first, len(timestamps)):
+            bar = (float(open[row]), float(high[row]), float(low[row]), float(close[row]))
+            for indicator, output in zip(self._indicators, outputs):
+                output[row - first] = indicator.update(*bar)
+        self._last = int(timestamps[-1])
+
+        for indicator, output in zip(self._indicators, outputs):
+            for i, column in enumerate(indicator.columns):
+                values = output[:, i]
+                # like pandas-ta, no column until the indicator has a value
+                if column in buffer.columns or not np.isnan(values).all():
+                    buffer.write(column, slice(first, len(timestamps)), values)
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+
+from fixtures import make_bars, minutes
+
+import numpy as np
+import pandas as pd
+
+from OlympusTrader.utils.barStore import BarStore
+
+
+SYMBOL = 'SYM/USD'
+TIME_FRAME = '1Min'
+
+
+def test_overlapping_writes_merge():
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root)
+        first = make_bars(SYMBOL, minutes('2024-03-04 00:00', 10))
+        second = make_bars(SYMBOL, minutes('2024-03-04 00:05', 10))
+        store.write(SYMBOL, TIME_FRAME, first, '2024-03-04 00:00', '2024-03-04 00:10')
+        store.write(SYMBOL, TIME_FRAME, second, '2024-03-04 00:05', '2024-03-04 00:15')
+
+        bars = store.read(SYMBOL, TIME_FRAME, '2024-03-04 00:00', '2024-03-04 00:15')
+        assert bars is not None, 'the merged range must be covered'
+        timestamps = bars.index.get_level_values('timestamp')
+        assert len(bars) == 15 and timestamps.is_unique and timestamps.is_monotonic_increasing
+        assert store.gaps(SYMBOL, TIME_FRAME, '2024-03-04 00:00', '2024-03-04 00:15') == []
+        # only the range that was written is covered
+        assert store.read(SYMBOL, TIME_FRAME, '2024-03-04 00:00', '2024-03-04 00:16') is None
+
+
+def test_newer_rows_win():
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root)
+        store.write(SYMBOL, TIME_FRAME, make_bars(SYMBOL, minutes('2024-03-04 00:00', 10), close=100))
+        store.write(SYMBOL, TIME_FRAME, make_bars(SYMBOL, minutes('2024-03-04 00:05', 10), close=500))
+
+        bars = store.read(SYMBOL, TIME_FRAME, '2024-03-04 00:00', '2024-03-04 00:15', partial=True)
+        close = bars['close'].to_numpy()
+        np.testing.assert_array_equal(close[:5], 100 + np.arange(5))
+        np.testing.assert_array_equal(close[5:], 500 + np.arange(10))
+
+
+def test_h5_migration():
+    with tempfile.TemporaryDirectory() as root:
+        start, end = pd.Timestamp('2024-03-04 00:00', tz='UTC'), pd.Timestamp('2024-03-04 00:30', tz='UTC')
+        legacy = make_bars(SYMBOL, minutes('2024-03-04 00:00', 30))
+        os.makedirs(os.path.join(root, 'bar'))
+        name = f'{SYMBOL}_{TIME_FRAME}_{start}-{end}.h5'.replace('/', '-')
+        # written the way the broker cached bars before the store
+        legacy.to_hdf(os.path.join(root, 'bar', name), mode='a', key='TEST', index=True, format='table')
+
+        store = BarStore(root)
+        assert store.covers(SYMBOL.replace('/', '-'), TIME_FRAME, start, end)
+        bars = store.read(SYMBOL.replace('/', '-'), TIME_FRAME, start, end)
+        np.testing.assert_array_equal(bars['close'].to_numpy(), legacy['close'].to_numpy())
+        np.testing.assert_array_equal(bars.index.get_level_values('timestamp'), legacy.index.get_level_values('timestamp'))
+
+        meta = os.path.join(store._series_path(SYMBOL.replace('/', '-'), TIME_FRAME), 'meta.json')
+        with open(meta) as f:
+            assert json.load(f)['migrated'] == [name]
+        # a newer write over the migrated rows is not undone by another store opening the directory
+        store.write(SYMBOL.replace('/', '-'), TIME_FRAME, make_bars(SYMBOL, minutes('2024-03-04 00:00', 1), close=999))
+        reopened = BarStore(root).read(SYMBOL.replace('/', '-'), TIME_FRAME, start, end)
+        assert reopened['close'].iloc[0] == 999
+
+
+if __name__ == '__main__':
+    for test in (test_overlapping_writes_merge, test_newer_rows_win, test_h5_migration):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,44 @@
+from fixtures import make_bars, minutes, random_walk
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+from OlympusTrader.utils.featureMatrix import build_feature_matrix
+
+
+def make_history(periods: int = 300, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return make_bars('SYM', minutes('2024-03-04', periods), random_walk(periods, 0.5, rng), volume=rng.uniform(1, 10, periods))
+
+
+def test_causal_indicators_are_precomputed():
+    study = ta.Study(name="Causal", ta=[{"kind": "rsi", "length": 14}, {"kind": "ema", "length": 20}])
+    bars, lookahead = build_feature_matrix(make_history(), study)
+    assert lookahead == []
+    assert {'RSI_14', 'EMA_20'} <= set(bars.columns), list(bars.columns)
+
+
+def test_centered_indicator_is_flagged():
+    """ A centered window reads later bars - the probe run on the start of the history gives other values."""
+    centered = {"kind": "dpo", "length": 20, "centered": True}
+    study = ta.Study(name="Centered", ta=[{"kind": "rsi", "length": 14}, centered])
+    bars, lookahead = build_feature_matrix(make_history(), study)
+    assert lookahead == [centered], lookahead
+    assert 'RSI_14' in bars.columns and not any(column.startswith('DPO') for column in bars.columns)
+
+
+def test_negative_offset_is_flagged():
+    shifted = {"kind": "sma", "length": 10, "offset": -2}
+    study = ta.Study(name="Shifted", ta=[shifted, {"kind": "ema", "length": 20}])
+    for probe in (0.5, None):
+        bars, lookahead = build_feature_matrix(make_history(), study, probe=probe)
+        assert lookahead == [shifted], (probe, lookahead)
+        assert 'EMA_20' in bars.columns and 'SMA_10' not in bars.columns
+
+
+if __name__ == '__main__':
+    for test in (test_causal_indicators_are_precomputed, test_centered_indicator_is_flagged,
+                 test_negative_offset_is_flagged):
+        test()
+        print(f"{test.__name__}: ok")
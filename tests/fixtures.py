@@ -0,0 +1,83 @@
+"""
+Shared setup of the scripts in tests - each one runs from anywhere with `python tests/<script>.py`.
+
+Importing this module puts the repository root first on sys.path, or the tree in $OLYMPUS_TRADER_ROOT when a script
+is re-run against an older tree by `run_baseline`.
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.environ.get('OLYMPUS_TRADER_ROOT', ROOT))
+
+import numpy as np
+import pandas as pd
+
+from OlympusTrader.broker.interfaces import IAsset
+
+
+BASELINE = 'bfdaba6aac9549c872cd59922a2ffab92bbea6e0'
+"""The tree before the paper broker order book was keyed by order_id - its order queues are the deques that every
+step scanned, and its pending / active order fills are the ones the later paper broker changes must keep"""
+
+
+def make_bars(symbol: str, timestamps: pd.DatetimeIndex, close=100.0, spread=1.0, volume=1.0) -> pd.DataFrame:
+    """ OHLCV bars indexed by (symbol, timestamp) like the broker feeds. A scalar close is a series rising by 1 per
+    bar from it. The open is a quarter of the spread under the close, the high / low half of it around the close."""
+    close = close + np.arange(len(timestamps), dtype=np.float64) if np.isscalar(close) else np.asarray(close, dtype=np.float64)
+    spread = np.broadcast_to(np.asarray(spread, dtype=np.float64), close.shape)
+    index = pd.MultiIndex.from_arrays([[symbol] * len(timestamps), timestamps], names=['symbol', 'timestamp'])
+    return pd.DataFrame({'open': close - spread / 4, 'high': close + spread / 2, 'low': close - spread / 2, 'close': close,
+                         'volume': np.broadcast_to(np.asarray(volume, dtype=np.float64), close.shape).copy()}, index=index)
+
+
+def minutes(start, periods: int, freq: str = '1min') -> pd.DatetimeIndex:
+    """ `periods` UTC bar timestamps from start."""
+    return pd.date_range(start, periods=periods, freq=freq, tz='UTC')
+
+
+def random_walk(periods: int, scale: float, rng: Optional[np.random.Generator] = None, start: float = 100.0) -> np.ndarray:
+    rng = rng if rng is not None else np.random.default_rng()
+    return start + np.cumsum(rng.normal(0, scale, periods))
+
+
+def make_asset(symbol: str, asset_type: str = 'stock', exchange: str = 'TEST') -> IAsset:
+    return IAsset(id=symbol, name=symbol, asset_type=asset_type, exchange=exchange, symbol=symbol, status='active',
+                  tradable=True, marginable=True, shortable=True, fractionable=True, min_order_size=0.0001,
+                  min_price_increment=0.01)
+
+
+def baseline_tree() -> str:
+    """ The BASELINE OlympusTrader package extracted from git (once, into the temp directory)."""
+    path = os.path.join(tempfile.gettempdir(), f'olympus-trader-{BASELINE[:12]}')
+    if not os.path.exists(os.path.join(path, 'OlympusTrader')):
+        archive = subprocess.run(['git', 'archive', '--format=tar', BASELINE, 'OlympusTrader'], cwd=ROOT,
+                                 capture_output=True, check=True).stdout
+        staging = tempfile.mkdtemp(dir=tempfile.gettempdir())
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(staging, filter='data')
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # extracted by another run in the meantime
+            pass
+    return path
+
+
+def run_baseline(script: str, *args: str) -> object:
+    """ Run the script with the BASELINE package instead of this tree - returns the JSON it prints last."""
+    process = subprocess.run([sys.executable, script, *args], capture_output=True, text=True,
+                             env={**os.environ, 'OLYMPUS_TRADER_ROOT': baseline_tree()})
+    assert process.returncode == 0, process.stderr[-4000:]
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def to_json(value: object) -> str:
+    """ JSON with numpy scalars and other values (enums, timestamps ...) as their python value / str."""
+    return json.dumps(value, default=lambda o: o.item() if isinstance(o, np.generic) else str(o))
@@ -0,0 +1,107 @@
+from fixtures import make_bars, minutes
+
+import numpy as np
+import pandas as pd
+
+from OlympusTrader.utils.historyBuffer import HistoryBuffer, HistoryStore
+
+
+SYMBOL = 'SYM'
+
+
+def test_append_with_limit_keeps_the_last_rows():
+    """ Bar by bar appends with a limit match concatenating the bars and keeping the tail."""
+    bars = make_bars(SYMBOL, minutes('2024-03-04 00:00', 500))
+    buffer = HistoryBuffer(SYMBOL, capacity=4)
+    for i in range(len(bars)):
+        buffer.append(bars.iloc[i:i + 1], limit=100)
+    assert len(buffer) == 100
+    pd.testing.assert_frame_equal(buffer.frame(), bars.iloc[-100:], check_freq=False)
+    pd.testing.assert_frame_equal(buffer.view(), bars.iloc[-100:].loc[SYMBOL], check_freq=False)
+
+
+def test_duplicate_timestamp_keeps_the_first():
+    buffer = HistoryBuffer.from_frame(SYMBOL, make_bars(SYMBOL, minutes('2024-03-04 00:00', 10)))
+    buffer.append(make_bars(SYMBOL, minutes('2024-03-04 00:09', 1), close=999))
+    assert len(buffer) == 10 and buffer.version == 0
+    assert buffer.frame()['close'].iloc[-1] == 109
+
+    # duplicates within one append keep the first as well
+    repeated = pd.concat([make_bars(SYMBOL, minutes('2024-03-04 00:10', 1), close=1),
+                          make_bars(SYMBOL, minutes('2024-03-04 00:10', 1), close=2)])
+    buffer.append(repeated)
+    assert len(buffer) == 11 and buffer.frame()['close'].iloc[-1] == 1
+
+
+def test_late_bar_is_inserted_in_order():
+    bars = make_bars(SYMBOL, minutes('2024-03-04 00:00', 10))
+    buffer = HistoryBuffer.from_frame(SYMBOL, bars.drop(bars.index[4]))
+    assert len(buffer) == 9 and buffer.version == 0
+
+    buffer.append(bars.iloc[4:5])
+    assert buffer.version == 1
+    pd.testing.assert_frame_equal(buffer.frame(), bars, check_freq=False)
+
+
+def test_frame_columns_are_kept():
+    """ Columns added to the frame (as `df.ta.study` does) are kept after the next append."""
+    history = HistoryStore()
+    bars = make_bars(SYMBOL, minutes('2024-03-04 00:00', 20))
+    history.append(SYMBOL, bars.iloc[:10])
+    frame = history[SYMBOL]
+    frame['sma'] = frame['close'].rolling(3).mean()
+    frame['close'] = frame['close'] * 2
+
+    history.append(SYMBOL, bars.iloc[10:11])
+    frame = history[SYMBOL]
+    assert list(frame.columns) == ['open', 'high', 'low', 'close', 'volume', 'sma']
+    np.testing.assert_array_equal(frame['close'].to_numpy()[:10], bars['close'].to_numpy()[:10] * 2)
+    assert frame['close'].iloc[10] == bars['close'].iloc[10]
+    assert frame['sma'].iloc[9] == bars['close'].iloc[7:10].mean() and np.isnan(frame['sma'].iloc[10])
+
+
+def test_non_numeric_columns_are_kept():
+    """ Text and bool columns come back as they went in - the same as concatenating the bars."""
+    bars = make_bars(SYMBOL, minutes('2024-03-04 00:00', 30))
+    bars['note'] = [f'bar {i}' for i in range(30)]
+    bars['signal'] = np.arange(30) % 3 == 0
+    buffer = HistoryBuffer(SYMBOL, capacity=4)
+    for i in range(20):
+        buffer.append(bars.iloc[i:i + 1], limit=15)
+    buffer.append(bars.iloc[22:30], limit=15)
+    buffer.append(bars.iloc[20:22], limit=15)
+    assert buffer.version == 2
+    pd.testing.assert_frame_equal(buffer.frame(), bars.iloc[-15:], check_freq=False)
+
+    # bars without the columns leave them empty, like pd.concat
+    extra = make_bars(SYMBOL, minutes('2024-03-04 00:30', 1))
+    buffer.append(extra, limit=15)
+    expected = pd.concat([bars, extra]).iloc[-15:]
+    pd.testing.assert_frame_equal(buffer.frame(), expected, check_freq=False)
+    assert buffer.frame()['signal'].dtype == object and buffer.frame()['note'].iloc[-1] is np.nan
+
+
+def test_non_numeric_frame_columns_are_kept():
+    """ Text / bool columns added to the frame, or replacing a numeric one, are kept after the next append."""
+    history = HistoryStore()
+    bars = make_bars(SYMBOL, minutes('2024-03-04 00:00', 20))
+    history.append(SYMBOL, bars.iloc[:10])
+    frame = history[SYMBOL]
+    frame['above'] = frame['close'] > 104
+    frame['volume'] = 'n/a'
+
+    history.append(SYMBOL, bars.iloc[10:11])
+    frame = history[SYMBOL]
+    assert list(frame.columns) == ['open', 'high', 'low', 'close', 'volume', 'above']
+    assert frame['above'].iloc[:10].tolist() == (bars['close'].iloc[:10] > 104).tolist()
+    assert frame['volume'].iloc[:10].tolist() == ['n/a'] * 10 and frame['volume'].iloc[10] == 1
+    pd.testing.assert_frame_equal(frame[['open', 'high', 'low', 'close']], bars.iloc[:11][['open', 'high', 'low', 'close']],
+                                  check_freq=False)
+
+
+if __name__ == '__main__':
+    for test in (test_append_with_limit_keeps_the_last_rows, test_duplicate_timestamp_keeps_the_first,
+                 test_late_bar_is_inserted_in_order, test_frame_columns_are_kept, test_non_numeric_columns_are_kept,
+                 test_non_numeric_frame_columns_are_kept):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,171 @@
+import datetime
+import os
+import tempfile
+from typing import Optional
+
+from fixtures import make_bars
+
+import pandas as pd
+
+from OlympusTrader.utils.historyCache import HistoryCache
+from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
+
+
+ASSET = {'symbol': 'SYM-USD'}
+RESOLUTION = ITimeFrame(5, ITimeFrameUnit.Minute)
+UTC = datetime.timezone.utc
+
+
+class StubFetcher:
+    """ Offline data source - deterministic bars for [start, end), every call is recorded. `span` caps how much of the
+    request is returned (a lookback limit / a download cut short), `closed` leaves out the bars in [closed[0], closed[1])."""
+
+    def __init__(self, empty: bool = False, span: Optional[datetime.timedelta] = None,
+                 closed: Optional[tuple[datetime.datetime, datetime.datetime]] = None):
+        self.empty = empty
+        self.span = span
+        self.closed = closed
+        self.calls: list[tuple[datetime.datetime, datetime.datetime]] = []
+
+    def __call__(self, asset: dict, start: datetime.datetime, end: datetime.datetime, resolution: ITimeFrame) -> pd.DataFrame:
+        self.calls.append((start, end))
+        if self.empty:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+        bars = stub_bars(asset['symbol'], start, min(end, start + self.span) if self.span else end, resolution)
+        if self.closed:
+            timestamps = bars.index.get_level_values('timestamp')
+            bars = bars[(timestamps < self.closed[0]) | (timestamps >= self.closed[1])]
+        return bars
+
+
+def stub_bars(symbol: str, start: datetime.datetime, end: datetime.datetime, resolution: ITimeFrame) -> pd.DataFrame:
+    """ The bars of [start, end) - the close only depends on the timestamp, so refetched bars are the same."""
+    timestamps = pd.date_range(start, end, freq=resolution.to_timeDelta(), inclusive='left')
+    return make_bars(symbol, timestamps, 100 + (timestamps.asi8 // 60_000_000_000 % 1000) / 10)
+
+
+def test_repeat_request_is_served_from_disk():
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = StubFetcher()
+        cache = HistoryCache(root, fetcher)
+        start, end = datetime.datetime(2024, 3, 4, tzinfo=UTC), datetime.datetime(2024, 3, 5, tzinfo=UTC)
+
+        first = cache.get(ASSET, start, end, RESOLUTION)
+        second = cache.get(ASSET, start, end, RESOLUTION)
+        assert len(fetcher.calls) == 1, fetcher.calls
+        assert (cache.hits, cache.fetches) == (1, 1)
+        assert len(first) == 24 * 12
+        pd.testing.assert_frame_equal(first, second)
+
+
+def test_wider_range_fetches_only_the_edges():
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = StubFetcher()
+        cache = HistoryCache(root, fetcher)
+        start, end = datetime.datetime(2024, 3, 4, tzinfo=UTC), datetime.datetime(2024, 3, 5, tzinfo=UTC)
+        cache.get(ASSET, start, end, RESOLUTION)
+
+        before, after = start - datetime.timedelta(hours=2), end + datetime.timedelta(hours=3)
+        bars = cache.get(ASSET, before, after, RESOLUTION)
+        assert fetcher.calls[1:] == [(before, start), (end, after)], fetcher.calls
+        pd.testing.assert_frame_equal(bars, stub_bars(ASSET['symbol'], before, after, RESOLUTION), check_freq=False)
+
+
+def test_empty_fetch_is_not_covered():
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = StubFetcher(empty=True)
+        cache = HistoryCache(root, fetcher)
+        start, end = datetime.datetime(2024, 3, 4, tzinfo=UTC), datetime.datetime(2024, 3, 5, tzinfo=UTC)
+
+        assert cache.get(ASSET, start, end, RESOLUTION).empty
+        assert not cache.store.covers(ASSET['symbol'], str(RESOLUTION), start, end)
+
+        # the download failed - the next request must try again and cache what it gets
+        fetcher.empty = False
+        assert len(cache.get(ASSET, start, end, RESOLUTION)) == 24 * 12
+        assert len(fetcher.calls) == 2, fetcher.calls
+        assert cache.store.covers(ASSET['symbol'], str(RESOLUTION), start, end)
+
+
+def test_month_boundary_round_trip():
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = StubFetcher()
+        cache = HistoryCache(root, fetcher)
+        start, end = datetime.datetime(2024, 1, 31, 20, tzinfo=UTC), datetime.datetime(2024, 2, 1, 4, tzinfo=UTC)
+
+        bars = cache.get(ASSET, start, end, RESOLUTION)
+        expected = stub_bars(ASSET['symbol'], start, end, RESOLUTION)
+        pd.testing.assert_frame_equal(bars, expected, check_freq=False)
+        series = os.path.join(cache.store.root, ASSET['symbol'], str(RESOLUTION))
+        assert {'2024-01', '2024-02'} <= set(os.listdir(series)), os.listdir(series)
+
+        # a fresh cache over the same directory reads both months back without fetching
+        fetcher = StubFetcher()
+        reread = HistoryCache(root, fetcher).get(ASSET, start, end, RESOLUTION)
+        assert fetcher.calls == []
+        pd.testing.assert_frame_equal(reread, expected, check_freq=False)
+
+
+def test_short_fetch_covers_only_the_bars_returned():
+    """ A fetch that returns the first hour of a day covers that hour - the rest is fetched on the next request."""
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = StubFetcher(span=datetime.timedelta(hours=1))
+        cache = HistoryCache(root, fetcher)
+        start, end = datetime.datetime(2024, 3, 4, tzinfo=UTC), datetime.datetime(2024, 3, 5, tzinfo=UTC)
+
+        assert len(cache.get(ASSET, start, end, RESOLUTION)) == 12
+        assert cache.store.gaps(ASSET['symbol'], str(RESOLUTION), start, end) == [
+            (HistoryCache._to_ns(start + datetime.timedelta(hours=1)), HistoryCache._to_ns(end))]
+
+        fetcher.span = None
+        bars = cache.get(ASSET, start, end, RESOLUTION)
+        assert fetcher.calls[1] == (start + datetime.timedelta(hours=1), end), fetcher.calls
+        pd.testing.assert_frame_equal(bars, stub_bars(ASSET['symbol'], start, end, RESOLUTION), check_freq=False)
+        assert cache.store.covers(ASSET['symbol'], str(RESOLUTION), start, end)
+
+
+def test_future_is_not_covered():
+    """ A request ending later today covers the closed bars only - the open bar and the future are fetched again."""
+    with tempfile.TemporaryDirectory() as root:
+        now = pd.Timestamp.now(tz='UTC')
+        fetcher = StubFetcher()
+        cache = HistoryCache(root, lambda asset, start, end, resolution: fetcher(asset, start, min(end, now), resolution))
+        start, end = (now - pd.Timedelta(hours=2)).floor('5min').to_pydatetime(), (now + pd.Timedelta(hours=2)).to_pydatetime()
+
+        bars = cache.get(ASSET, start, end, RESOLUTION)
+        opened = bars.index.get_level_values('timestamp')[-1]
+        assert opened + RESOLUTION.to_timeDelta() > now, 'the last bar is still open'
+        assert cache.store.gaps(ASSET['symbol'], str(RESOLUTION), start, end) == [
+            (HistoryCache._to_ns(opened), HistoryCache._to_ns(end))]
+        cache.get(ASSET, start, end, RESOLUTION)
+        assert fetcher.calls[1][0] == opened.to_pydatetime(), fetcher.calls
+
+
+def test_empty_hole_between_bars_is_covered():
+    """ No bars over a weekend inside stored bars is real - the hole is fetched once, not on every request."""
+    with tempfile.TemporaryDirectory() as root:
+        weekend = (datetime.datetime(2024, 3, 2, tzinfo=UTC), datetime.datetime(2024, 3, 4, tzinfo=UTC))
+        fetcher = StubFetcher(closed=weekend)
+        cache = HistoryCache(root, fetcher)
+        friday, monday = datetime.datetime(2024, 3, 1, tzinfo=UTC), datetime.datetime(2024, 3, 5, tzinfo=UTC)
+        cache.get(ASSET, friday, weekend[0] + datetime.timedelta(hours=12), RESOLUTION)
+        # the request ends inside the weekend - there is nothing after the last bar to prove the tail
+        assert not cache.store.covers(ASSET['symbol'], str(RESOLUTION), friday, weekend[0] + datetime.timedelta(hours=12))
+
+        cache.get(ASSET, weekend[1], monday, RESOLUTION)
+
+        # the weekend is fetched without bars - it lies between stored bars, so it is covered
+        bars = cache.get(ASSET, friday, monday, RESOLUTION)
+        assert fetcher.calls[2:] == [weekend], fetcher.calls
+        assert len(bars) == 24 * 12 * 2
+        assert cache.store.covers(ASSET['symbol'], str(RESOLUTION), friday, monday)
+        cache.get(ASSET, friday, monday, RESOLUTION)
+        assert len(fetcher.calls) == 3, fetcher.calls
+
+if __name__ == '__main__':
+    for test in (test_repeat_request_is_served_from_disk, test_wider_range_fetches_only_the_edges,
+                 test_empty_fetch_is_not_covered, test_month_boundary_round_trip,
+                 test_short_fetch_covers_only_the_bars_returned, test_future_is_not_covered,
+                 test_empty_hole_between_bars_is_covered):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,58 @@
+import ast
+import os
+import re
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET = 2.0
+"""Seconds `import OlympusTrader` may take (cumulative -X importtime of the package, best of RUNS)"""
+RUNS = 3
+LAZY = ['vectorbt', 'quantstats', 'yfinance', 'ccxt', 'alpaca', 'MetaTrader5', 'dash', 'OlympusTrader.ui',
+        'OlympusTrader.broker.paper_broker', 'OlympusTrader.broker.alpaca_broker', 'OlympusTrader.broker.ccxt_broker']
+"""Modules that must only be loaded on first use"""
+LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| *(\S+)$')
+
+
+def import_time() -> tuple[float, dict[str, int], list[str]]:
+    """ Import the package in a fresh interpreter - returns its cumulative seconds, the slowest cumulative us per
+    dependency and the LAZY modules it loaded."""
+    code = f"import sys, OlympusTrader; print([m for m in {LAZY!r} if m in sys.modules])"
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, cwd=ROOT,
+                             env={**os.environ, 'SSM_PASSWORD': os.environ.get('SSM_PASSWORD', 'benchmark')})
+    assert process.returncode == 0, process.stderr[-2000:]
+    total = None
+    packages: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        cumulative, module = int(match[1]), match[2]
+        root = module.split('.')[0]
+        if module == 'OlympusTrader':
+            total = cumulative / 1e6
+        elif root != 'OlympusTrader':
+            packages[root] = max(packages.get(root, 0), cumulative)
+    assert total is not None, 'OlympusTrader not found in the -X importtime output'
+    return total, packages, ast.literal_eval(process.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET
+    runs = [import_time() for _ in range(RUNS)]
+    total, packages, loaded = min(runs, key=lambda run: run[0])
+
+    print(f"import OlympusTrader: {total:.3f}s (best of {RUNS}: {', '.join(f'{run[0]:.3f}s' for run in runs)}), "
+          f"budget {budget:.3f}s")
+    for package, us in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {package:<24} {us / 1e6:7.3f}s")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: loaded on import {loaded} - import them where they are used")
+        failed = True
+    if total > budget:
+        print(f"FAIL: import took {total:.3f}s > {budget:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
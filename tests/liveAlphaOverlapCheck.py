@@ -0,0 +1,135 @@
+import asyncio
+import datetime
+import threading
+import time
+
+from fixtures import make_asset, make_bars, minutes
+
+from OlympusTrader.broker.paper_broker import PaperBroker
+from OlympusTrader.strategy import Strategy
+from OlympusTrader.strategy.interfaces import IStrategyMode
+from OlympusTrader.utils.marketDataQueue import MarketDataQueue
+from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
+
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD']
+BARS = 3
+WORK = 0.2
+"""Seconds of on_bar work per bar"""
+RESOLUTION = ITimeFrame(1, ITimeFrameUnit.Minute)
+START = datetime.datetime(2024, 3, 4)
+
+
+class LiveAlphaStrategy(Strategy):
+    """ Records when and on which thread on_bar ran for each bar, the order the bars reached _on_bar and the order the
+    alpha work was merged in."""
+
+    def start(self):
+        self.add_ta([{"kind": "sma", "length": 2}])
+        self.runs = []
+        self.delivered = []
+        self.merged = []
+
+    def init(self, asset):
+        pass
+
+    def universe(self):
+        return set(SYMBOLS)
+
+    def on_bar(self, symbol, bar):
+        begin = time.perf_counter()
+        time.sleep(WORK)
+        self.runs.append((symbol, bar.index[0][1], threading.get_ident(), begin, time.perf_counter()))
+
+    def generateInsights(self, symbol):
+        pass
+
+    def executeInsight(self, insight):
+        pass
+
+    def teardown(self):
+        pass
+
+    async def _on_bar(self, bar, timeframe):
+        self.delivered.append(bar.index[0][0])
+        await super()._on_bar(bar, timeframe)
+
+    def _mergeAlphaWork(self, symbol, insights, orders, error):
+        self.merged.append(symbol)
+        super()._mergeAlphaWork(symbol, insights, orders, error)
+
+
+def make_strategy(alphaWorkers: int) -> LiveAlphaStrategy:
+    broker = PaperBroker(cash=100_000, start_date=START, end_date=START + datetime.timedelta(days=1),
+                         mode=IStrategyMode.LIVE)
+    for symbol in SYMBOLS:
+        broker.TICKER_INFO[symbol] = make_asset(symbol)
+    strategy = LiveAlphaStrategy(broker, resolution=RESOLUTION, ui=False, ssm=False, mode=IStrategyMode.LIVE,
+                                 alphaWorkers=alphaWorkers)
+    strategy._RUNNING = True
+    return strategy
+
+
+async def drain(strategy: LiveAlphaStrategy, bars: list) -> float:
+    """ Queue the bars, run the market data task until every bar reached on_bar - returns the time it took."""
+    strategy.MARKET_DATA_QUEUE = MarketDataQueue(maxsize=BARS)
+    for bar in bars:
+        await strategy.MARKET_DATA_QUEUE.put(bar, RESOLUTION)
+    timer = time.perf_counter()
+    task = asyncio.create_task(strategy._drainMarketData())
+    while len(strategy.runs) < len(bars) or (strategy.alphaWorkers and len(strategy.merged) < len(bars)):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - timer
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return elapsed
+
+
+def make_stream() -> list:
+    """ The bars as a broker stream delivers them - every symbol's bar of a minute, minute by minute."""
+    timestamps = minutes(START, BARS)
+    frames = {symbol: make_bars(symbol, timestamps) for symbol in SYMBOLS}
+    return [frames[symbol].iloc[i:i + 1] for i in range(BARS) for symbol in SYMBOLS]
+
+
+def test_live_alpha_work_overlaps():
+    """ With alphaWorkers the live bars of different symbols run on_bar at the same time in the alpha pool."""
+    strategy = make_strategy(alphaWorkers=len(SYMBOLS))
+    elapsed = asyncio.run(drain(strategy, make_stream()))
+
+    serial = WORK * len(SYMBOLS) * BARS
+    assert elapsed < serial / 2, f"{elapsed:.2f}s - the alpha work did not overlap (one at a time takes {serial:.2f}s)"
+    assert len({run[2] for run in strategy.runs}) > 1, "on_bar must run on the alpha pool threads"
+    for symbol in SYMBOLS:
+        # a symbol's bars run one after the other, in bar order
+        runs = sorted((run for run in strategy.runs if run[0] == symbol), key=lambda run: run[3])
+        assert [run[1] for run in runs] == list(minutes(START, BARS)), runs
+        assert all(a[4] <= b[3] for a, b in zip(runs, runs[1:])), f"{symbol} bars overlapped"
+    overlapping = max(sum(1 for other in strategy.runs if other[3] < run[4] and run[3] < other[4])
+                      for run in strategy.runs)
+    assert overlapping == len(SYMBOLS), f"at most {overlapping} bars ran at the same time"
+    strategy._ALPHA_POOL.shutdown()
+    return elapsed, serial
+
+
+def test_live_alpha_work_merges_in_bar_order():
+    """ The alpha work of a batch is merged in the order the queue delivered the bars, whichever finished first."""
+    strategy = make_strategy(alphaWorkers=2)
+    asyncio.run(drain(strategy, make_stream()))
+    assert strategy.merged == strategy.delivered, (strategy.merged, strategy.delivered)
+    strategy._ALPHA_POOL.shutdown()
+
+
+def test_inline_without_alpha_workers():
+    strategy = make_strategy(alphaWorkers=0)
+    elapsed = asyncio.run(drain(strategy, make_stream()[:len(SYMBOLS)]))
+    assert strategy._ALPHA_POOL is None and {run[2] for run in strategy.runs} == {threading.get_ident()}
+    assert [run[0] for run in strategy.runs] == strategy.delivered and elapsed >= WORK * len(SYMBOLS)
+
+
+if __name__ == '__main__':
+    elapsed, serial = test_live_alpha_work_overlaps()
+    print(f"test_live_alpha_work_overlaps: ok ({elapsed:.2f}s for {serial:.2f}s of on_bar work)")
+    for test in (test_live_alpha_work_merges_in_bar_order, test_inline_without_alpha_workers):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,111 @@
+import asyncio
+
+import fixtures  # noqa: F401 - puts the repository root on sys.path
+
+import pandas as pd
+
+from OlympusTrader.utils.marketDataQueue import MarketDataQueue
+from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
+
+
+TIME_FRAME = ITimeFrame(1, ITimeFrameUnit.Minute)
+
+
+def make_bar(symbol: str, minute: int, open: float, high: float, low: float, close: float, volume: float) -> pd.DataFrame:
+    index = pd.MultiIndex.from_tuples([(symbol, pd.Timestamp('2024-03-04', tz='UTC') + pd.Timedelta(minutes=minute))],
+                                      names=['symbol', 'timestamp'])
+    return pd.DataFrame({'open': [open], 'high': [high], 'low': [low], 'close': [close], 'volume': [volume]},
+                        index=index)
+
+
+def test_block_waits_for_a_get():
+    async def run():
+        queue = MarketDataQueue(maxsize=2, policy='block')
+        await queue.put(make_bar('AAA', 0, 1, 1, 1, 1, 1), TIME_FRAME)
+        await queue.put(make_bar('AAA', 1, 2, 2, 2, 2, 1), TIME_FRAME)
+
+        producer = asyncio.create_task(queue.put(make_bar('AAA', 2, 3, 3, 3, 3, 1), TIME_FRAME))
+        await asyncio.sleep(0.01)
+        assert not producer.done(), 'a full queue must make the producer wait'
+        assert queue.depth() == 2 and queue.metrics()['AAA']['blocked'] == 1
+
+        bar, _ = await queue.get()
+        assert bar['close'].iloc[0] == 1
+        await asyncio.wait_for(producer, 1)
+        closes = [(await queue.get())[0]['close'].iloc[0] for _ in range(2)]
+        assert closes == [2, 3]
+        assert queue.metrics()['AAA']['dropped'] == 0
+    asyncio.run(run())
+
+
+def test_drop_oldest():
+    async def run():
+        queue = MarketDataQueue(maxsize=2, policy='drop_oldest')
+        for minute in range(4):
+            await queue.put(make_bar('AAA', minute, minute, minute, minute, minute, 1), TIME_FRAME)
+        metrics = queue.metrics()['AAA']
+        assert (metrics['depth'], metrics['received'], metrics['dropped']) == (2, 4, 2)
+        closes = [(await queue.get())[0]['close'].iloc[0] for _ in range(2)]
+        assert closes == [2, 3]
+    asyncio.run(run())
+
+
+def test_coalesce():
+    async def run():
+        queue = MarketDataQueue(maxsize=1, policy='coalesce')
+        await queue.put(make_bar('AAA', 0, open=10, high=12, low=9, close=11, volume=5), TIME_FRAME)
+        await queue.put(make_bar('AAA', 1, open=11, high=15, low=10, close=14, volume=7), TIME_FRAME)
+        await queue.put(make_bar('AAA', 2, open=14, high=14, low=8, close=13, volume=3), TIME_FRAME)
+        assert queue.depth() == 1 and queue.metrics()['AAA']['coalesced'] == 2
+
+        bar, timeframe = await queue.get()
+        assert timeframe == TIME_FRAME
+        assert bar.index[0] == ('AAA', pd.Timestamp('2024-03-04 00:02', tz='UTC'))
+        assert bar[['open', 'high', 'low', 'close', 'volume']].iloc[0].tolist() == [10, 15, 8, 13, 15]
+    asyncio.run(run())
+
+
+def test_round_robin_over_symbols():
+    """ A symbol with many bars waiting does not starve the others."""
+    async def run():
+        queue = MarketDataQueue(maxsize=10, policy='block')
+        for minute in range(3):
+            await queue.put(make_bar('AAA', minute, 1, 1, 1, 1, 1), TIME_FRAME)
+        await queue.put(make_bar('BBB', 0, 1, 1, 1, 1, 1), TIME_FRAME)
+        await queue.put(make_bar('CCC', 0, 1, 1, 1, 1, 1), TIME_FRAME)
+
+        order = []
+        for _ in range(5):
+            bar, _ = await queue.get()
+            order.append(bar.index[0][0])
+        assert order == ['AAA', 'BBB', 'CCC', 'AAA', 'AAA'], order
+        assert all(metrics['delivered'] == metrics['received'] for metrics in queue.metrics().values())
+    asyncio.run(run())
+
+
+def test_batch_takes_one_bar_per_symbol():
+    """ A batch holds the bars of different symbols in turn and ends before a symbol's second bar."""
+    async def run():
+        queue = MarketDataQueue(maxsize=10, policy='block')
+        for minute in range(2):
+            await queue.put(make_bar('AAA', minute, 1, 1, 1, 1, 1), TIME_FRAME)
+        await queue.put(make_bar('BBB', 0, 1, 1, 1, 1, 1), TIME_FRAME)
+
+        batches = []
+        for limit in (5, 5):
+            batches.append([bar.index[0] for bar, _ in await queue.get_batch(limit)])
+        assert [[symbol for symbol, _ in batch] for batch in batches] == [['AAA', 'BBB'], ['AAA']], batches
+        assert batches[1][0][1] > batches[0][0][1] and queue.depth() == 0
+
+        for symbol in ('CCC', 'DDD', 'EEE'):
+            await queue.put(make_bar(symbol, 0, 1, 1, 1, 1, 1), TIME_FRAME)
+        batch = await queue.get_batch(2)
+        assert [bar.index[0][0] for bar, _ in batch] == ['CCC', 'DDD'] and queue.depth() == 1
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    for test in (test_block_waits_for_a_get, test_drop_oldest, test_coalesce, test_round_robin_over_symbols,
+                 test_batch_takes_one_bar_per_symbol):
+        test()
+        print(f"{test.__name__}: ok")
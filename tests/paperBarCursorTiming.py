@@ -0,0 +1,65 @@
+import datetime
+import timeit
+
+from fixtures import make_bars, minutes, random_walk
+
+import pandas as pd
+
+from OlympusTrader.broker.paper_broker import PaperBroker
+
+
+SYMBOLS = 40
+BARS = 5_000
+LOOKUPS_PER_STEP = 3  # _on_bar + pending + active orders
+
+
+def legacy_get_current_bar(broker: PaperBroker, symbol: str):
+    """ The MultiIndex `.loc` lookup used before the timestamp index."""
+    idx = pd.IndexSlice
+    end = broker.get_current_time.replace(tzinfo=datetime.timezone.utc)
+    start = end if broker.PreviousTime is None else broker.PreviousTime.replace(
+        tzinfo=datetime.timezone.utc)
+    bar = broker.HISTORICAL_DATA[symbol]['bar'].loc[idx[symbol, end:end], :]
+    if bar.empty:
+        bar = broker.HISTORICAL_DATA[symbol]['bar'].loc[idx[symbol, start:end], :]
+        if bar.empty:
+            return None
+    return bar
+
+
+def run(broker: PaperBroker, symbols: list[str], start: datetime.datetime, lookup) -> float:
+    broker.CurrentTime = start
+    broker.PreviousTime = None
+    timer = timeit.default_timer()
+    for step in range(BARS):
+        for symbol in symbols:
+            for _ in range(LOOKUPS_PER_STEP):
+                lookup(broker, symbol)
+        broker.setCurrentTime(start + datetime.timedelta(minutes=step + 1))
+    return timeit.default_timer() - timer
+
+
+if __name__ == '__main__':
+    start = datetime.datetime(2024, 1, 1)
+    broker = PaperBroker(cash=100_000, start_date=start,
+                         end_date=start + datetime.timedelta(minutes=BARS))
+    symbols = [f'SYM{i}' for i in range(SYMBOLS)]
+    for symbol in symbols:
+        broker.HISTORICAL_DATA[symbol] = {'bar': make_bars(symbol, minutes(start, BARS), random_walk(BARS, 0.1), spread=0.1)}
+        broker._index_bar_data(symbol)
+
+    # Results must match the legacy lookup exactly
+    for minute in (0, 1, BARS // 2, BARS - 1):
+        broker.CurrentTime = start + datetime.timedelta(minutes=minute)
+        broker.PreviousTime = None if minute == 0 else broker.CurrentTime - datetime.timedelta(minutes=1)
+        for symbol in symbols[:3]:
+            pd.testing.assert_frame_equal(
+                legacy_get_current_bar(broker, symbol), broker._get_current_bar(symbol))
+
+    bars = BARS * SYMBOLS
+    legacy = run(broker, symbols, start, legacy_get_current_bar)
+    indexed = run(broker, symbols, start,
+                  lambda b, s: b._get_current_bar(s))
+    print(f"legacy .loc lookup : {bars / legacy:,.0f} bars/sec ({legacy:.2f}s)")
+    print(f"timestamp index    : {bars / indexed:,.0f} bars/sec ({indexed:.2f}s)")
+    print(f"speed up           : {legacy / indexed:.1f}x")
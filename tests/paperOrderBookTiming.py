@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+import sys
+import timeit
+import uuid
+
+from fixtures import make_asset, make_bars, minutes, random_walk, run_baseline, to_json
+
+from OlympusTrader.broker.interfaces import IAsset, IOrder, IOrderClass, IOrderSide, IOrderType, ITimeInForce, ITradeUpdateEvent
+from OlympusTrader.broker.paper_broker import PaperBroker
+
+
+SYMBOL = 'SYM'
+BARS = 20
+RESTING_ORDERS = 2_000
+"""The baseline order book scans its queues per order, so each step is quadratic in the resting orders - 2k keeps
+the baseline run to seconds (10k takes minutes)"""
+
+
+def make_resting_order(broker: PaperBroker, asset: IAsset, limit_price: float) -> IOrder:
+    """ A DCA style limit buy far below the market that never fills."""
+    return IOrder(
+        order_id=uuid.uuid4(),
+        asset=asset,
+        limit_price=limit_price,
+        filled_price=None,
+        stop_price=None,
+        qty=1,
+        filled_qty=None,
+        side=IOrderSide.BUY,
+        type=IOrderType.LIMIT,
+        time_in_force=ITimeInForce.GTC,
+        status=ITradeUpdateEvent.NEW,
+        order_class=IOrderClass.SIMPLE,
+        created_at=broker.get_current_time,
+        updated_at=broker.get_current_time,
+        submitted_at=broker.get_current_time,
+        filled_at=None,
+        legs=None
+    )
+
+
+async def noop(update):
+    pass
+
+
+async def run_steps(broker: PaperBroker, start: datetime.datetime) -> float:
+    timer = timeit.default_timer()
+    for step in range(BARS - 1):
+        await broker.processPendingOrders(noop)
+        await broker.processCanceledOrders(noop)
+        broker.setCurrentTime(start + datetime.timedelta(minutes=step + 1))
+    return timeit.default_timer() - timer
+
+
+def time_order_book() -> dict[str, float]:
+    start = datetime.datetime(2024, 1, 1)
+    broker = PaperBroker(cash=1_000_000_000, start_date=start,
+                         end_date=start + datetime.timedelta(minutes=BARS))
+    asset = make_asset(SYMBOL)
+    broker.TICKER_INFO[SYMBOL] = asset
+    broker.HISTORICAL_DATA[SYMBOL] = {'bar': make_bars(SYMBOL, minutes(start, BARS), random_walk(BARS, 0.1), spread=0.1)}
+    broker._index_bar_data(SYMBOL)
+    broker.CurrentTime = start
+
+    timer = timeit.default_timer()
+    orders = []
+    for i in range(RESTING_ORDERS):
+        order = make_resting_order(broker, asset, 50 - (i % 100) * 0.01)
+        broker._update_order(order)
+        orders.append(order)
+    place = timeit.default_timer() - timer
+    assert len(broker.PENDING_ORDERS) == RESTING_ORDERS
+
+    steps = asyncio.run(run_steps(broker, start))
+    assert len(broker.PENDING_ORDERS) == RESTING_ORDERS, "resting orders must not fill"
+
+    timer = timeit.default_timer()
+    for order in orders[::2]:
+        broker.update_order(order['order_id'], order['limit_price'] - 1, 2)
+    update = timeit.default_timer() - timer
+
+    timer = timeit.default_timer()
+    for order in orders[::2]:
+        broker.cancel_order(order['order_id'])
+    cancel = timeit.default_timer() - timer
+    asyncio.run(broker.processCanceledOrders(noop))
+    assert len(broker.PENDING_ORDERS) == RESTING_ORDERS // 2
+
+    return {
+        'place': RESTING_ORDERS / place,
+        'step': steps / (BARS - 1) * 1000,
+        'update': len(orders[::2]) / update,
+        'cancel': len(orders[::2]) / cancel,
+    }
+
+
+if __name__ == '__main__':
+    if '--json' in sys.argv:
+        # the run_baseline side - the same timings with the order book of the BASELINE tree
+        print(to_json(time_order_book()))
+        sys.exit()
+    baseline = run_baseline(__file__, '--json')
+    current = time_order_book()
+
+    print(f"resting orders          : {RESTING_ORDERS:,}")
+    print(f"                          {'baseline':>14} {'current':>14}")
+    print(f"place                   : {baseline['place']:>14,.0f} {current['place']:>14,.0f} orders/sec "
+          f"({current['place'] / baseline['place']:.1f}x)")
+    print(f"processPendingOrders    : {baseline['step']:>14.1f} {current['step']:>14.1f} ms/step "
+          f"({baseline['step'] / current['step']:.1f}x)")
+    print(f"update_order            : {baseline['update']:>14,.0f} {current['update']:>14,.0f} orders/sec "
+          f"({current['update'] / baseline['update']:.1f}x)")
+    print(f"cancel_order            : {baseline['cancel']:>14,.0f} {current['cancel']:>14,.0f} orders/sec "
+          f"({current['cancel'] / baseline['cancel']:.1f}x)")
@@ -0,0 +1,234 @@
+import asyncio
+import datetime
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fixtures import make_asset, make_bars, minutes, random_walk, run_baseline, to_json
+
+from OlympusTrader.broker.interfaces import IOrderClass, IOrderSide, IOrderType, ITimeInForce, ITradeUpdate
+from OlympusTrader.broker.paper_broker import PaperBroker
+
+
+SYMBOLS = ['AAA', 'BBB']
+BARS = 400
+SEED = 7
+START = datetime.datetime(2024, 1, 1)
+
+
+def make_scenario_bars(symbol: str, rng: np.random.Generator) -> pd.DataFrame:
+    close = random_walk(BARS, 0.2, rng)
+    spread = rng.uniform(0.01, 0.4, BARS)
+    # flat minute bars (high == low) take the limit price padding path
+    spread[::17] = 0
+    return make_bars(symbol, minutes(START, BARS), close, spread)
+
+
+def make_broker(bars: dict[str, pd.DataFrame]) -> PaperBroker:
+    broker = PaperBroker(cash=1_000_000, start_date=START, end_date=START + datetime.timedelta(minutes=BARS), leverage=1)
+    for symbol, data in bars.items():
+        broker.TICKER_INFO[symbol] = make_asset(symbol)
+        broker.HISTORICAL_DATA[symbol] = {'bar': data}
+        broker._index_bar_data(symbol)
+        add_signals(broker, symbol, data.index)
+    broker.CurrentTime = START
+    return broker
+
+
+def add_signals(broker: PaperBroker, symbol: str, index: pd.Index):
+    """ The backtest signals the fills are logged into, set up as the bar loader of the running tree does - a signal
+    recorder now, the signals DataFrame in the BASELINE. Without them the BASELINE close handling stops at the signal
+    logging error and leaves the close orders queued."""
+    if hasattr(broker, '_SIGNALS'):
+        from OlympusTrader.utils.signalRecorder import SignalRecorder
+        broker._SIGNALS[symbol] = SignalRecorder(index)
+    else:
+        broker.HISTORICAL_DATA[symbol]['signals'] = pd.DataFrame({
+            'entries': False, 'short_entries': False, 'exits': False, 'short_exits': False, 'price': np.nan,
+            'qty': 0.0}, index=index)
+
+
+def make_actions(bars: dict[str, pd.DataFrame], rng: np.random.Generator) -> list[list[tuple]]:
+    """ The orders submitted, updated, canceled and closed at each step - a mix of market and limit orders of different
+    sizes, with and without take profit / stop loss legs, and partial position closes."""
+    actions = []
+    for step in range(BARS - 1):
+        stepActions = []
+        for symbol in SYMBOLS:
+            close = float(bars[symbol]['close'].iloc[step])
+            roll = rng.random()
+            side = IOrderSide.BUY if rng.random() < .5 else IOrderSide.SELL
+            sign = 1 if side == IOrderSide.BUY else -1
+            qty = float(rng.choice([1, 2, 0.5]))
+            legs = rng.random() < .7
+            tp = round(close + sign * rng.uniform(.1, 2), 2) if legs else None
+            sl = round(close - sign * rng.uniform(.1, 2), 2) if legs else None
+            if roll < .15:
+                stepActions.append(('submit', symbol, side, qty, IOrderType.MARKET, None, tp, sl))
+            elif roll < .45:
+                limit = round(close - sign * rng.uniform(0, 1.5), 2)
+                stepActions.append(('submit', symbol, side, qty, IOrderType.LIMIT, limit, tp, sl))
+            elif roll < .5:
+                # two partial closes of the same position in one step
+                stepActions.append(('close', symbol, 0.25))
+                stepActions.append(('close', symbol, 0.5))
+        roll = rng.random()
+        if roll < .1:
+            stepActions.append(('cancel', int(rng.integers(0, 1 << 30))))
+        elif roll < .2:
+            stepActions.append(('update', int(rng.integers(0, 1 << 30)), float(rng.uniform(-1, 1))))
+        elif roll < .3:
+            stepActions.append(('update_leg', int(rng.integers(0, 1 << 30)), float(rng.uniform(-1, 1))))
+        actions.append(stepActions)
+    return actions
+
+
+def make_scenario() -> tuple[dict[str, pd.DataFrame], list[list[tuple]]]:
+    rng = np.random.default_rng(SEED)
+    bars = {symbol: make_scenario_bars(symbol, rng) for symbol in SYMBOLS}
+    return bars, make_actions(bars, rng)
+
+
+async def process_update_orders(broker: PaperBroker, callback):
+    """ The BASELINE processUpdateOrders removes each update from the deque it iterates and raises RuntimeError after
+    the first one - repeat it until every queued update has been processed."""
+    while True:
+        try:
+            return await broker.processUpdateOrders(callback)
+        except RuntimeError:
+            continue
+
+
+async def run(broker: PaperBroker, actions: list[list[tuple]]) -> list[tuple]:
+    """ Replay the actions - returns every trade update and broker error with the orders named by submission index."""
+    orders = []
+    names = {}
+    events = []
+
+    def name(order_id):
+        return names.get(order_id, 'other')
+
+    async def callback(update: ITradeUpdate):
+        order = update.order
+        events.append((step, name(order['order_id']), str(update.event), order['filled_price'], order['stop_price'],
+                       order['qty'], order['filled_qty'], str(order['side'])))
+
+    def attempt(action, fn, *args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except BaseException as e:
+            events.append((step, action, e.args[0]['code'] if e.args and isinstance(e.args[0], dict) else repr(e)))
+
+    for step, stepActions in enumerate(actions):
+        for action in stepActions:
+            if action[0] == 'submit':
+                _, symbol, side, qty, orderType, limit, tp, sl = action
+                request = {'symbol': symbol, 'qty': qty, 'side': side, 'type': orderType,
+                           'time_in_force': ITimeInForce.GTC, 'limit_price': limit,
+                           'order_class': IOrderClass.BRACKET if tp else IOrderClass.SIMPLE,
+                           'take_profit': tp, 'stop_loss': sl, 'trail_price': None}
+                try:
+                    order = broker._submit_order(request)
+                except BaseException as e:
+                    events.append((step, 'submit', e.args[0]['code']))
+                    continue
+                names[order['order_id']] = len(orders)
+                orders.append(order)
+            elif action[0] == 'close':
+                attempt('close', broker.close_position, action[1], percent=action[2])
+            elif orders and action[0] == 'cancel':
+                attempt('cancel', broker.cancel_order, orders[action[1] % len(orders)]['order_id'])
+            elif orders and action[0] == 'update':
+                order = orders[action[1] % len(orders)]
+                if order['limit_price'] is not None:
+                    attempt('update', broker.update_order, order['order_id'],
+                            round(order['limit_price'] + action[2], 2), order['qty'])
+            elif orders and action[0] == 'update_leg':
+                order = orders[action[1] % len(orders)]
+                leg = (order['legs'] or {}).get('take_profit' if action[2] > 0 else 'stop_loss')
+                if leg:
+                    attempt('update_leg', broker.update_order, leg['order_id'],
+                            round(leg['limit_price'] + action[2], 2), order['qty'])
+
+        await process_update_orders(broker, callback)
+        await broker.processClosedOrders(callback)
+        await broker.processCanceledOrders(callback)
+        await broker.processPendingOrders(callback)
+        await broker.processActiveOrders(callback)
+        await process_update_orders(broker, callback)
+        await broker.processCanceledOrders(callback)
+        broker.setCurrentTime(START + datetime.timedelta(minutes=step + 1))
+
+    account = broker.get_account()
+    events.append(('end', [str(order['status']) for order in orders], round(account.cash, 6),
+                   round(account.equity, 6)))
+    return events
+
+
+def scenario_events() -> list:
+    bars, actions = make_scenario()
+    return asyncio.run(run(make_broker(bars), actions))
+
+
+def leg_without_limit_price() -> str:
+    """ Step an active bracket order whose take profit leg lost its limit price - returns the error raised, if any."""
+    bars, _ = make_scenario()
+    broker = make_broker(bars)
+    close = float(bars['AAA']['close'].iloc[0])
+    order = broker._submit_order({'symbol': 'AAA', 'qty': 1, 'side': IOrderSide.BUY, 'type': IOrderType.MARKET,
+                                  'time_in_force': ITimeInForce.GTC, 'limit_price': None,
+                                  'order_class': IOrderClass.BRACKET, 'take_profit': close + 50,
+                                  'stop_loss': close - 50, 'trail_price': None})
+
+    async def steps():
+        async def callback(update):
+            pass
+        await broker.processPendingOrders(callback)
+        order['legs']['take_profit']['limit_price'] = None
+        broker.setCurrentTime(START + datetime.timedelta(minutes=1))
+        await broker.processActiveOrders(callback)
+
+    try:
+        asyncio.run(steps())
+    except Exception as e:
+        return type(e).__name__
+    return 'none'
+
+
+def test_fills_match_baseline():
+    """ The paper broker fills, closes and cancels the same orders at the same prices and steps, with the same trade
+    updates in the same order, as the BASELINE broker that scanned every pending and active order each step."""
+    baseline = run_baseline(__file__, '--events')
+    current = json.loads(to_json(scenario_events()))
+
+    fills = sum(1 for event in baseline if len(event) > 3 and event[2] in ('ITradeUpdateEvent.FILLED', 'ITradeUpdateEvent.CLOSED'))
+    partial = sum(1 for event in baseline if len(event) > 3 and event[2] == 'ITradeUpdateEvent.CLOSED'
+                  and event[6] is not None and event[6] % 1)
+    assert fills > 50, f"the scenario must fill orders ({fills})"
+    for i, (a, b) in enumerate(zip(current, baseline)):
+        assert a == b, f"event {i} differs:\n  current : {a}\n  baseline: {b}"
+    assert len(current) == len(baseline), f"{len(current)} events now, {len(baseline)} with the baseline"
+    return len(baseline), fills, partial
+
+
+def test_leg_without_limit_price_is_checked():
+    """ A take profit leg without a limit price fails the active order check as it did in the BASELINE."""
+    baseline = run_baseline(__file__, '--leg')
+    current = leg_without_limit_price()
+    assert current == baseline == 'TypeError', (current, baseline)
+
+
+if __name__ == '__main__':
+    if '--events' in sys.argv:
+        # the run_baseline side - the same scenario with the BASELINE paper broker
+        print(to_json(scenario_events()))
+        sys.exit()
+    if '--leg' in sys.argv:
+        print(to_json(leg_without_limit_price()))
+        sys.exit()
+    events, fills, partial = test_fills_match_baseline()
+    print(f"paper broker vs baseline: {events} identical events, {fills} fills ({partial} closes of a fractional qty)")
+    test_leg_without_limit_price_is_checked()
+    print("leg without limit price: checked (TypeError) now and in the baseline")
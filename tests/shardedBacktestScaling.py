@@ -0,0 +1,105 @@
+import functools
+import os
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+from fixtures import make_asset
+
+import numpy as np
+import pandas as pd
+
+from OlympusTrader.broker.paper_broker import PaperBroker
+from OlympusTrader.strategy import ShardCoordinator, Strategy
+from OlympusTrader.strategy.interfaces import IStrategyMode
+from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
+
+
+SYMBOLS = [f'SYM{i}-USD' for i in range(16)]
+START = datetime(2025, 6, 13)
+END = datetime(2025, 6, 15)
+RESOLUTION = ITimeFrame(5, ITimeFrameUnit.Minute)
+STORE = os.path.join(tempfile.gettempdir(), 'olympus-shard-benchmark')
+
+
+class SyntheticBroker(PaperBroker):
+    """ Paper broker over generated bars - the benchmark must not depend on the network."""
+
+    def get_ticker_info(self, symbol: str):
+        return make_asset(symbol, 'crypto', 'SYN')
+
+    def _download_history(self, asset, start, end, resolution):
+        index = pd.date_range(pd.Timestamp(start).tz_localize(None), pd.Timestamp(end).tz_localize(None),
+                              freq=resolution.to_timeDelta(), inclusive='left', tz='UTC')
+        t = (index.asi8 // 60_000_000_000).astype(float) + sum(map(ord, asset['symbol']))
+        close = 100 + 5 * np.sin(t / 300) + np.sin(t / 17)
+        bars = pd.DataFrame({'Open': close - .1, 'High': close + .5, 'Low': close - .5, 'Close': close, 'Volume': 1000.0},
+                            index=index)
+        return self.format_on_bar(bars, asset['symbol'])
+
+
+class ShardBenchmarkStrategy(Strategy):
+    def start(self):
+        self.add_ta([
+            {"kind": 'macd', "fast": 16, "slow": 36, "signal": 9},
+            {"kind": 'atr', "length": 14},
+            {"kind": 'rsi', "length": 14},
+        ])
+        self.warm_up = 36
+
+    def init(self, asset):
+        pass
+
+    def universe(self):
+        return set(SYMBOLS)
+
+    def on_bar(self, symbol, bar):
+        history = self.history[symbol]
+        # the per bar work of a strategy reading its indicators
+        history[['MACD_16_36_9', 'RSI_14', 'ATRr_14']].iloc[-36:].describe()
+
+    def generateInsights(self, symbol: str):
+        pass
+
+    def executeInsight(self, insight):
+        pass
+
+    def teardown(self):
+        pass
+
+
+def add_bar_events(strategy: ShardBenchmarkStrategy):
+    strategy.add_events('bar', stored=True, stored_path=STORE, applyTA=False)
+
+
+def run(shards: int) -> tuple[float, ShardCoordinator]:
+    coordinator = ShardCoordinator(
+        ShardBenchmarkStrategy,
+        functools.partial(SyntheticBroker, cash=100_000, start_date=START, end_date=END, leverage=1.0),
+        SYMBOLS, shards, setup=add_bar_events, buyingPower=100_000, maxPositions=len(SYMBOLS),
+        resolution=RESOLUTION, mode=IStrategyMode.BACKTEST)
+    timer = timeit.default_timer()
+    coordinator.run()
+    return timeit.default_timer() - timer, coordinator
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 2, 4]
+    # warm the bar store so every run reads the same cached history
+    run(1)
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    print(f"{len(SYMBOLS)} symbols, {START:%Y-%m-%d} - {END:%Y-%m-%d} @ {RESOLUTION}, {cpus} cpus")
+    if max(counts) > cpus:
+        # the shard processes share the cpus - the speed up measures the sharding overhead, not the scaling
+        print(f"warning: more shards than cpus ({max(counts)} > {cpus}), run on a host with {max(counts)}+ cpus "
+              f"to measure the scaling")
+    base = None
+    for shards in counts:
+        elapsed, coordinator = run(shards)
+        base = base or elapsed
+        slowest = max(result['elapsed'] for result in coordinator.RESULTS)
+        print(f"{shards} shards: {elapsed:6.2f}s (slowest shard {slowest:6.2f}s) "
+              f"speed up {base / elapsed:4.2f}x vs {counts[0]} shard(s) - closed {coordinator.METRICS.total_closed}, "
+              f"account cash {coordinator.METRICS.starting_cash:,.0f} -> {coordinator.METRICS.ending_cash:,.0f}")
@@ -0,0 +1,107 @@
+import asyncio
+import datetime
+import multiprocessing
+
+from fixtures import make_asset, make_bars, minutes
+
+from OlympusTrader.broker.interfaces import IOrderClass, IOrderSide, IOrderType, ITimeInForce
+from OlympusTrader.broker.paper_broker import PaperBroker
+from OlympusTrader.strategy.interfaces import IStrategyMetrics
+from OlympusTrader.strategy.sharding import ShardManager
+from OlympusTrader.utils.signalRecorder import SignalRecorder
+
+
+START = datetime.datetime(2024, 1, 1)
+BARS = 10
+CASH = 10_000
+
+
+def make_broker(symbol: str) -> PaperBroker:
+    """ A shard broker with the bars of its one symbol - the close rises by 1 per bar from 100."""
+    broker = PaperBroker(cash=CASH, start_date=START, end_date=START + datetime.timedelta(minutes=BARS), leverage=1)
+    bars = make_bars(symbol, minutes(START, BARS), close=100.0, spread=0)
+    broker.TICKER_INFO[symbol] = make_asset(symbol)
+    broker.HISTORICAL_DATA[symbol] = {'bar': bars}
+    broker._index_bar_data(symbol)
+    broker._SIGNALS[symbol] = SignalRecorder(bars.index)
+    broker.CurrentTime = START
+    return broker
+
+
+def buy(broker: PaperBroker, symbol: str, qty: float):
+    return broker._submit_order({'symbol': symbol, 'qty': qty, 'side': IOrderSide.BUY, 'type': IOrderType.MARKET,
+                                 'time_in_force': ITimeInForce.GTC, 'limit_price': None,
+                                 'order_class': IOrderClass.SIMPLE, 'take_profit': None, 'stop_loss': None,
+                                 'trail_price': None})
+
+
+async def step(broker: PaperBroker, minute: int):
+    async def callback(update):
+        pass
+    for process in (broker.processPendingOrders, broker.processActiveOrders, broker.processClosedOrders):
+        await process(callback)
+    broker.update_account_history()
+    broker.setCurrentTime(START + datetime.timedelta(minutes=minute))
+
+
+def test_shards_trade_one_account():
+    """ Two shard brokers attached to the coordinator account through the manager proxy spend the same cash."""
+    manager = ShardManager(ctx=multiprocessing.get_context('spawn'))
+    manager.start()
+    try:
+        a, b = make_broker('AAA'), make_broker('BBB')
+        account = manager.SharedAccount(a.get_account())
+        a.attach_shared_account(account, 0)
+        b.attach_shared_account(account, 1)
+
+        buy(a, 'AAA', 60)
+        asyncio.run(step(a, 1))
+        assert a.get_position('AAA')['qty'] == 60
+        # the 6,000 AAA position of the other shard is out of the buying power of this one
+        assert b.get_account().buying_power == CASH - 6_000, b.get_account()
+        assert 'AAA' in b.get_positions() and b.get_positions()['AAA']['qty'] == 60
+        try:
+            buy(b, 'BBB', 60)
+            assert False, 'the order must not fit the buying power left'
+        except BaseException as e:
+            assert e.args[0]['code'] == 'insufficient_balance', e
+        buy(b, 'BBB', 30)
+
+        # AAA moves up 1 - the unrealized P&L shows in the equity of both shards
+        asyncio.run(step(a, 2))
+        assert b.get_account().equity == CASH + 60, b.get_account()
+
+        # bought at 100, closed at 102
+        a.close_position('AAA', qty=60)
+        asyncio.run(step(a, 3))
+        snapshot = account.snapshot()
+        assert a._REALIZED_PL == 120 and snapshot['cash'] == b.get_account().cash == CASH + 120, snapshot
+        assert snapshot['startingCash'] == CASH and snapshot['shards'] == 2
+    finally:
+        manager.shutdown()
+
+
+def test_unshared_broker_keeps_its_own_account():
+    broker = make_broker('AAA')
+    buy(broker, 'AAA', 60)
+    asyncio.run(step(broker, 1))
+    assert broker.SHARED_ACCOUNT is None and broker.get_account().buying_power == CASH - 6_000
+    assert list(broker.get_positions()) == ['AAA']
+
+
+def test_merged_metrics_keep_the_account_cash():
+    """ The shards saw one account - its cash is taken once, the trades and PnL are summed."""
+    shards = [IStrategyMetrics(starting_cash=CASH, ending_cash=CASH + 40, total_closed=2, total_wins=2, total_pnl=40,
+                               total_profit=40),
+              IStrategyMetrics(starting_cash=CASH, ending_cash=CASH + 30, total_closed=1, total_losses=1, total_pnl=-10,
+                               total_loss=-10)]
+    merged = IStrategyMetrics.merge(shards, CASH, CASH + 30)
+    assert (merged.starting_cash, merged.ending_cash) == (CASH, CASH + 30)
+    assert (merged.total_closed, merged.total_pnl, merged.win_rate) == (3, 30, 0.67)
+
+
+if __name__ == '__main__':
+    for test in (test_shards_trade_one_account, test_unshared_broker_keeps_its_own_account,
+                 test_merged_metrics_keep_the_account_cash):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,87 @@
+import timeit
+
+import fixtures  # noqa: F401 - puts the repository root on sys.path
+
+import pandas as pd
+
+from OlympusTrader.strategy.base_strategy import BaseStrategy
+from OlympusTrader.strategy.interfaces import IMarketDataStream
+from OlympusTrader.utils.timeframe import ITimeFrame, ITimeFrameUnit
+
+
+SYMBOLS = 250  # a resolution stream and a feature stream each - 500 streams
+BARS = 20_000
+RESOLUTION = ITimeFrame(1, ITimeFrameUnit.Minute)
+FEATURE = ITimeFrame(1, ITimeFrameUnit.Hour)
+
+
+class RoutingHost:
+    """ The strategy state _on_bar routes with - a full strategy needs a broker and a universe."""
+    _routeStream = BaseStrategy._routeStream
+    _buildStreamRoutes = BaseStrategy._buildStreamRoutes
+
+    def __init__(self, streams: list[IMarketDataStream]):
+        self.STREAMS = streams
+        self.resolution = RESOLUTION
+        self.tradeOnFeatureEvents = False
+        self._STREAM_ROUTES = {}
+        self._STREAM_ROUTES_VERSION = None
+
+
+def make_streams() -> list[IMarketDataStream]:
+    streams = []
+    for i in range(SYMBOLS):
+        symbol = f'SYM{i}'
+        streams.append(IMarketDataStream(symbol=symbol, time_frame=RESOLUTION, feature=None, type='bar'))
+        streams.append(IMarketDataStream(symbol=symbol, time_frame=FEATURE, feature=f'{symbol}~{FEATURE}', type='bar'))
+    return streams
+
+
+def legacy_route(host: RoutingHost, symbol: str, timeframe: ITimeFrame, timestamp: pd.Timestamp):
+    """ The STREAMS scan _on_bar ran for every bar before the routing table."""
+    isFeature = False
+    for stream in host.STREAMS:
+        if (
+            stream["type"] == "bar"
+            and (stream["symbol"] == symbol or stream["feature"] == symbol)
+            and stream["time_frame"].value != host.resolution.value
+        ):
+            if stream["time_frame"].value == timeframe.value and stream["time_frame"].is_time_increment(timestamp):
+                isFeature = True
+                symbol = stream["feature"]
+                break
+    isResolution = host.resolution.value == timeframe.value and host.resolution.is_time_increment(timestamp)
+    return isFeature or isResolution, symbol, (not isFeature) or host.tradeOnFeatureEvents
+
+
+def routed(host: RoutingHost, symbol: str, timeframe: ITimeFrame, timestamp: pd.Timestamp):
+    route = host._routeStream(symbol, timeframe)
+    isFeature = route.feature is not None and route.time_frame.is_time_increment(timestamp)
+    isResolution = route.isResolution and host.resolution.is_time_increment(timestamp)
+    return isFeature or isResolution, route.feature if isFeature else symbol, route.trade
+
+
+def run(host: RoutingHost, bars: list[tuple], route) -> float:
+    timer = timeit.default_timer()
+    for symbol, timeframe, timestamp in bars:
+        route(host, symbol, timeframe, timestamp)
+    return timeit.default_timer() - timer
+
+
+if __name__ == '__main__':
+    host = RoutingHost(make_streams())
+    timestamp = pd.Timestamp('2024-01-01 10:00', tz='UTC')
+    # every 10th bar is a feature bar, in the order the streams deliver them
+    bars = [(f'SYM{i % SYMBOLS}', FEATURE if i % 10 == 0 else RESOLUTION, timestamp) for i in range(BARS)]
+    bars += [(f'SYM{i}~{FEATURE}', FEATURE, timestamp) for i in range(SYMBOLS)]
+
+    # Routes must match the legacy scan exactly
+    for bar in bars[:2_000] + bars[-SYMBOLS:]:
+        assert legacy_route(host, *bar) == routed(host, *bar), bar
+
+    legacy = run(host, bars, legacy_route)
+    indexed = run(host, bars, routed)
+    print(f"{len(host.STREAMS)} streams")
+    print(f"legacy STREAMS scan : {len(bars) / legacy:,.0f} bars/sec ({legacy:.2f}s)")
+    print(f"routing table       : {len(bars) / indexed:,.0f} bars/sec ({indexed:.2f}s)")
+    print(f"speed up            : {legacy / indexed:.1f}x")